@@ -43,9 +43,9 @@ del logger_setup
 
 sanity_check_dependencies()
 
-from gym.core import Env, Space, Wrapper, ObservationWrapper, ActionWrapper, RewardWrapper
+from gym.core import Env, VectorEnv, Space, Wrapper, ObservationWrapper, ActionWrapper, RewardWrapper, set_validation_mode
 from gym.benchmarks import benchmark_spec
 from gym.envs import make, spec
 from gym.scoreboard.api import upload
 
-__all__ = ["Env", "Space", "Wrapper", "make", "spec", "upload"]
+__all__ = ["Env", "VectorEnv", "Space", "Wrapper", "make", "spec", "upload"]
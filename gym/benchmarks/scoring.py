@@ -99,41 +99,24 @@ class ClipTo01ThenAverage(object):
 
 
         # How long each episode actually took
-        # How long each episode actually took
-        durations = np.zeros(len(timestamps))
-
-        data_sources = np.array(data_sources)
-        timestamps = np.array(timestamps)
-        for source, initial_ts in enumerate(initial_reset_timestamps):
-            (source_indexes,) = np.where(data_sources == source)
-
-            if len(source_indexes) == 0:
-                continue
-            # Once we know the indexes corresponding to a particular
-            # source (i.e. worker thread), we can just subtract
-            # adjoining values
-            durations[source_indexes[0]] = timestamps[source_indexes[0]] - initial_ts
-            durations[source_indexes[1:]] = timestamps[source_indexes[1:]] - timestamps[source_indexes[:-1]]
+        timestamps = np.asarray(timestamps)
+        durations = _compute_episode_durations(initial_reset_timestamps, data_sources, timestamps)
 
         #### 1. Select out which indexes are for evaluation and which are for training
 
-        (t_idx,) = np.where([t == 't' for t in episode_types]) # training episodes
-        (e_idx,) = np.where([t == 'e' for t in episode_types]) # evaluation episodes
+        (t_idx,) = np.where(_episode_type_mask(episode_types, 't')) # training episodes
+        (e_idx,) = np.where(_episode_type_mask(episode_types, 'e')) # evaluation episodes
         if len(e_idx) == 0:
             # If no episodes marked for evaluation, consider
             # everything both a training and evaluation episode.
-            (t_idx,) = np.where([True for t in episode_types])
-            (e_idx,) = np.where([True for t in episode_types])
+            t_idx = np.arange(len(episode_types))
+            e_idx = np.arange(len(episode_types))
 
         #### 2. Grab the data corresponding to each of evaluation/training
 
-        training_lengths = np.array(episode_lengths)[t_idx]
-        training_rewards = np.array(episode_rewards)[t_idx]
-        training_durations = np.array(durations)[t_idx]
-
-        evaluation_lengths = np.array(episode_lengths)[e_idx]
-        evaluation_rewards = np.array(episode_rewards)[e_idx]
-        evaluation_durations = np.array(durations)[e_idx]
+        episode_rewards = np.asarray(episode_rewards)
+        training_lengths = np.asarray(episode_lengths)[t_idx]
+        training_durations = durations[t_idx]
 
         #### 3. Calculate the total elapsed time (in various units)
         #### for each episode
@@ -145,6 +128,7 @@ class ClipTo01ThenAverage(object):
         # episode. Note that with n parallel workers each running for
         # m seconds, we want to count the total time as n * m.
         elapsed_seconds = np.cumsum(training_durations)
+        cutoff_finder = _CutoffFinder(elapsed_timesteps, elapsed_seconds)
 
         scores = []
         solves = []
@@ -154,30 +138,25 @@ class ClipTo01ThenAverage(object):
         for task in tasks:
             # Find the first episode where we're over the allotted
             # training timesteps.
-            cutoff_idx = np.inf
-            if task.max_timesteps:
-                # this looks a little funny, but we want the first idx greater
-                # than the cutoff
-                (timestep_cutoff,) = np.where(elapsed_timesteps > task.max_timesteps)
-                if len(timestep_cutoff) > 0:
-                    cutoff_idx = min(cutoff_idx, timestep_cutoff[0])
-            if task.max_seconds:
-                (seconds_cutoff,) = np.where(elapsed_seconds > task.max_seconds)
-                if len(seconds_cutoff) > 0:
-                    cutoff_idx = min(cutoff_idx, seconds_cutoff[0])
+            cutoff_idx = cutoff_finder.find(task)
             if np.isfinite(cutoff_idx):
                 orig_cutoff_idx = t_idx[cutoff_idx] # cutoff index in the original (i.e. before filtering to training/evaluation)
-                (allowed_e_idx,) = np.where(e_idx < orig_cutoff_idx) # restrict to earlier episodes
+                # Restrict to earlier episodes. e_idx is sorted, so these
+                # are its first num_allowed entries. (As before, their
+                # positions in e_idx, not the indexes they hold, select
+                # the rewards below.)
+                num_allowed = np.searchsorted(e_idx, orig_cutoff_idx)
+                allowed_episode_rewards = episode_rewards[:num_allowed]
             else:
                 # All episodes are fair game
-                allowed_e_idx = e_idx
+                num_allowed = len(e_idx)
+                allowed_episode_rewards = episode_rewards[e_idx[-self.num_episodes:]]
 
             # Grab the last num_episodes evaluation episodes from
             # before the cutoff (at which point we've gathered too
             # much experience).
             #
             # This probably won't work long-term but is fine for now.
-            allowed_episode_rewards = np.array(episode_rewards)[allowed_e_idx]
             reward = allowed_episode_rewards[-self.num_episodes:]
 
             floor = task.reward_floor
@@ -201,7 +180,7 @@ class ClipTo01ThenAverage(object):
             # Record the list of rewards
             rewards.append(reward)
 
-            if len(allowed_e_idx) > 0:
+            if num_allowed > 0:
                 if not np.isfinite(cutoff_idx):
                     cutoff_idx = len(elapsed_seconds) - 1
                 last_t_idx = t_idx[cutoff_idx]
@@ -249,34 +228,75 @@ def _compute_episode_durations(initial_reset_timestamps, data_sources, timestamp
     # can be a lot simpler
 
     durations = np.zeros(len(timestamps))
-    data_sources = np.array(data_sources)
-    for source, initial_ts in enumerate(initial_reset_timestamps):
-        (source_indexes,) = np.where(data_sources == source)
-
-        if len(source_indexes) == 0:
-            continue
-        # Once we know the indexes corresponding to a particular
-        # source (i.e. worker thread), we can just subtract
-        # adjoining values
-        durations[source_indexes[0]] = timestamps[source_indexes[0]] - initial_ts
-        durations[source_indexes[1:]] = timestamps[source_indexes[1:]] - timestamps[source_indexes[:-1]]
+    if len(timestamps) == 0:
+        return durations
+    data_sources = np.asarray(data_sources)
+    timestamps = np.asarray(timestamps, dtype='float64')
+    initial_reset_timestamps = np.asarray(initial_reset_timestamps, dtype='float64')
+
+    # Episodes from sources without an initial timestamp keep a zero duration
+    (indexes,) = np.where((data_sources >= 0) & (data_sources < len(initial_reset_timestamps)))
+    # Group by source with a stable sort, so each group stays in
+    # timestamp order
+    indexes = indexes[np.argsort(data_sources[indexes], kind='mergesort')]
+    sources = data_sources[indexes]
+    ordered = timestamps[indexes]
+
+    # Within a source, subtract adjoining values; the first episode of
+    # each source is measured from that source's initial reset
+    previous = np.empty_like(ordered)
+    previous[1:] = ordered[:-1]
+    first = np.ones(len(sources), dtype=bool)
+    first[1:] = sources[1:] != sources[:-1]
+    previous[first] = initial_reset_timestamps[sources[first]]
+    durations[indexes] = ordered - previous
     return durations
 
+def _episode_type_mask(episode_types, type):
+    episode_types = np.asarray(episode_types)
+    if episode_types.size == 0:
+        # An empty array wouldn't compare elementwise against a string
+        return np.zeros(0, dtype=bool)
+    return episode_types == type
+
+def _first_index_above(values, threshold, nondecreasing):
+    """Index of the first value greater than threshold, or None."""
+    if nondecreasing:
+        idx = np.searchsorted(values, threshold, side='right')
+        return idx if idx < len(values) else None
+    (above,) = np.where(values > threshold)
+    return above[0] if len(above) > 0 else None
+
+class _CutoffFinder(object):
+    """Finds task cutoffs in cumulative timestep/second arrays. Those are
+    nearly always nondecreasing, which is checked once so that each task
+    can binary search."""
+
+    def __init__(self, elapsed_timesteps, elapsed_seconds):
+        self.elapsed_timesteps = elapsed_timesteps
+        self.elapsed_seconds = elapsed_seconds
+        self.timesteps_nondecreasing = bool(np.all(np.diff(elapsed_timesteps) >= 0))
+        # Negative durations (e.g. clock adjustments) can make this one dip
+        self.seconds_nondecreasing = bool(np.all(np.diff(elapsed_seconds) >= 0))
+
+    def find(self, task):
+        # Apply max_timesteps and max_seconds cutoffs. Return np.inf if no cutoff is necessary
+        cutoff_idx = np.inf
+        if task.max_timesteps:
+            # this looks a little funny, but we want the first idx greater
+            # than the cutoff
+            timestep_cutoff = _first_index_above(self.elapsed_timesteps, task.max_timesteps, self.timesteps_nondecreasing)
+            if timestep_cutoff is not None:
+                cutoff_idx = min(cutoff_idx, timestep_cutoff)
+        if task.max_seconds:
+            seconds_cutoff = _first_index_above(self.elapsed_seconds, task.max_seconds, self.seconds_nondecreasing)
+            if seconds_cutoff is not None:
+                cutoff_idx = min(cutoff_idx, seconds_cutoff)
+        return cutoff_idx
+
 def _find_cutoffs_for_task(task, elapsed_timesteps, elapsed_seconds):
     # Apply max_timesteps and max_seconds cutoffs. Return np.inf if no cutoff is necessary
-    cutoff_idx = np.inf
-    if task.max_timesteps:
-        # this looks a little funny, but we want the first idx greater
-        # than the cutoff
-        (timestep_cutoff,) = np.where(elapsed_timesteps > task.max_timesteps)
-        if len(timestep_cutoff) > 0:
-            cutoff_idx = min(cutoff_idx, timestep_cutoff[0])
-    if task.max_seconds:
-        (seconds_cutoff,) = np.where(elapsed_seconds > task.max_seconds)
-        if len(seconds_cutoff) > 0:
-            cutoff_idx = min(cutoff_idx, seconds_cutoff[0])
-
-    return cutoff_idx
+    return _CutoffFinder(elapsed_timesteps, elapsed_seconds).find(task)
 
 class BenchmarkScoringRule(object):
     """Benchmark scoring rule class
@@ -310,12 +330,12 @@ class BenchmarkScoringRule(object):
 
 
         # How long each episode actually took
-        timestamps = np.array(timestamps)
+        timestamps = np.asarray(timestamps)
         durations = _compute_episode_durations(initial_reset_timestamps, data_sources, timestamps)
 
         #### Grab the data corresponding to each of evaluation/training
-        lengths = np.array(episode_lengths)
-        rewards = np.array(episode_rewards)
+        lengths = np.asarray(episode_lengths)
+        episode_rewards = np.asarray(episode_rewards)
 
         #### Calculate the total elapsed time (in various units)
         #### for each episode
@@ -327,6 +347,7 @@ class BenchmarkScoringRule(object):
         # episode. Note that with n parallel workers each running for
         # m seconds, we want to count the total time as n * m.
         elapsed_seconds = np.cumsum(durations)
+        cutoff_finder = _CutoffFinder(elapsed_timesteps, elapsed_seconds)
 
         # List of score for each task
         scores = []
@@ -339,12 +360,12 @@ class BenchmarkScoringRule(object):
         for task in tasks:
             # Find the first episode where we're over the allotted
             # training timesteps.
-            cutoff_idx = _find_cutoffs_for_task(task, elapsed_timesteps, elapsed_seconds)
+            cutoff_idx = cutoff_finder.find(task)
             if not np.isfinite(cutoff_idx):
                 # All episodes are fair game
                 cutoff_idx = len(lengths)
 
-            reward = np.array(episode_rewards)[:cutoff_idx]
+            reward = episode_rewards[:cutoff_idx]
 
             score, solved = self.score_and_solved_func(task, reward, elapsed_seconds[:cutoff_idx])
 
@@ -4,10 +4,32 @@ logger = logging.getLogger(__name__)
 import numpy as np
 
 from gym import error
-from gym.utils import closer, reraise
+from gym.utils import closer, reraise, seeding
 
 env_closer = closer.Closer()
 
+# How Env._contains checks actions (and, in some envs, observations)
+# against their spaces: 'strict' checks every call, 'sampled' checks
+# one call in VALIDATION_SAMPLE_INTERVAL, and 'off' never checks.
+VALIDATION_MODES = ('strict', 'sampled', 'off')
+VALIDATION_SAMPLE_INTERVAL = 100
+_validation_mode = 'strict'
+
+def set_validation_mode(mode):
+    """Sets the validation mode of every env that does not override it
+    through its own `validation_mode` attribute.
+
+    Validation is meant to stay 'strict' in tests; use 'off' to remove
+    the per-step checks from production training loops.
+    """
+    global _validation_mode
+    if mode not in VALIDATION_MODES:
+        raise error.Error('Invalid validation mode: {} (must be one of {})'.format(mode, VALIDATION_MODES))
+    _validation_mode = mode
+
+def get_validation_mode():
+    return _validation_mode
+
 # Env-related abstractions
 
 class Env(object):
@@ -84,8 +106,33 @@ class Env(object):
         raise NotImplementedError
     def _seed(self, seed=None): return []
 
+    # Set in SOME instances to override the global validation mode (see
+    # set_validation_mode). Checks happen in the innermost env, so set
+    # this on env.unwrapped.
+    validation_mode = None
+
     # Do not override
     _owns_render = True
+    _validation_calls = None
+
+    def _contains(self, space, x):
+        """Returns space.contains(x), or True if the validation mode skips
+        this call. Use as `assert self._contains(self.action_space, action)`.
+        In 'sampled' mode, calls are counted separately for each space, so
+        that checking the action and then the observation of every step
+        still samples both.
+        """
+        mode = self.validation_mode or _validation_mode
+        if mode == 'off':
+            return True
+        elif mode == 'sampled':
+            if self._validation_calls is None:
+                self._validation_calls = {}
+            calls = self._validation_calls.get(id(space), 0)
+            self._validation_calls[id(space)] = calls + 1
+            if calls % VALIDATION_SAMPLE_INTERVAL != 0:
+                return True
+        return space.contains(x)
 
     @property
     def monitor(self):
@@ -255,6 +302,141 @@ class Env(object):
     def __str__(self):
         return '<{} instance>'.format(type(self).__name__)
 
+class VectorEnv(object):
+    """A batch of `num_envs` independent copies of an environment which
+    are stepped together. Observations, rewards and done flags are
+    returned stacked along a leading batch axis.
+
+    The main API methods that users of this class need to know are:
+
+        step
+        reset
+        seed
+        close
+
+    When implementing a vectorized environment, override the following
+    methods in your subclass:
+
+        _step
+        _reset
+        _seed
+        _close
+
+    And set the following attributes:
+
+        num_envs: The number of sub-environments in the batch
+        action_space: The Space object corresponding to valid actions of a single sub-environment
+        observation_space: The Space object corresponding to valid observations of a single sub-environment
+        reward_range: A tuple corresponding to the min and max possible rewards of a single sub-environment
+
+    Sub-environments are reset automatically: when a sub-environment
+    reports done, its row of the returned observation already holds the
+    first observation of the next episode, and the final observation of
+    the finished episode is available as
+    `infos[i]['terminal_observation']`.
+    """
+
+    def __new__(cls, *args, **kwargs):
+        # See Env.__new__ for why this isn't done in __init__.
+        env = super(VectorEnv, cls).__new__(cls)
+        env._env_closer_id = env_closer.register(env)
+        env._closed = False
+
+        # Will be automatically set when creating an environment via 'make'
+        env.spec = None
+        return env
+
+    # Set this in SOME subclasses
+    metadata = {'render.modes': []}
+    reward_range = (-np.inf, np.inf)
+
+    # Override in SOME subclasses
+    def _close(self):
+        pass
+
+    # Set these in ALL subclasses
+    num_envs = None
+    action_space = None
+    observation_space = None
+
+    # Override in ALL subclasses
+    def _step(self, actions): raise NotImplementedError
+    def _reset(self): raise NotImplementedError
+    def _seed(self, seeds): return []
+
+    def step(self, actions):
+        """Run one timestep of every sub-environment's dynamics.
+
+        Accepts a batch of actions and returns a tuple (observations,
+        rewards, dones, infos).
+
+        Args:
+            actions (sequence): one action per sub-environment, each an
+              element of `action_space`
+
+        Returns:
+            observations (np.ndarray): observations stacked along axis 0
+            rewards (np.ndarray): float array of shape (num_envs,)
+            dones (np.ndarray): bool array of shape (num_envs,)
+            infos (list<dict>): auxiliary diagnostic information, one dict per sub-environment
+        """
+        if len(actions) != self.num_envs:
+            raise error.Error('Expected {} actions (one per sub-environment), but got {}'.format(self.num_envs, len(actions)))
+        observations, rewards, dones, infos = self._step(actions)
+        return observations, rewards, dones, infos
+
+    def reset(self):
+        """Resets every sub-environment and returns the stacked initial
+        observations.
+        """
+        return self._reset()
+
+    def seed(self, seed=None):
+        """Sets the seed for every sub-environment.
+
+        Args:
+            seed (Optional[int, list<int>]): If an int, sub-environment
+              `i` is seeded with `seed + i`. A list must provide one seed
+              per sub-environment. None seeds every sub-environment from
+              an operating system specific randomness source.
+
+        Returns:
+            list: The seeds used, as returned by each sub-environment.
+        """
+        if seed is None:
+            seeds = [None] * self.num_envs
+        elif isinstance(seed, (list, tuple)):
+            if len(seed) != self.num_envs:
+                raise error.Error('Expected {} seeds (one per sub-environment), but got {}'.format(self.num_envs, len(seed)))
+            seeds = list(seed)
+        else:
+            seeds = [seed + i for i in range(self.num_envs)]
+        return self._seed(seeds)
+
+    def close(self):
+        """Override _close in your subclass to perform any necessary cleanup.
+
+        Vectorized environments will automatically close() themselves
+        when garbage collected or when the program exits.
+        """
+        # _closed will be missing if this instance is still
+        # initializing.
+        if not hasattr(self, '_closed') or self._closed:
+            return
+
+        self._close()
+        env_closer.unregister(self._env_closer_id)
+        self._closed = True
+
+    def __del__(self):
+        self.close()
+
+    def __len__(self):
+        return self.num_envs
+
+    def __str__(self):
+        return '<{}({}) instance>'.format(type(self).__name__, self.num_envs)
+
 # Space-related abstractions
 
 class Space(object):
@@ -263,9 +445,43 @@ class Space(object):
     action.
     """
 
-    def sample(self, seed=0):
+    # Set by seed(), or by assigning np_random
+    _np_random = None
+
+    @property
+    def np_random(self):
+        """The numpy.random.RandomState that sample() draws from. Until
+        this space is seeded (or handed a RandomState), this is the
+        common one in gym.spaces.prng.
+        """
+        if self._np_random is not None:
+            return self._np_random
+        # Imported here since gym.spaces depends on this module
+        from gym.spaces import prng
+        return prng.np_random
+
+    @np_random.setter
+    def np_random(self, np_random):
+        self._np_random = np_random
+
+    def seed(self, seed=None):
+        """Give this space its own random number generator, so that its
+        samples neither depend on nor disturb any other space.
+
+        Returns:
+            list<bigint>: Returns the list of seeds used in this space's
+              random number generators. The first value in the list is
+              the seed of this space.
+        """
+        self._np_random, seed = seeding.np_random(seed)
+        return [seed]
+
+    def sample(self, n=None):
         """
         Uniformly randomly sample a random elemnt of this space
+
+        If n is given, return n samples stacked along a new leading
+        axis, drawn with a single call to the random number generator.
         """
         raise NotImplementedError
 
@@ -276,6 +492,14 @@ class Space(object):
         """
         raise NotImplementedError
 
+    def contains_n(self, sample_n):
+        """
+        Return a boolean array specifying, for each of the samples
+        stacked along the leading axis of sample_n (as returned by
+        sample(n)), whether it is a valid member of this space
+        """
+        raise NotImplementedError
+
     def to_jsonable(self, sample_n):
         """Convert a batch of samples from this space to a JSONable data type."""
         # By default, assume identity is JSONable
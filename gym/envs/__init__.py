@@ -53,6 +53,7 @@ register(
 register(
     id='CartPole-v0',
     entry_point='gym.envs.classic_control:CartPoleEnv',
+    vector_entry_point='gym.envs.classic_control:CartPoleVectorEnv',
     tags={'wrapper_config.TimeLimit.max_episode_steps': 200},
     reward_threshold=195.0,
 )
@@ -60,6 +61,7 @@ register(
 register(
     id='CartPole-v1',
     entry_point='gym.envs.classic_control:CartPoleEnv',
+    vector_entry_point='gym.envs.classic_control:CartPoleVectorEnv',
     tags={'wrapper_config.TimeLimit.max_episode_steps': 500},
     reward_threshold=475.0,
 )
@@ -67,6 +69,7 @@ register(
 register(
     id='MountainCar-v0',
     entry_point='gym.envs.classic_control:MountainCarEnv',
+    vector_entry_point='gym.envs.classic_control:MountainCarVectorEnv',
     tags={'wrapper_config.TimeLimit.max_episode_steps': 200},
     reward_threshold=-110.0,
 )
@@ -74,6 +77,7 @@ register(
 register(
     id='MountainCarContinuous-v0',
     entry_point='gym.envs.classic_control:Continuous_MountainCarEnv',
+    vector_entry_point='gym.envs.classic_control:Continuous_MountainCarVectorEnv',
     tags={'wrapper_config.TimeLimit.max_episode_steps': 999},
     reward_threshold=90.0,
 )
@@ -81,12 +85,14 @@ register(
 register(
     id='Pendulum-v0',
     entry_point='gym.envs.classic_control:PendulumEnv',
+    vector_entry_point='gym.envs.classic_control:PendulumVectorEnv',
     tags={'wrapper_config.TimeLimit.max_episode_steps': 200},
 )
 
 register(
     id='Acrobot-v1',
     entry_point='gym.envs.classic_control:AcrobotEnv',
+    vector_entry_point='gym.envs.classic_control:AcrobotVectorEnv',
     tags={'wrapper_config.TimeLimit.max_episode_steps': 500},
 )
 
@@ -121,6 +127,22 @@ register(
     reward_threshold=300,
 )
 
+# Cast the lidar against the terrain in one NumPy pass. Lidar readings
+# are the nearest hit, where the v2 envs take the first one Box2D reports.
+register(
+    id='BipedalWalkerBatchedLidar-v2',
+    entry_point='gym.envs.box2d:BipedalWalkerBatchedLidar',
+    tags={'wrapper_config.TimeLimit.max_episode_steps': 1600},
+    reward_threshold=300,
+)
+
+register(
+    id='BipedalWalkerHardcoreBatchedLidar-v2',
+    entry_point='gym.envs.box2d:BipedalWalkerHardcoreBatchedLidar',
+    tags={'wrapper_config.TimeLimit.max_episode_steps': 2000},
+    reward_threshold=300,
+)
+
 register(
     id='CarRacing-v0',
     entry_point='gym.envs.box2d:CarRacing',
@@ -128,6 +150,15 @@ register(
     reward_threshold=900,
 )
 
+# Renders observations without a window or OpenGL. They differ slightly
+# from CarRacing-v0's: no score digits, and road edges can move by a pixel.
+register(
+    id='CarRacingSoftware-v0',
+    entry_point='gym.envs.box2d:CarRacingSoftware',
+    tags={'wrapper_config.TimeLimit.max_episode_steps': 1000},
+    reward_threshold=900,
+)
+
 # Toy Text
 # ----------------------------------------
 
@@ -139,6 +170,7 @@ register(
 register(
     id='FrozenLake-v0',
     entry_point='gym.envs.toy_text:FrozenLakeEnv',
+    vector_entry_point='gym.envs.toy_text:FrozenLakeVectorEnv',
     kwargs={'map_name' : '4x4'},
     tags={'wrapper_config.TimeLimit.max_episode_steps': 100},
     reward_threshold=0.78, # optimum = .8196
@@ -147,6 +179,7 @@ register(
 register(
     id='FrozenLake8x8-v0',
     entry_point='gym.envs.toy_text:FrozenLakeEnv',
+    vector_entry_point='gym.envs.toy_text:FrozenLakeVectorEnv',
     kwargs={'map_name' : '8x8'},
     tags={'wrapper_config.TimeLimit.max_episode_steps': 200},
     reward_threshold=0.99, # optimum = 1
@@ -167,6 +200,7 @@ register(
 register(
     id='Taxi-v1',
     entry_point='gym.envs.toy_text.taxi:TaxiEnv',
+    vector_entry_point='gym.envs.toy_text.taxi:TaxiVectorEnv',
     tags={'wrapper_config.TimeLimit.max_episode_steps': 200},
     reward_threshold=9.7, # optimum = 10.2
 )
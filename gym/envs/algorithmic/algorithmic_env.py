@@ -162,7 +162,7 @@ class AlgorithmicEnv(Env):
         return len(self.input_data)
 
     def _step(self, action):
-        assert self.action_space.contains(action)
+        assert self._contains(self.action_space, action)
         self.last_action = action
         inp_act, out_act, pred = action
         done = False
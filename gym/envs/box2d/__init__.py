@@ -1,4 +1,5 @@
 from gym.envs.box2d.lunar_lander import LunarLander
 from gym.envs.box2d.lunar_lander import LunarLanderContinuous
 from gym.envs.box2d.bipedal_walker import BipedalWalker, BipedalWalkerHardcore
-from gym.envs.box2d.car_racing import CarRacing
+from gym.envs.box2d.bipedal_walker import BipedalWalkerBatchedLidar, BipedalWalkerHardcoreBatchedLidar
+from gym.envs.box2d.car_racing import CarRacing, CarRacingSoftware
@@ -7,6 +7,7 @@ from Box2D.b2 import (edgeShape, circleShape, fixtureDef, polygonShape, revolute
 import gym
 from gym import spaces
 from gym.utils import colorize, seeding
+from gym.utils.geometry_cache import GeometryCache
 
 # This is simple 4-joints walker robot environment.
 #
@@ -63,6 +64,169 @@ TERRAIN_GRASS    = 10    # low long are grass spots, in steps
 TERRAIN_STARTPAD = 20    # in steps
 FRICTION = 2.5
 
+LIDAR_RAYS = 10
+# Ray i goes from the hull to hull + LIDAR_DELTAS[i]
+LIDAR_DELTAS = LIDAR_RANGE*np.array([
+    (math.sin(1.5*i/10.0), -math.cos(1.5*i/10.0)) for i in range(LIDAR_RAYS) ])
+
+class StaticLidar(object):
+    """
+    Casts a fixed fan of rays (origin + t*ray_deltas[i], t in [0, 1])
+    against the edges of every lidar-visible fixture of some static bodies,
+    all rays and all edges in reach at once.
+
+    Edges are sorted by their leftmost x, so the ones in reach are a
+    contiguous slice, and everything that does not depend on the origin
+    is computed here, once. Polygon edges are one-sided like in Box2D (a
+    ray only hits them from outside), edge shapes are two-sided.
+    """
+
+    def __init__(self, bodies, ray_deltas):
+        starts, deltas, one_sided = [], [], []
+        for body in bodies:
+            trans = body.transform
+            for f in body.fixtures:
+                if (f.filterData.categoryBits & 1) == 0:
+                    continue
+                path = [trans*v for v in f.shape.vertices]
+                if type(f.shape) is edgeShape:
+                    edges = [(path[0], path[1])]
+                else:
+                    edges = zip(path, path[1:] + path[:1])
+                for p1, p2 in edges:
+                    starts.append((p1[0], p1[1]))
+                    deltas.append((p2[0]-p1[0], p2[1]-p1[1]))
+                    one_sided.append(type(f.shape) is not edgeShape)
+        starts = np.array(starts, dtype=np.float64).reshape(-1, 2)
+        deltas = np.array(deltas, dtype=np.float64).reshape(-1, 2)
+        one_sided = np.array(one_sided, dtype=bool)
+
+        left = np.minimum(starts[:, 0], starts[:, 0] + deltas[:, 0])
+        order = np.argsort(left, kind='mergesort')
+        starts, deltas, one_sided, left = starts[order], deltas[order], one_sided[order], left[order]
+        self.left = left
+        self.max_width = np.abs(deltas[:, 0]).max() if len(deltas) else 0.0
+        self.ray_deltas = ray_deltas
+        self.ray_reach = (min(ray_deltas[:, 0].min(), 0) - self.max_width, max(ray_deltas[:, 0].max(), 0))
+
+        # A ray hits an edge where origin + t*d == start + u*e, so with 2-d
+        # cross products t = cross(start - origin, e)/cross(d, e) and
+        # u = cross(start - origin, d)/cross(d, e).
+        d = ray_deltas[:, None, :]
+        e = deltas
+        denom = d[..., 0]*e[:, 1] - d[..., 1]*e[:, 0]
+        # For a counter-clockwise polygon edge, denom < 0 means entering
+        self.facing = np.where(one_sided, denom < 0, denom != 0)
+        self.inv_denom = np.zeros_like(denom)
+        self.inv_denom[self.facing] = 1.0 / denom[self.facing]
+        self.edges = e
+        self.start_cross_edge = starts[:, 0]*e[:, 1] - starts[:, 1]*e[:, 0]
+        self.start_cross_ray = starts[:, 0]*d[..., 1] - starts[:, 1]*d[..., 0]
+
+    def fractions(self, origin, out=None):
+        """Returns, for each ray from origin, the smallest t at which it hits
+        an edge, or 1.0 if it hits none."""
+        if out is None:
+            out = np.empty(len(self.ray_deltas))
+        x, y = origin
+        lo = np.searchsorted(self.left, x + self.ray_reach[0])
+        hi = np.searchsorted(self.left, x + self.ray_reach[1], side='right')
+        if lo == hi:
+            out.fill(1.0)
+            return out
+
+        e = self.edges[lo:hi]
+        d = self.ray_deltas
+        inv_denom = self.inv_denom[:, lo:hi]
+        t = (self.start_cross_edge[lo:hi] - (x*e[:, 1] - y*e[:, 0])) * inv_denom
+        u = (self.start_cross_ray[:, lo:hi] - (x*d[:, 1:] - y*d[:, :1])) * inv_denom
+        hit = self.facing[:, lo:hi] & (t >= 0) & (t <= 1) & (u >= 0) & (u <= 1)
+        np.min(np.where(hit, t, 1.0), axis=1, out=out)
+        return out
+
+def generate_terrain(np_random, hardcore=False):
+    """Draws a terrain from np_random. Returns the x and y of the ground at
+    every TERRAIN_STEP, and the obstacle polygons (stumps, stairs and pit
+    walls) in the order they were drawn."""
+    GRASS, STUMP, STAIRS, PIT, _STATES_ = range(5)
+    state    = GRASS
+    velocity = 0.0
+    y        = TERRAIN_HEIGHT
+    counter  = TERRAIN_STARTPAD
+    oneshot  = False
+    obstacles = []
+    terrain_x = []
+    terrain_y = []
+    for i in range(TERRAIN_LENGTH):
+        x = i*TERRAIN_STEP
+        terrain_x.append(x)
+
+        if state==GRASS and not oneshot:
+            velocity = 0.8*velocity + 0.01*np.sign(TERRAIN_HEIGHT - y)
+            if i > TERRAIN_STARTPAD: velocity += np_random.uniform(-1, 1)/SCALE   #1
+            y += velocity
+
+        elif state==PIT and oneshot:
+            counter = np_random.randint(3, 5)
+            poly = [
+                (x,              y),
+                (x+TERRAIN_STEP, y),
+                (x+TERRAIN_STEP, y-4*TERRAIN_STEP),
+                (x,              y-4*TERRAIN_STEP),
+                ]
+            obstacles.append(poly)
+            obstacles.append([(p[0]+TERRAIN_STEP*counter,p[1]) for p in poly])
+            counter += 2
+            original_y = y
+
+        elif state==PIT and not oneshot:
+            y = original_y
+            if counter > 1:
+                y -= 4*TERRAIN_STEP
+
+        elif state==STUMP and oneshot:
+            counter = np_random.randint(1, 3)
+            poly = [
+                (x,                      y),
+                (x+counter*TERRAIN_STEP, y),
+                (x+counter*TERRAIN_STEP, y+counter*TERRAIN_STEP),
+                (x,                      y+counter*TERRAIN_STEP),
+                ]
+            obstacles.append(poly)
+
+        elif state==STAIRS and oneshot:
+            stair_height = +1 if np_random.rand() > 0.5 else -1
+            stair_width = np_random.randint(4, 5)
+            stair_steps = np_random.randint(3, 5)
+            original_y = y
+            for s in range(stair_steps):
+                poly = [
+                    (x+(    s*stair_width)*TERRAIN_STEP, y+(   s*stair_height)*TERRAIN_STEP),
+                    (x+((1+s)*stair_width)*TERRAIN_STEP, y+(   s*stair_height)*TERRAIN_STEP),
+                    (x+((1+s)*stair_width)*TERRAIN_STEP, y+(-1+s*stair_height)*TERRAIN_STEP),
+                    (x+(    s*stair_width)*TERRAIN_STEP, y+(-1+s*stair_height)*TERRAIN_STEP),
+                    ]
+                obstacles.append(poly)
+            counter = stair_steps*stair_width
+
+        elif state==STAIRS and not oneshot:
+            s = stair_steps*stair_width - counter - stair_height
+            n = s/stair_width
+            y = original_y + (n*stair_height)*TERRAIN_STEP
+
+        oneshot = False
+        terrain_y.append(y)
+        counter -= 1
+        if counter==0:
+            counter = np_random.randint(TERRAIN_GRASS/2, TERRAIN_GRASS)
+            if state==GRASS and hardcore:
+                state = np_random.randint(1, _STATES_)
+                oneshot = True
+            else:
+                state = GRASS
+                oneshot = True
+    return terrain_x, terrain_y, obstacles
+
 class ContactDetector(contactListener):
     def __init__(self, env):
         contactListener.__init__(self)
@@ -85,10 +249,20 @@ class BipedalWalker(gym.Env):
     }
 
     hardcore = False
+    # Cast lidar rays against the terrain with StaticLidar instead of one
+    # world.RayCast per ray. StaticLidar finds the nearest hit, while Box2D
+    # stops at the first fixture it reports, so the observations differ
+    # slightly: it is only on in the BatchedLidar variants.
+    batched_lidar = False
+    # Terrains already generated from the same np_random state (and
+    # hardcore setting) are reused. Set to None to always generate.
+    terrain_cache = GeometryCache(generate_terrain)
 
     def __init__(self):
         self._seed()
         self.viewer = None
+        self._state = np.zeros(24)
+        self._lidar_fractions = np.ones(LIDAR_RAYS)
 
         self.world = Box2D.b2World()
         self.terrain = None
@@ -119,107 +293,22 @@ class BipedalWalker(gym.Env):
         self.joints = []
 
     def _generate_terrain(self, hardcore):
-        GRASS, STUMP, STAIRS, PIT, _STATES_ = range(5)
-        state    = GRASS
-        velocity = 0.0
-        y        = TERRAIN_HEIGHT
-        counter  = TERRAIN_STARTPAD
-        oneshot  = False
-        self.terrain   = []
-        self.terrain_x = []
-        self.terrain_y = []
-        for i in range(TERRAIN_LENGTH):
-            x = i*TERRAIN_STEP
-            self.terrain_x.append(x)
-
-            if state==GRASS and not oneshot:
-                velocity = 0.8*velocity + 0.01*np.sign(TERRAIN_HEIGHT - y)
-                if i > TERRAIN_STARTPAD: velocity += self.np_random.uniform(-1, 1)/SCALE   #1
-                y += velocity
-
-            elif state==PIT and oneshot:
-                counter = self.np_random.randint(3, 5)
-                poly = [
-                    (x,              y),
-                    (x+TERRAIN_STEP, y),
-                    (x+TERRAIN_STEP, y-4*TERRAIN_STEP),
-                    (x,              y-4*TERRAIN_STEP),
-                    ]
-                t = self.world.CreateStaticBody(
-                    fixtures = fixtureDef(
-                        shape=polygonShape(vertices=poly),
-                        friction = FRICTION
-                    ))
-                t.color1, t.color2 = (1,1,1), (0.6,0.6,0.6)
-                self.terrain.append(t)
-                t = self.world.CreateStaticBody(
-                    fixtures = fixtureDef(
-                        shape=polygonShape(vertices=[(p[0]+TERRAIN_STEP*counter,p[1]) for p in poly]),
-                        friction = FRICTION
-                    ))
-                t.color1, t.color2 = (1,1,1), (0.6,0.6,0.6)
-                self.terrain.append(t)
-                counter += 2
-                original_y = y
-
-            elif state==PIT and not oneshot:
-                y = original_y
-                if counter > 1:
-                    y -= 4*TERRAIN_STEP
-
-            elif state==STUMP and oneshot:
-                counter = self.np_random.randint(1, 3)
-                poly = [
-                    (x,                      y),
-                    (x+counter*TERRAIN_STEP, y),
-                    (x+counter*TERRAIN_STEP, y+counter*TERRAIN_STEP),
-                    (x,                      y+counter*TERRAIN_STEP),
-                    ]
-                t = self.world.CreateStaticBody(
-                    fixtures = fixtureDef(
-                        shape=polygonShape(vertices=poly),
-                        friction = FRICTION
-                    ))
-                t.color1, t.color2 = (1,1,1), (0.6,0.6,0.6)
-                self.terrain.append(t)
-
-            elif state==STAIRS and oneshot:
-                stair_height = +1 if self.np_random.rand() > 0.5 else -1
-                stair_width = self.np_random.randint(4, 5)
-                stair_steps = self.np_random.randint(3, 5)
-                original_y = y
-                for s in range(stair_steps):
-                    poly = [
-                        (x+(    s*stair_width)*TERRAIN_STEP, y+(   s*stair_height)*TERRAIN_STEP),
-                        (x+((1+s)*stair_width)*TERRAIN_STEP, y+(   s*stair_height)*TERRAIN_STEP),
-                        (x+((1+s)*stair_width)*TERRAIN_STEP, y+(-1+s*stair_height)*TERRAIN_STEP),
-                        (x+(    s*stair_width)*TERRAIN_STEP, y+(-1+s*stair_height)*TERRAIN_STEP),
-                        ]
-                    t = self.world.CreateStaticBody(
-                        fixtures = fixtureDef(
-                            shape=polygonShape(vertices=poly),
-                            friction = FRICTION
-                        ))
-                    t.color1, t.color2 = (1,1,1), (0.6,0.6,0.6)
-                    self.terrain.append(t)
-                counter = stair_steps*stair_width
-
-            elif state==STAIRS and not oneshot:
-                s = stair_steps*stair_width - counter - stair_height
-                n = s/stair_width
-                y = original_y + (n*stair_height)*TERRAIN_STEP
-
-            oneshot = False
-            self.terrain_y.append(y)
-            counter -= 1
-            if counter==0:
-                counter = self.np_random.randint(TERRAIN_GRASS/2, TERRAIN_GRASS)
-                if state==GRASS and hardcore:
-                    state = self.np_random.randint(1, _STATES_)
-                    oneshot = True
-                else:
-                    state = GRASS
-                    oneshot = True
+        cache = self.terrain_cache
+        if cache is None:
+            terrain = generate_terrain(self.np_random, hardcore)
+        else:
+            terrain = cache.get(self.np_random, hardcore)
+        self.terrain_x, self.terrain_y, obstacles = terrain
+
+        self.terrain = []
+        for poly in obstacles:
+            t = self.world.CreateStaticBody(
+                fixtures = fixtureDef(
+                    shape=polygonShape(vertices=poly),
+                    friction = FRICTION
+                ))
+            t.color1, t.color2 = (1,1,1), (0.6,0.6,0.6)
+            self.terrain.append(t)
 
         self.terrain_poly = []
         for i in range(TERRAIN_LENGTH-1):
@@ -348,13 +437,24 @@ class BipedalWalker(gym.Env):
         self.drawlist = self.terrain + self.legs + [self.hull]
 
         class LidarCallback(Box2D.b2.rayCastCallback):
+            dynamic_only = False
             def ReportFixture(self, fixture, point, normal, fraction):
                 if (fixture.filterData.categoryBits & 1) == 0:
                     return 1
+                if self.dynamic_only and fixture.body.type == Box2D.b2_staticBody:
+                    return 1
                 self.p2 = point
                 self.fraction = fraction
                 return 0
-        self.lidar = [LidarCallback() for _ in range(10)]
+        self.lidar = [LidarCallback() for _ in range(LIDAR_RAYS)]
+
+        # The terrain never moves, so its edges are collected once per reset.
+        # Box2D is still asked about any dynamic body the lidar can see.
+        self._static_lidar = StaticLidar(self.terrain, LIDAR_DELTAS)
+        self._lidar_dynamic = any(
+            (f.filterData.categoryBits & 1) != 0
+            for body in self.world.bodies if body.type != Box2D.b2_staticBody
+            for f in body.fixtures)
 
         return self._step(np.array([0,0,0,0]))[0]
 
@@ -381,32 +481,24 @@ class BipedalWalker(gym.Env):
         pos = self.hull.position
         vel = self.hull.linearVelocity
 
-        for i in range(10):
-            self.lidar[i].fraction = 1.0
-            self.lidar[i].p1 = pos
-            self.lidar[i].p2 = (
-                pos[0] + math.sin(1.5*i/10.0)*LIDAR_RANGE,
-                pos[1] - math.cos(1.5*i/10.0)*LIDAR_RANGE)
-            self.world.RayCast(self.lidar[i], self.lidar[i].p1, self.lidar[i].p2)
-
-        state = [
-            self.hull.angle,        # Normal angles up to 0.5 here, but sure more is possible.
-            2.0*self.hull.angularVelocity/FPS,
-            0.3*vel.x*(VIEWPORT_W/SCALE)/FPS,  # Normalized to get -1..1 range
-            0.3*vel.y*(VIEWPORT_H/SCALE)/FPS,
-            self.joints[0].angle,   # This will give 1.1 on high up, but it's still OK (and there should be spikes on hiting the ground, that's normal too)
-            self.joints[0].speed / SPEED_HIP,
-            self.joints[1].angle + 1.0,
-            self.joints[1].speed / SPEED_KNEE,
-            1.0 if self.legs[1].ground_contact else 0.0,
-            self.joints[2].angle,
-            self.joints[2].speed / SPEED_HIP,
-            self.joints[3].angle + 1.0,
-            self.joints[3].speed / SPEED_KNEE,
-            1.0 if self.legs[3].ground_contact else 0.0
-            ]
-        state += [l.fraction for l in self.lidar]
-        assert len(state)==24
+        self._cast_lidar(pos)
+
+        state = self._state
+        state[0]  = self.hull.angle        # Normal angles up to 0.5 here, but sure more is possible.
+        state[1]  = 2.0*self.hull.angularVelocity/FPS
+        state[2]  = 0.3*vel.x*(VIEWPORT_W/SCALE)/FPS  # Normalized to get -1..1 range
+        state[3]  = 0.3*vel.y*(VIEWPORT_H/SCALE)/FPS
+        state[4]  = self.joints[0].angle   # This will give 1.1 on high up, but it's still OK (and there should be spikes on hiting the ground, that's normal too)
+        state[5]  = self.joints[0].speed / SPEED_HIP
+        state[6]  = self.joints[1].angle + 1.0
+        state[7]  = self.joints[1].speed / SPEED_KNEE
+        state[8]  = 1.0 if self.legs[1].ground_contact else 0.0
+        state[9]  = self.joints[2].angle
+        state[10] = self.joints[2].speed / SPEED_HIP
+        state[11] = self.joints[3].angle + 1.0
+        state[12] = self.joints[3].speed / SPEED_KNEE
+        state[13] = 1.0 if self.legs[3].ground_contact else 0.0
+        state[14:] = self._lidar_fractions
 
         self.scroll = pos.x - VIEWPORT_W/SCALE/5
 
@@ -428,7 +520,26 @@ class BipedalWalker(gym.Env):
             done   = True
         if pos[0] > (TERRAIN_LENGTH-TERRAIN_GRASS)*TERRAIN_STEP:
             done   = True
-        return np.array(state), reward, done, {}
+        return state.copy(), reward, done, {}
+
+    def _cast_lidar(self, pos):
+        origin = np.array([pos[0], pos[1]])
+        if self.batched_lidar:
+            self._static_lidar.fractions(origin, out=self._lidar_fractions)
+        else:
+            self._lidar_fractions.fill(1.0)
+
+        for i, l in enumerate(self.lidar):
+            l.p1 = pos
+            l.p2 = tuple(origin + self._lidar_fractions[i]*LIDAR_DELTAS[i])
+            l.fraction = 1.0
+            if self._lidar_fractions[i] > 0 and (self._lidar_dynamic or not self.batched_lidar):
+                # After a batched cast, Box2D only needs to look for dynamic
+                # bodies closer than the terrain hit
+                l.dynamic_only = self.batched_lidar
+                self.world.RayCast(l, l.p1, l.p2)
+            self._lidar_fractions[i] *= l.fraction
+            l.fraction = self._lidar_fractions[i]
 
     def _render(self, mode='human', close=False):
         if close:
@@ -489,6 +600,12 @@ class BipedalWalker(gym.Env):
 class BipedalWalkerHardcore(BipedalWalker):
     hardcore = True
 
+class BipedalWalkerBatchedLidar(BipedalWalker):
+    batched_lidar = True
+
+class BipedalWalkerHardcoreBatchedLidar(BipedalWalkerHardcore):
+    batched_lidar = True
+
 if __name__=="__main__":
     # Heurisic: suboptimal, have no notion of balance.
     env = BipedalWalker()
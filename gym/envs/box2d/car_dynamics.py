@@ -1,5 +1,6 @@
 import numpy as np
 import math
+import collections
 import Box2D
 from Box2D.b2 import (edgeShape, circleShape, fixtureDef, polygonShape, revoluteJointDef, contactListener, shape)
 
@@ -46,6 +47,11 @@ WHEEL_COLOR = (0.0,0.0,0.0)
 WHEEL_WHITE = (0.3,0.3,0.3)
 MUD_COLOR   = (0.4,0.4,0.0)
 
+MAX_PARTICLES = 30  # skid marks kept for drawing
+
+class Particle:
+    pass
+
 class Car:
     def __init__(self, world, init_angle, init_x, init_y):
         self.world = world
@@ -104,7 +110,10 @@ class Car:
             w.userData = w
             self.wheels.append(w)
         self.drawlist =  self.wheels + [self.hull]
-        self.particles = []
+        # Skid marks, only drawn by draw(). Set particles_enabled to False
+        # to skip creating them when nothing is drawn.
+        self.particles = collections.deque(maxlen=MAX_PARTICLES)
+        self.particles_enabled = True
 
     def gas(self, gas):
         'control: rear wheel drive'
@@ -223,16 +232,15 @@ class Car:
                 viewer.draw_polygon([trans*v for v in white_poly], color=WHEEL_WHITE)
 
     def _create_particle(self, point1, point2, grass):
-        class Particle:
-            pass
+        if not self.particles_enabled:
+            return None
         p = Particle()
         p.color = WHEEL_COLOR if not grass else MUD_COLOR
         p.ttl = 1
         p.poly = [(point1[0],point1[1]), (point2[0],point2[1])]
         p.grass = grass
+        # The deque drops the oldest particles beyond MAX_PARTICLES
         self.particles.append(p)
-        while len(self.particles) > 30:
-            self.particles.pop(0)
         return p
 
     def destroy(self):
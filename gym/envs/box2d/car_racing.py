@@ -9,9 +9,13 @@ from gym import spaces
 from gym.envs.box2d.car_dynamics import Car
 from gym.envs.classic_control import rendering
 from gym.utils import colorize, seeding
+from gym.utils.geometry_cache import GeometryCache
 
-import pyglet
-from pyglet.gl import *
+# Only needed by the OpenGL renderer. state_pixels observations can be
+# rendered without it, see StatePixelsRenderer.
+if rendering.pyglet is not None:
+    import pyglet
+    from pyglet.gl import *
 
 # Easiest continuous control task to learn from pixels, a top-down racing environment.
 # Discreet control is reasonable in this environment as well, on/off discretisation is
@@ -62,6 +66,245 @@ BORDER = 8/SCALE
 BORDER_MIN_COUNT = 4
 
 ROAD_COLOR = [0.4, 0.4, 0.4]
+GRASS_COLOR = (0.4, 0.8, 0.4)
+GRASS_LIGHT_COLOR = (0.4, 0.9, 0.4)
+
+ROAD_MAP_RESOLUTION = 2.0  # pixels per unit, about 1.5x the resolution of state_pixels
+
+def _try_generate_track(np_random):
+    """One attempt at generate_track; returns None if the track fails to
+    close."""
+    CHECKPOINTS = 12
+
+    # Create checkpoints
+    checkpoints = []
+    for c in range(CHECKPOINTS):
+        alpha = 2*math.pi*c/CHECKPOINTS + np_random.uniform(0, 2*math.pi*1/CHECKPOINTS)
+        rad = np_random.uniform(TRACK_RAD/3, TRACK_RAD)
+        if c==0:
+            alpha = 0
+            rad = 1.5*TRACK_RAD
+        if c==CHECKPOINTS-1:
+            alpha = 2*math.pi*c/CHECKPOINTS
+            start_alpha = 2*math.pi*(-0.5)/CHECKPOINTS
+            rad = 1.5*TRACK_RAD
+        checkpoints.append( (alpha, rad*math.cos(alpha), rad*math.sin(alpha)) )
+
+    #print "\n".join(str(h) for h in checkpoints)
+
+    # Go from one checkpoint to another to create track
+    x, y, beta = 1.5*TRACK_RAD, 0, 0
+    dest_i = 0
+    laps = 0
+    track = []
+    no_freeze = 2500
+    visited_other_side = False
+    while 1:
+        alpha = math.atan2(y, x)
+        if visited_other_side and alpha > 0:
+            laps += 1
+            visited_other_side = False
+        if alpha < 0:
+            visited_other_side = True
+            alpha += 2*math.pi
+        while True: # Find destination from checkpoints
+            failed = True
+            while True:
+                dest_alpha, dest_x, dest_y = checkpoints[dest_i % len(checkpoints)]
+                if alpha <= dest_alpha:
+                    failed = False
+                    break
+                dest_i += 1
+                if dest_i % len(checkpoints) == 0: break
+            if not failed: break
+            alpha -= 2*math.pi
+            continue
+        r1x = math.cos(beta)
+        r1y = math.sin(beta)
+        p1x = -r1y
+        p1y = r1x
+        dest_dx = dest_x - x  # vector towards destination
+        dest_dy = dest_y - y
+        proj = r1x*dest_dx + r1y*dest_dy  # destination vector projected on rad
+        while beta - alpha >  1.5*math.pi: beta -= 2*math.pi
+        while beta - alpha < -1.5*math.pi: beta += 2*math.pi
+        prev_beta = beta
+        proj *= SCALE
+        if proj >  0.3: beta -= min(TRACK_TURN_RATE, abs(0.001*proj))
+        if proj < -0.3: beta += min(TRACK_TURN_RATE, abs(0.001*proj))
+        x += p1x*TRACK_DETAIL_STEP
+        y += p1y*TRACK_DETAIL_STEP
+        track.append( (alpha,prev_beta*0.5 + beta*0.5,x,y) )
+        if laps > 4: break
+        no_freeze -= 1
+        if no_freeze==0: break
+    #print "\n".join([str(t) for t in enumerate(track)])
+
+    # Find closed loop range i1..i2, first loop should be ignored, second is OK
+    i1, i2 = -1, -1
+    i = len(track)
+    while True:
+        i -= 1
+        if i==0: return None  # Failed
+        pass_through_start = track[i][0] > start_alpha and track[i-1][0] <= start_alpha
+        if pass_through_start and i2==-1:
+            i2 = i
+        elif pass_through_start and i1==-1:
+            i1 = i
+            break
+    print("Track generation: %i..%i -> %i-tiles track" % (i1, i2, i2-i1))
+    assert i1!=-1
+    assert i2!=-1
+
+    track = track[i1:i2-1]
+
+    first_beta = track[0][1]
+    first_perp_x = math.cos(first_beta)
+    first_perp_y = math.sin(first_beta)
+    # Length of perpendicular jump to put together head and tail
+    well_glued_together = np.sqrt(
+        np.square( first_perp_x*(track[0][2] - track[-1][2]) ) +
+        np.square( first_perp_y*(track[0][3] - track[-1][3]) ))
+    if well_glued_together > TRACK_DETAIL_STEP:
+        return None
+
+    # Red-white border on hard turns
+    border = [False]*len(track)
+    for i in range(len(track)):
+        good = True
+        oneside = 0
+        for neg in range(BORDER_MIN_COUNT):
+            beta1 = track[i-neg-0][1]
+            beta2 = track[i-neg-1][1]
+            good &= abs(beta1 - beta2) > TRACK_TURN_RATE*0.2
+            oneside += np.sign(beta1 - beta2)
+        good &= abs(oneside) == BORDER_MIN_COUNT
+        border[i] = good
+    for i in range(len(track)):
+        for neg in range(BORDER_MIN_COUNT):
+            border[i-neg] |= border[i]
+
+    # Tile and border polygons
+    tiles = []
+    borders = []
+    for i in range(len(track)):
+        alpha1, beta1, x1, y1 = track[i]
+        alpha2, beta2, x2, y2 = track[i-1]
+        road1_l = (x1 - TRACK_WIDTH*math.cos(beta1), y1 - TRACK_WIDTH*math.sin(beta1))
+        road1_r = (x1 + TRACK_WIDTH*math.cos(beta1), y1 + TRACK_WIDTH*math.sin(beta1))
+        road2_l = (x2 - TRACK_WIDTH*math.cos(beta2), y2 - TRACK_WIDTH*math.sin(beta2))
+        road2_r = (x2 + TRACK_WIDTH*math.cos(beta2), y2 + TRACK_WIDTH*math.sin(beta2))
+        tiles.append([road1_l, road1_r, road2_r, road2_l])
+        if border[i]:
+            side = np.sign(beta2 - beta1)
+            b1_l = (x1 + side* TRACK_WIDTH        *math.cos(beta1), y1 + side* TRACK_WIDTH        *math.sin(beta1))
+            b1_r = (x1 + side*(TRACK_WIDTH+BORDER)*math.cos(beta1), y1 + side*(TRACK_WIDTH+BORDER)*math.sin(beta1))
+            b2_l = (x2 + side* TRACK_WIDTH        *math.cos(beta2), y2 + side* TRACK_WIDTH        *math.sin(beta2))
+            b2_r = (x2 + side*(TRACK_WIDTH+BORDER)*math.cos(beta2), y2 + side*(TRACK_WIDTH+BORDER)*math.sin(beta2))
+            borders.append(([b1_l, b1_r, b2_r, b2_l], (1,1,1) if i%2==0 else (1,0,0)))
+        else:
+            borders.append(None)
+    return start_alpha, track, tiles, borders
+
+def generate_track(np_random):
+    """Draws a closed track from np_random, retrying until one closes.
+    Returns (start_alpha, track, tiles, borders): the angle of the start
+    line, (alpha, beta, x, y) for every tile, the tile polygons, and for
+    every tile either None or the (polygon, color) of its border."""
+    while True:
+        result = _try_generate_track(np_random)
+        if result is not None:
+            return result
+        print("retry to generate track (normal if there are not many of this messages)")
+
+_GRASS_PIXEL = np.round(np.array(GRASS_COLOR)*255).astype(np.uint8)
+_LIGHT_GRASS_PIXEL = np.round(np.array(GRASS_LIGHT_COLOR)*255).astype(np.uint8)
+
+def _background(x, y):
+    """The colors of the grass (or of nothing, outside of PLAYFIELD) at
+    world coordinates x and y, as drawn by CarRacing._render_road."""
+    k = PLAYFIELD/20.0
+    i = np.floor(x/k)
+    j = np.floor(y/k)
+    light = (i % 2 == 0) & (j % 2 == 0) & (i >= -20) & (i < 20) & (j >= -20) & (j < 20)
+    colors = np.where(light[..., None], _LIGHT_GRASS_PIXEL, _GRASS_PIXEL)
+    colors[(np.abs(x) > PLAYFIELD) | (np.abs(y) > PLAYFIELD)] = 0
+    return colors
+
+
+class StatePixelsRenderer(object):
+    """
+    Renders state_pixels observations with NumPy, without a window or
+    OpenGL.
+
+    The grass and road of a track never move, so they are rasterized once
+    into a map covering the track, at ROAD_MAP_RESOLUTION. Each frame then
+    only samples the map at the world position of every pixel under the
+    camera transform, and rasterizes the car and the indicators on top.
+    Tiles whose color changes when visited are repainted into the map.
+
+    Unlike the OpenGL renderer, the score is not drawn.
+    """
+
+    def __init__(self, road_poly):
+        res = ROAD_MAP_RESOLUTION
+        vertices = np.array([p for poly, _ in road_poly for p in poly])
+        x0, y0 = vertices.min(axis=0) - 1
+        x1, y1 = vertices.max(axis=0) + 1
+        width = int(math.ceil((x1 - x0)*res))
+        height = int(math.ceil((y1 - y0)*res))
+        self.left = x0
+        self.top = y0 + height/res
+
+        self.map = rendering.Canvas(width, height)
+        x = x0 + (np.arange(width) + 0.5)/res
+        y = self.top - (np.arange(height) + 0.5)/res
+        self.map.pixels[...] = _background(*np.meshgrid(x, y))
+        self.map.transform((-x0*res, -y0*res), 0, (res, res))
+        for poly, color in road_poly:
+            self.repaint(poly, color)
+
+        # Collects the geoms of the car, like the Viewer it is drawn with
+        # in the other modes
+        self.viewer = rendering.Viewer(STATE_W, STATE_H, backend='software')
+        self._x, self._y = np.meshgrid(np.arange(STATE_W) + 0.5, np.arange(STATE_H) + 0.5)
+
+    def repaint(self, poly, color):
+        self.map.color = color
+        self.map.fill_polygon(poly)
+
+    def render(self, transform, indicators):
+        """Draws the road and the geoms in self.viewer under transform, and
+        the (color, quad) indicators in window coordinates."""
+        canvas = self.viewer.canvas
+        canvas.push_matrix()
+        # Like glViewport, squeezes the window into STATE_W x STATE_H
+        canvas.transform((0, 0), 0, (float(STATE_W)/WINDOW_W, float(STATE_H)/WINDOW_H))
+
+        transform.enable_raster(canvas)
+        self._draw_road(canvas)
+        for geom in self.viewer.onetime_geoms:
+            geom.rasterize(canvas)
+        transform.disable_raster(canvas)
+        self.viewer.onetime_geoms = []
+
+        for color, quad in indicators:
+            canvas.color = color
+            canvas.fill_polygon(quad)
+        canvas.pop_matrix()
+        return canvas.pixels.copy()
+
+    def _draw_road(self, canvas):
+        x, y = canvas.unproject(self._x, self._y)
+        res = ROAD_MAP_RESOLUTION
+        col = np.floor((x - self.left)*res).astype(int)
+        row = np.floor((self.top - y)*res).astype(int)
+        height, width = self.map.pixels.shape[:2]
+        on_map = (col >= 0) & (col < width) & (row >= 0) & (row < height)
+        canvas.pixels[on_map] = self.map.pixels[row[on_map], col[on_map]]
+        off_map = ~on_map
+        if off_map.any():
+            canvas.pixels[off_map] = _background(x[off_map], y[off_map])
 
 class FrictionDetector(contactListener):
     def __init__(self, env):
@@ -84,9 +327,12 @@ class FrictionDetector(contactListener):
             obj  = u1
         if not tile: return
 
-        tile.color[0] = ROAD_COLOR[0]
-        tile.color[1] = ROAD_COLOR[1]
-        tile.color[2] = ROAD_COLOR[2]
+        if tile.color != ROAD_COLOR:
+            tile.color[0] = ROAD_COLOR[0]
+            tile.color[1] = ROAD_COLOR[1]
+            tile.color[2] = ROAD_COLOR[2]
+            if self.env.state_renderer is not None:
+                self.env.state_renderer.repaint(tile.poly, tile.color)
         if not obj or "tiles" not in obj.__dict__: return
         if begin:
             obj.tiles.add(tile)
@@ -105,6 +351,17 @@ class CarRacing(gym.Env):
         'video.frames_per_second' : FPS
     }
 
+    # Tracks already generated from the same np_random state are reused.
+    # Set to None to always generate.
+    track_cache = GeometryCache(generate_track)
+    # Render state_pixels observations with StatePixelsRenderer rather
+    # than OpenGL, which needs a window. Its frames differ slightly (see
+    # StatePixelsRenderer), so it is only on in CarRacingSoftware.
+    software_state_pixels = False
+    # Skid marks are only drawn in human and rgb_array modes. Set to False
+    # to skip creating them while the env has no viewer, e.g. when training.
+    headless_particles = True
+
     def __init__(self):
         self._seed()
         self.contactListener_keepref = FrictionDetector(self)
@@ -114,6 +371,7 @@ class CarRacing(gym.Env):
         self.invisible_video_window = None
         self.road = None
         self.car = None
+        self.state_renderer = None
         self.reward = 0.0
         self.prev_reward = 0.0
 
@@ -132,130 +390,18 @@ class CarRacing(gym.Env):
         self.car.destroy()
 
     def _create_track(self):
-        CHECKPOINTS = 12
-
-        # Create checkpoints
-        checkpoints = []
-        for c in range(CHECKPOINTS):
-            alpha = 2*math.pi*c/CHECKPOINTS + self.np_random.uniform(0, 2*math.pi*1/CHECKPOINTS)
-            rad = self.np_random.uniform(TRACK_RAD/3, TRACK_RAD)
-            if c==0:
-                alpha = 0
-                rad = 1.5*TRACK_RAD
-            if c==CHECKPOINTS-1:
-                alpha = 2*math.pi*c/CHECKPOINTS
-                self.start_alpha = 2*math.pi*(-0.5)/CHECKPOINTS
-                rad = 1.5*TRACK_RAD
-            checkpoints.append( (alpha, rad*math.cos(alpha), rad*math.sin(alpha)) )
-
-        #print "\n".join(str(h) for h in checkpoints)
-        #self.road_poly = [ (    # uncomment this to see checkpoints
-        #    [ (tx,ty) for a,tx,ty in checkpoints ],
-        #    (0.7,0.7,0.9) ) ]
-        self.road = []
-
-        # Go from one checkpoint to another to create track
-        x, y, beta = 1.5*TRACK_RAD, 0, 0
-        dest_i = 0
-        laps = 0
-        track = []
-        no_freeze = 2500
-        visited_other_side = False
-        while 1:
-            alpha = math.atan2(y, x)
-            if visited_other_side and alpha > 0:
-                laps += 1
-                visited_other_side = False
-            if alpha < 0:
-                visited_other_side = True
-                alpha += 2*math.pi
-            while True: # Find destination from checkpoints
-                failed = True
-                while True:
-                    dest_alpha, dest_x, dest_y = checkpoints[dest_i % len(checkpoints)]
-                    if alpha <= dest_alpha:
-                        failed = False
-                        break
-                    dest_i += 1
-                    if dest_i % len(checkpoints) == 0: break
-                if not failed: break
-                alpha -= 2*math.pi
-                continue
-            r1x = math.cos(beta)
-            r1y = math.sin(beta)
-            p1x = -r1y
-            p1y = r1x
-            dest_dx = dest_x - x  # vector towards destination
-            dest_dy = dest_y - y
-            proj = r1x*dest_dx + r1y*dest_dy  # destination vector projected on rad
-            while beta - alpha >  1.5*math.pi: beta -= 2*math.pi
-            while beta - alpha < -1.5*math.pi: beta += 2*math.pi
-            prev_beta = beta
-            proj *= SCALE
-            if proj >  0.3: beta -= min(TRACK_TURN_RATE, abs(0.001*proj))
-            if proj < -0.3: beta += min(TRACK_TURN_RATE, abs(0.001*proj))
-            x += p1x*TRACK_DETAIL_STEP
-            y += p1y*TRACK_DETAIL_STEP
-            track.append( (alpha,prev_beta*0.5 + beta*0.5,x,y) )
-            if laps > 4: break
-            no_freeze -= 1
-            if no_freeze==0: break
-        #print "\n".join([str(t) for t in enumerate(track)])
-
-        # Find closed loop range i1..i2, first loop should be ignored, second is OK
-        i1, i2 = -1, -1
-        i = len(track)
-        while True:
-            i -= 1
-            if i==0: return False  # Failed
-            pass_through_start = track[i][0] > self.start_alpha and track[i-1][0] <= self.start_alpha
-            if pass_through_start and i2==-1:
-                i2 = i
-            elif pass_through_start and i1==-1:
-                i1 = i
-                break
-        print("Track generation: %i..%i -> %i-tiles track" % (i1, i2, i2-i1))
-        assert i1!=-1
-        assert i2!=-1
-
-        track = track[i1:i2-1]
-
-        first_beta = track[0][1]
-        first_perp_x = math.cos(first_beta)
-        first_perp_y = math.sin(first_beta)
-        # Length of perpendicular jump to put together head and tail
-        well_glued_together = np.sqrt(
-            np.square( first_perp_x*(track[0][2] - track[-1][2]) ) +
-            np.square( first_perp_y*(track[0][3] - track[-1][3]) ))
-        if well_glued_together > TRACK_DETAIL_STEP:
-            return False
-
-        # Red-white border on hard turns
-        border = [False]*len(track)
-        for i in range(len(track)):
-            good = True
-            oneside = 0
-            for neg in range(BORDER_MIN_COUNT):
-                beta1 = track[i-neg-0][1]
-                beta2 = track[i-neg-1][1]
-                good &= abs(beta1 - beta2) > TRACK_TURN_RATE*0.2
-                oneside += np.sign(beta1 - beta2)
-            good &= abs(oneside) == BORDER_MIN_COUNT
-            border[i] = good
-        for i in range(len(track)):
-            for neg in range(BORDER_MIN_COUNT):
-                border[i-neg] |= border[i]
+        cache = self.track_cache
+        if cache is None:
+            geometry = generate_track(self.np_random)
+        else:
+            geometry = cache.get(self.np_random)
+        self.start_alpha, self.track, tiles, borders = geometry
 
         # Create tiles
-        for i in range(len(track)):
-            alpha1, beta1, x1, y1 = track[i]
-            alpha2, beta2, x2, y2 = track[i-1]
-            road1_l = (x1 - TRACK_WIDTH*math.cos(beta1), y1 - TRACK_WIDTH*math.sin(beta1))
-            road1_r = (x1 + TRACK_WIDTH*math.cos(beta1), y1 + TRACK_WIDTH*math.sin(beta1))
-            road2_l = (x2 - TRACK_WIDTH*math.cos(beta2), y2 - TRACK_WIDTH*math.sin(beta2))
-            road2_r = (x2 + TRACK_WIDTH*math.cos(beta2), y2 + TRACK_WIDTH*math.sin(beta2))
+        self.road = []
+        for i, poly in enumerate(tiles):
             t = self.world.CreateStaticBody( fixtures = fixtureDef(
-                shape=polygonShape(vertices=[road1_l, road1_r, road2_r, road2_l])
+                shape=polygonShape(vertices=poly)
                 ))
             t.userData = t
             c = 0.01*(i%3)
@@ -263,17 +409,11 @@ class CarRacing(gym.Env):
             t.road_visited = False
             t.road_friction = 1.0
             t.fixtures[0].sensor = True
-            self.road_poly.append(( [road1_l, road1_r, road2_r, road2_l], t.color ))
+            t.poly = poly
+            self.road_poly.append(( poly, t.color ))
             self.road.append(t)
-            if border[i]:
-                side = np.sign(beta2 - beta1)
-                b1_l = (x1 + side* TRACK_WIDTH        *math.cos(beta1), y1 + side* TRACK_WIDTH        *math.sin(beta1))
-                b1_r = (x1 + side*(TRACK_WIDTH+BORDER)*math.cos(beta1), y1 + side*(TRACK_WIDTH+BORDER)*math.sin(beta1))
-                b2_l = (x2 + side* TRACK_WIDTH        *math.cos(beta2), y2 + side* TRACK_WIDTH        *math.sin(beta2))
-                b2_r = (x2 + side*(TRACK_WIDTH+BORDER)*math.cos(beta2), y2 + side*(TRACK_WIDTH+BORDER)*math.sin(beta2))
-                self.road_poly.append(( [b1_l, b1_r, b2_r, b2_l], (1,1,1) if i%2==0 else (1,0,0) ))
-        self.track = track
-        return True
+            if borders[i] is not None:
+                self.road_poly.append(borders[i])
 
     def _reset(self):
         self._destroy()
@@ -283,11 +423,9 @@ class CarRacing(gym.Env):
         self.t = 0.0
         self.road_poly = []
         self.human_render = False
+        self.state_renderer = None
 
-        while True:
-            success = self._create_track()
-            if success: break
-            print("retry to generate track (normal if there are not many of this messages)")
+        self._create_track()
         self.car = Car(self.world, *self.track[0][1:4])
 
         return self._step(None)[0]
@@ -298,6 +436,7 @@ class CarRacing(gym.Env):
             self.car.gas(action[1])
             self.car.brake(action[2])
 
+        self.car.particles_enabled = self.headless_particles or self.viewer is not None
         self.car.step(1.0/FPS)
         self.world.Step(1.0/FPS, 6*30, 2*30)
         self.t += 1.0/FPS
@@ -329,8 +468,11 @@ class CarRacing(gym.Env):
                 self.viewer = None
             return
 
+        if mode == 'state_pixels' and self.software_state_pixels:
+            return self._render_state_pixels()
+
         if self.viewer is None:
-            self.viewer = rendering.Viewer(WINDOW_W, WINDOW_H)
+            self.viewer = rendering.Viewer(WINDOW_W, WINDOW_H, backend='pyglet')
             self.score_label = pyglet.text.Label('0000', font_size=36,
                 x=20, y=WINDOW_H*2.5/40.00, anchor_x='left', anchor_y='center',
                 color=(255,255,255,255))
@@ -338,20 +480,7 @@ class CarRacing(gym.Env):
 
         if "t" not in self.__dict__: return  # reset() not called yet
 
-        zoom = 0.1*SCALE*max(1-self.t, 0) + ZOOM*SCALE*min(self.t, 1)   # Animate zoom first second
-        zoom_state  = ZOOM*SCALE*STATE_W/WINDOW_W
-        zoom_video  = ZOOM*SCALE*VIDEO_W/WINDOW_W
-        scroll_x = self.car.hull.position[0]
-        scroll_y = self.car.hull.position[1]
-        angle = -self.car.hull.angle
-        vel = self.car.hull.linearVelocity
-        if np.linalg.norm(vel) > 0.5:
-            angle = math.atan2(vel[0], vel[1])
-        self.transform.set_scale(zoom, zoom)
-        self.transform.set_translation(
-            WINDOW_W/2 - (scroll_x*zoom*math.cos(angle) - scroll_y*zoom*math.sin(angle)),
-            WINDOW_H/4 - (scroll_x*zoom*math.sin(angle) + scroll_y*zoom*math.cos(angle)) )
-        self.transform.set_rotation(angle)
+        self._update_camera(self.transform)
 
         self.car.draw(self.viewer, mode!="state_pixels")
 
@@ -400,6 +529,31 @@ class CarRacing(gym.Env):
         self.viewer.onetime_geoms = []
         return arr
 
+    def _update_camera(self, transform):
+        zoom = 0.1*SCALE*max(1-self.t, 0) + ZOOM*SCALE*min(self.t, 1)   # Animate zoom first second
+        zoom_state  = ZOOM*SCALE*STATE_W/WINDOW_W
+        zoom_video  = ZOOM*SCALE*VIDEO_W/WINDOW_W
+        scroll_x = self.car.hull.position[0]
+        scroll_y = self.car.hull.position[1]
+        angle = -self.car.hull.angle
+        vel = self.car.hull.linearVelocity
+        if np.linalg.norm(vel) > 0.5:
+            angle = math.atan2(vel[0], vel[1])
+        transform.set_scale(zoom, zoom)
+        transform.set_translation(
+            WINDOW_W/2 - (scroll_x*zoom*math.cos(angle) - scroll_y*zoom*math.sin(angle)),
+            WINDOW_H/4 - (scroll_x*zoom*math.sin(angle) + scroll_y*zoom*math.cos(angle)) )
+        transform.set_rotation(angle)
+
+    def _render_state_pixels(self):
+        if "t" not in self.__dict__: return  # reset() not called yet
+        if self.state_renderer is None:
+            self.state_renderer = StatePixelsRenderer(self.road_poly)
+            self.state_transform = rendering.Transform()
+        self._update_camera(self.state_transform)
+        self.car.draw(self.state_renderer.viewer, False)
+        return self.state_renderer.render(self.state_transform, self._indicator_quads(WINDOW_W, WINDOW_H))
+
     def _render_road(self):
         glBegin(GL_QUADS)
         glColor4f(0.4, 0.8, 0.4, 1.0)
@@ -423,25 +577,30 @@ class CarRacing(gym.Env):
 
     def _render_indicators(self, W, H):
         glBegin(GL_QUADS)
+        for color, quad in self._indicator_quads(W, H):
+            glColor4f(color[0], color[1], color[2], 1)
+            for x, y in quad:
+                glVertex3f(x, y, 0)
+        glEnd()
+        self.score_label.text = "%04i" % self.reward
+        self.score_label.draw()
+
+    def _indicator_quads(self, W, H):
         s = W/40.0
         h = H/40.0
-        glColor4f(0,0,0,1)
-        glVertex3f(W, 0, 0)
-        glVertex3f(W, 5*h, 0)
-        glVertex3f(0, 5*h, 0)
-        glVertex3f(0, 0, 0)
+        quads = [((0,0,0), [(W, 0), (W, 5*h), (0, 5*h), (0, 0)])]
         def vertical_ind(place, val, color):
-            glColor4f(color[0], color[1], color[2], 1)
-            glVertex3f((place+0)*s, h + h*val, 0)
-            glVertex3f((place+1)*s, h + h*val, 0)
-            glVertex3f((place+1)*s, h, 0)
-            glVertex3f((place+0)*s, h, 0)
+            quads.append((color, [
+                ((place+0)*s, h + h*val),
+                ((place+1)*s, h + h*val),
+                ((place+1)*s, h),
+                ((place+0)*s, h)]))
         def horiz_ind(place, val, color):
-            glColor4f(color[0], color[1], color[2], 1)
-            glVertex3f((place+0)*s, 4*h , 0)
-            glVertex3f((place+val)*s, 4*h, 0)
-            glVertex3f((place+val)*s, 2*h, 0)
-            glVertex3f((place+0)*s, 2*h, 0)
+            quads.append((color, [
+                ((place+0)*s, 4*h),
+                ((place+val)*s, 4*h),
+                ((place+val)*s, 2*h),
+                ((place+0)*s, 2*h)]))
         true_speed = np.sqrt(np.square(self.car.hull.linearVelocity[0]) + np.square(self.car.hull.linearVelocity[1]))
         vertical_ind(5, 0.02*true_speed, (1,1,1))
         vertical_ind(7, 0.01*self.car.wheels[0].omega, (0.0,0,1)) # ABS sensors
@@ -450,9 +609,10 @@ class CarRacing(gym.Env):
         vertical_ind(10,0.01*self.car.wheels[3].omega, (0.2,0,1))
         horiz_ind(20, -10.0*self.car.wheels[0].joint.angle, (0,1,0))
         horiz_ind(30, -0.8*self.car.hull.angularVelocity, (1,0,0))
-        glEnd()
-        self.score_label.text = "%04i" % self.reward
-        self.score_label.draw()
+        return quads
+
+class CarRacingSoftware(CarRacing):
+    software_state_pixels = True
 
 
 if __name__=="__main__":
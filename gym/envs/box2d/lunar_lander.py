@@ -1,4 +1,5 @@
 import sys, math
+import collections
 import numpy as np
 
 import Box2D
@@ -77,6 +78,10 @@ class LunarLander(gym.Env):
     }
 
     continuous = False
+    # Engine particles are only decoration: they collide with the ground,
+    # but never with the lander or its legs. Set to False to skip them
+    # while the env has no viewer, e.g. when training.
+    headless_particles = True
 
     def __init__(self):
         self._seed()
@@ -85,7 +90,10 @@ class LunarLander(gym.Env):
         self.world = Box2D.b2World()
         self.moon = None
         self.lander = None
-        self.particles = []
+        self.particles = collections.deque()
+        # Expired particle bodies, deactivated and kept in the world for
+        # reuse by _create_particle, by mass
+        self._particle_pool = {}
 
         self.prev_reward = None
 
@@ -214,28 +222,44 @@ class LunarLander(gym.Env):
         return self._step(np.array([0,0]) if self.continuous else 0)[0]
 
     def _create_particle(self, mass, x, y, ttl):
-        p = self.world.CreateDynamicBody(
-            position = (x,y),
-            angle=0.0,
-            fixtures = fixtureDef(
-                shape=circleShape(radius=2/SCALE, pos=(0,0)),
-                density=mass,
-                friction=0.1,
-                categoryBits=0x0100,
-                maskBits=0x001,  # collide only with ground
-                restitution=0.3)
-                )
+        if self.viewer is None and not self.headless_particles:
+            return None
+        pool = self._particle_pool.get(mass)
+        if pool:
+            p = pool.pop()
+            p.SetTransform((x,y), 0.0)
+            p.linearVelocity = (0,0)
+            p.angularVelocity = 0.0
+            p.active = True
+            p.awake = True
+        else:
+            p = self.world.CreateDynamicBody(
+                position = (x,y),
+                angle=0.0,
+                fixtures = fixtureDef(
+                    shape=circleShape(radius=2/SCALE, pos=(0,0)),
+                    density=mass,
+                    friction=0.1,
+                    categoryBits=0x0100,
+                    maskBits=0x001,  # collide only with ground
+                    restitution=0.3)
+                    )
+            p.mass_key = mass
         p.ttl = ttl
         self.particles.append(p)
         self._clean_particles(False)
         return p
 
     def _clean_particles(self, all):
+        # Rather than destroyed, expired particles are deactivated (which
+        # removes them from collision and the solver) and pooled
         while self.particles and (all or self.particles[0].ttl<0):
-            self.world.DestroyBody(self.particles.pop(0))
+            p = self.particles.popleft()
+            p.active = False
+            self._particle_pool.setdefault(p.mass_key, []).append(p)
 
     def _step(self, action):
-        assert self.action_space.contains(action), "%r (%s) invalid " % (action,type(action))
+        assert self._contains(self.action_space, action), "%r (%s) invalid " % (action,type(action))
 
         # Engines
         tip  = (math.sin(self.lander.angle), math.cos(self.lander.angle))
@@ -254,7 +278,8 @@ class LunarLander(gym.Env):
             oy = -tip[1]*(4/SCALE + 2*dispersion[0]) - side[1]*dispersion[1]
             impulse_pos = (self.lander.position[0] + ox, self.lander.position[1] + oy)
             p = self._create_particle(3.5, impulse_pos[0], impulse_pos[1], m_power)    # particles are just a decoration, 3.5 is here to make particle speed adequate
-            p.ApplyLinearImpulse(           ( ox*MAIN_ENGINE_POWER*m_power,  oy*MAIN_ENGINE_POWER*m_power), impulse_pos, True)
+            if p is not None:
+                p.ApplyLinearImpulse(       ( ox*MAIN_ENGINE_POWER*m_power,  oy*MAIN_ENGINE_POWER*m_power), impulse_pos, True)
             self.lander.ApplyLinearImpulse( (-ox*MAIN_ENGINE_POWER*m_power, -oy*MAIN_ENGINE_POWER*m_power), impulse_pos, True)
 
         s_power = 0.0
@@ -271,7 +296,8 @@ class LunarLander(gym.Env):
             oy = -tip[1]*dispersion[0] - side[1]*(3*dispersion[1]+direction*SIDE_ENGINE_AWAY/SCALE)
             impulse_pos = (self.lander.position[0] + ox - tip[0]*17/SCALE, self.lander.position[1] + oy + tip[1]*SIDE_ENGINE_HEIGHT/SCALE)
             p = self._create_particle(0.7, impulse_pos[0], impulse_pos[1], s_power)
-            p.ApplyLinearImpulse(           ( ox*SIDE_ENGINE_POWER*s_power,  oy*SIDE_ENGINE_POWER*s_power), impulse_pos, True)
+            if p is not None:
+                p.ApplyLinearImpulse(       ( ox*SIDE_ENGINE_POWER*s_power,  oy*SIDE_ENGINE_POWER*s_power), impulse_pos, True)
             self.lander.ApplyLinearImpulse( (-ox*SIDE_ENGINE_POWER*s_power, -oy*SIDE_ENGINE_POWER*s_power), impulse_pos, True)
 
         self.world.Step(1.0/FPS, 6*30, 2*30)
@@ -334,7 +360,7 @@ class LunarLander(gym.Env):
         for p in self.sky_polys:
             self.viewer.draw_polygon(p, color=(0,0,0))
 
-        for obj in self.particles + self.drawlist:
+        for obj in list(self.particles) + self.drawlist:
             for f in obj.fixtures:
                 trans = f.body.transform
                 if type(f.shape) is circleShape:
@@ -1,6 +1,6 @@
-from gym.envs.classic_control.cartpole import CartPoleEnv
-from gym.envs.classic_control.mountain_car import MountainCarEnv
-from gym.envs.classic_control.continuous_mountain_car import Continuous_MountainCarEnv
-from gym.envs.classic_control.pendulum import PendulumEnv
-from gym.envs.classic_control.acrobot import AcrobotEnv
+from gym.envs.classic_control.cartpole import CartPoleEnv, CartPoleVectorEnv
+from gym.envs.classic_control.mountain_car import MountainCarEnv, MountainCarVectorEnv
+from gym.envs.classic_control.continuous_mountain_car import Continuous_MountainCarEnv, Continuous_MountainCarVectorEnv
+from gym.envs.classic_control.pendulum import PendulumEnv, PendulumVectorEnv
+from gym.envs.classic_control.acrobot import AcrobotEnv, AcrobotVectorEnv
 
@@ -1,6 +1,8 @@
 """classic Acrobot task"""
 from gym import core, spaces
 from gym.utils import seeding
+from gym.vector.batched_vector_env import BatchedVectorEnv
+import math
 import numpy as np
 from numpy import sin, cos, pi
 import time
@@ -204,6 +206,151 @@ class AcrobotEnv(core.Env):
 
         return self.viewer.render(return_rgb_array = mode=='rgb_array')
 
+class AcrobotVectorEnv(BatchedVectorEnv):
+    """AcrobotEnv for a batch of acrobots, held in a single (num_envs, 4)
+    state array.
+
+    Every step integrates all rows with one fused fourth-order
+    Runge-Kutta update (see `_rk4_step`) instead of calling `rk4()` with
+    a per-env derivative callback. The torque is the constant fifth
+    component of AcrobotEnv's augmented state, so it is passed alongside
+    the state columns rather than appended to them. With a single row
+    the same update runs on Python floats, which is much cheaper than
+    NumPy calls on length-1 arrays.
+
+    Trajectories match AcrobotEnv's for the same seeds up to floating
+    point rounding of the trigonometric functions.
+    """
+
+    dt = AcrobotEnv.dt
+    MAX_VEL_1 = AcrobotEnv.MAX_VEL_1
+    MAX_VEL_2 = AcrobotEnv.MAX_VEL_2
+    AVAIL_TORQUE = AcrobotEnv.AVAIL_TORQUE
+
+    torque_noise_max = 0.
+
+    #: use dynamics equations from the nips paper or the book
+    book_or_nips = "book"
+
+    def __init__(self, num_envs=1, auto_reset=True):
+        high = np.array([1.0, 1.0, 1.0, 1.0, self.MAX_VEL_1, self.MAX_VEL_2])
+        low = -high
+        self.observation_space = spaces.Box(low, high)
+        self.action_space = spaces.Discrete(3)
+        self._torques = np.array(self.AVAIL_TORQUE)
+
+        super(AcrobotVectorEnv, self).__init__(num_envs, auto_reset=auto_reset)
+        self.state = np.zeros((num_envs, 4))
+        self._reset()
+
+    def _reset_rows(self, rows):
+        for i in rows:
+            self.state[i] = self.np_randoms[i].uniform(low=-0.1, high=0.1, size=(4,))
+
+    def _step_batch(self, actions):
+        assert ((actions >= 0) & (actions < len(self.AVAIL_TORQUE))).all(), "%r invalid"%(actions,)
+        torque = self._torques[actions]
+
+        # Add noise to the force action
+        if self.torque_noise_max > 0:
+            torque = torque + [np_random.uniform(-self.torque_noise_max, self.torque_noise_max)
+                               for np_random in self.np_randoms]
+
+        book = self.book_or_nips != "nips"
+        if self.num_envs == 1:
+            return self._step_single(float(torque[0]), book)
+
+        ns = _rk4_step(self.state.T, torque, self.dt, book, np.cos, np.sin)
+        self.state[:, 0] = _wrap_array(ns[0], -pi, pi)
+        self.state[:, 1] = _wrap_array(ns[1], -pi, pi)
+        self.state[:, 2] = np.clip(ns[2], -self.MAX_VEL_1, self.MAX_VEL_1)
+        self.state[:, 3] = np.clip(ns[3], -self.MAX_VEL_2, self.MAX_VEL_2)
+
+        s = self.state
+        terminal = -np.cos(s[:, 0]) - np.cos(s[:, 1] + s[:, 0]) > 1.
+        rewards = np.where(terminal, 0., -1.)
+        return rewards, terminal
+
+    def _step_single(self, torque, book):
+        # Same update as _step_batch, on Python floats
+        ns = _rk4_step(self.state[0].tolist(), torque, self.dt, book, math.cos, math.sin)
+        ns[0] = wrap(ns[0], -pi, pi)
+        ns[1] = wrap(ns[1], -pi, pi)
+        ns[2] = bound(ns[2], -self.MAX_VEL_1, self.MAX_VEL_1)
+        ns[3] = bound(ns[3], -self.MAX_VEL_2, self.MAX_VEL_2)
+        self.state[0] = ns
+        terminal = -math.cos(ns[0]) - math.cos(ns[1] + ns[0]) > 1.
+        return np.array([0. if terminal else -1.]), np.array([terminal])
+
+    def _get_obs(self):
+        if self.num_envs == 1:
+            s0, s1, s2, s3 = self.state[0].tolist()
+            return np.array([[math.cos(s0), math.sin(s0), math.cos(s1), math.sin(s1), s2, s3]])
+
+        s = self.state
+        obs = np.empty((self.num_envs, 6))
+        np.cos(s[:, 0], out=obs[:, 0])
+        np.sin(s[:, 0], out=obs[:, 1])
+        np.cos(s[:, 1], out=obs[:, 2])
+        np.sin(s[:, 1], out=obs[:, 3])
+        obs[:, 4:] = s[:, 2:]
+        return obs
+
+def _dsdt(s, a, book, cos, sin):
+    """AcrobotEnv._dsdt on state columns (floats or arrays) `s` and
+    torque `a`, computed with the given cos/sin."""
+    m1 = AcrobotEnv.LINK_MASS_1
+    m2 = AcrobotEnv.LINK_MASS_2
+    l1 = AcrobotEnv.LINK_LENGTH_1
+    lc1 = AcrobotEnv.LINK_COM_POS_1
+    lc2 = AcrobotEnv.LINK_COM_POS_2
+    I1 = AcrobotEnv.LINK_MOI
+    I2 = AcrobotEnv.LINK_MOI
+    g = 9.8
+    theta1, theta2, dtheta1, dtheta2 = s
+    d1 = m1 * lc1 ** 2 + m2 * \
+        (l1 ** 2 + lc2 ** 2 + 2 * l1 * lc2 * cos(theta2)) + I1 + I2
+    d2 = m2 * (lc2 ** 2 + l1 * lc2 * cos(theta2)) + I2
+    phi2 = m2 * lc2 * g * cos(theta1 + theta2 - pi / 2.)
+    phi1 = - m2 * l1 * lc2 * dtheta2 ** 2 * sin(theta2) \
+           - 2 * m2 * l1 * lc2 * dtheta2 * dtheta1 * sin(theta2)  \
+        + (m1 * lc1 + m2 * l1) * g * cos(theta1 - pi / 2) + phi2
+    if book:
+        ddtheta2 = (a + d2 / d1 * phi1 - m2 * l1 * lc2 * dtheta1 ** 2 * sin(theta2) - phi2) \
+            / (m2 * lc2 ** 2 + I2 - d2 ** 2 / d1)
+    else:
+        ddtheta2 = (a + d2 / d1 * phi1 - phi2) / \
+            (m2 * lc2 ** 2 + I2 - d2 ** 2 / d1)
+    ddtheta1 = -(d2 * ddtheta2 + phi1) / d1
+    return (dtheta1, dtheta2, ddtheta1, ddtheta2)
+
+def _rk4_step(s, a, dt, book, cos, sin):
+    """A single rk4() step from 0 to dt of the acrobot dynamics, with
+    the stages written out per state column so that no intermediate
+    augmented state vectors are allocated."""
+    dt2 = dt / 2.0
+    k1 = _dsdt(s, a, book, cos, sin)
+    k2 = _dsdt([y + dt2 * k for y, k in zip(s, k1)], a, book, cos, sin)
+    k3 = _dsdt([y + dt2 * k for y, k in zip(s, k2)], a, book, cos, sin)
+    k4 = _dsdt([y + dt * k for y, k in zip(s, k3)], a, book, cos, sin)
+    return [y + dt / 6.0 * (q1 + 2 * q2 + 2 * q3 + q4)
+            for y, q1, q2, q3, q4 in zip(s, k1, k2, k3, k4)]
+
+def _wrap_array(x, m, M):
+    """wrap() for an array, subtracting or adding the range exactly as
+    often as the scalar version would."""
+    x = x.copy()
+    diff = M - m
+    above = x > M
+    while above.any():
+        x[above] -= diff
+        above = x > M
+    below = x < m
+    while below.any():
+        x[below] += diff
+        below = x < m
+    return x
+
 def wrap(x, m, M):
     """
     :param x: a scalar
@@ -8,6 +8,7 @@ import math
 import gym
 from gym import spaces
 from gym.utils import seeding
+from gym.vector.batched_vector_env import BatchedVectorEnv
 import numpy as np
 
 logger = logging.getLogger(__name__)
@@ -59,7 +60,7 @@ class CartPoleEnv(gym.Env):
         return [seed]
 
     def _step(self, action):
-        assert self.action_space.contains(action), "%r (%s) invalid"%(action, type(action))
+        assert self._contains(self.action_space, action), "%r (%s) invalid"%(action, type(action))
         state = self.state
         x, x_dot, theta, theta_dot = state
         force = self.force_mag if action==1 else -self.force_mag
@@ -147,3 +148,79 @@ class CartPoleEnv(gym.Env):
         self.poletrans.set_rotation(-x[2])
 
         return self.viewer.render(return_rgb_array = mode=='rgb_array')
+
+class CartPoleVectorEnv(BatchedVectorEnv):
+    """CartPoleEnv for a batch of carts, held in a single (num_envs, 4)
+    state array and advanced with one vectorized update per step.
+
+    For the same seeds the trajectories match CartPoleEnv's up to the
+    last bit of np.cos/np.sin versus math.cos/math.sin (a relative
+    difference below 1e-12 per step on current platforms).
+    """
+    def __init__(self, num_envs=1, auto_reset=True):
+        self.gravity = 9.8
+        self.masscart = 1.0
+        self.masspole = 0.1
+        self.total_mass = (self.masspole + self.masscart)
+        self.length = 0.5 # actually half the pole's length
+        self.polemass_length = (self.masspole * self.length)
+        self.force_mag = 10.0
+        self.tau = 0.02  # seconds between state updates
+
+        # Angle at which to fail the episode
+        self.theta_threshold_radians = 12 * 2 * math.pi / 360
+        self.x_threshold = 2.4
+
+        high = np.array([
+            self.x_threshold * 2,
+            np.finfo(np.float32).max,
+            self.theta_threshold_radians * 2,
+            np.finfo(np.float32).max])
+
+        self.action_space = spaces.Discrete(2)
+        self.observation_space = spaces.Box(-high, high)
+
+        super(CartPoleVectorEnv, self).__init__(num_envs, auto_reset=auto_reset)
+        self.state = np.zeros((num_envs, 4))
+        # -1 stands for CartPoleEnv's steps_beyond_done = None
+        self.steps_beyond_done = np.full(num_envs, -1, dtype=np.int64)
+        self._reset()
+
+    def _step_batch(self, actions):
+        assert np.logical_or(actions == 0, actions == 1).all(), "%r invalid"%(actions,)
+        x, x_dot, theta, theta_dot = self.state.T
+        force = np.where(actions == 1, self.force_mag, -self.force_mag)
+        costheta = np.cos(theta)
+        sintheta = np.sin(theta)
+        temp = (force + self.polemass_length * theta_dot * theta_dot * sintheta) / self.total_mass
+        thetaacc = (self.gravity * sintheta - costheta* temp) / (self.length * (4.0/3.0 - self.masspole * costheta * costheta / self.total_mass))
+        xacc  = temp - self.polemass_length * thetaacc * costheta / self.total_mass
+        # Update the columns in place; the right-hand sides only read
+        # columns that have not been written yet.
+        self.state[:, 0] = x + self.tau * x_dot
+        self.state[:, 1] = x_dot + self.tau * xacc
+        self.state[:, 2] = theta + self.tau * theta_dot
+        self.state[:, 3] = theta_dot + self.tau * thetaacc
+        x, theta = self.state[:, 0], self.state[:, 2]
+        dones = (x < -self.x_threshold) \
+                | (x > self.x_threshold) \
+                | (theta < -self.theta_threshold_radians) \
+                | (theta > self.theta_threshold_radians)
+
+        already_done = dones & (self.steps_beyond_done >= 0)
+        if (self.steps_beyond_done[already_done] == 0).any():
+            logger.warn("You are calling 'step()' even though some rows of this environment have already returned done = True. You should always call 'reset()' once you receive 'done = True' -- any further steps are undefined behavior.")
+        self.steps_beyond_done[already_done] += 1
+        # Pole just fell!
+        self.steps_beyond_done[dones & ~already_done] = 0
+        rewards = np.where(already_done, 0.0, 1.0)
+
+        return rewards, dones
+
+    def _reset_rows(self, rows):
+        for i in rows:
+            self.state[i] = self.np_randoms[i].uniform(low=-0.05, high=0.05, size=(4,))
+        self.steps_beyond_done[rows] = -1
+
+    def _get_obs(self):
+        return self.state.copy()
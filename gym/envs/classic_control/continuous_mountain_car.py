@@ -17,6 +17,7 @@ import math
 import gym
 from gym import spaces
 from gym.utils import seeding
+from gym.vector.batched_vector_env import BatchedVectorEnv
 import numpy as np
 
 class Continuous_MountainCarEnv(gym.Env):
@@ -142,3 +143,53 @@ class Continuous_MountainCarEnv(gym.Env):
         self.cartrans.set_rotation(math.cos(3 * pos))
 
         return self.viewer.render(return_rgb_array = mode=='rgb_array')
+
+class Continuous_MountainCarVectorEnv(BatchedVectorEnv):
+    """Continuous_MountainCarEnv for a batch of cars, held in a single
+    (num_envs, 2) state array. Actions have shape (num_envs, 1)."""
+    def __init__(self, num_envs=1, auto_reset=True):
+        self.min_action = -1.0
+        self.max_action = 1.0
+        self.min_position = -1.2
+        self.max_position = 0.6
+        self.max_speed = 0.07
+        self.goal_position = 0.45 # was 0.5 in gym, 0.45 in Arnaud de Broissia's version
+        self.power = 0.0015
+
+        self.low_state = np.array([self.min_position, -self.max_speed])
+        self.high_state = np.array([self.max_position, self.max_speed])
+
+        self.action_space = spaces.Box(self.min_action, self.max_action, shape = (1,))
+        self.observation_space = spaces.Box(self.low_state, self.high_state)
+
+        super(Continuous_MountainCarVectorEnv, self).__init__(num_envs, auto_reset=auto_reset)
+        self.state = np.zeros((num_envs, 2))
+        self._reset()
+
+    def _step_batch(self, actions):
+        action = actions.reshape(self.num_envs, -1)[:, 0]
+
+        position, velocity = self.state.T
+        force = np.clip(action, -1.0, 1.0)
+
+        velocity = velocity + (force*self.power -0.0025 * np.cos(3*position))
+        velocity = np.clip(velocity, -self.max_speed, self.max_speed)
+        position = position + velocity
+        position = np.clip(position, self.min_position, self.max_position)
+        velocity[(position==self.min_position) & (velocity<0)] = 0
+
+        dones = position >= self.goal_position
+
+        rewards = np.where(dones, 100.0, 0.0)
+        rewards -= action**2*0.1
+
+        self.state[:, 0] = position
+        self.state[:, 1] = velocity
+        return rewards, dones
+
+    def _reset_rows(self, rows):
+        for i in rows:
+            self.state[i] = [self.np_randoms[i].uniform(low=-0.6, high=-0.4), 0]
+
+    def _get_obs(self):
+        return self.state.copy()
@@ -6,6 +6,7 @@ import math
 import gym
 from gym import spaces
 from gym.utils import seeding
+from gym.vector.batched_vector_env import BatchedVectorEnv
 import numpy as np
 
 class MountainCarEnv(gym.Env):
@@ -36,7 +37,7 @@ class MountainCarEnv(gym.Env):
         return [seed]
 
     def _step(self, action):
-        assert self.action_space.contains(action), "%r (%s) invalid" % (action, type(action))
+        assert self._contains(self.action_space, action), "%r (%s) invalid" % (action, type(action))
 
         position, velocity = self.state
         velocity += (action-1)*0.001 + math.cos(3*position)*(-0.0025)
@@ -117,3 +118,46 @@ class MountainCarEnv(gym.Env):
         self.cartrans.set_rotation(math.cos(3 * pos))
 
         return self.viewer.render(return_rgb_array = mode=='rgb_array')
+
+class MountainCarVectorEnv(BatchedVectorEnv):
+    """MountainCarEnv for a batch of cars, held in a single
+    (num_envs, 2) state array."""
+    def __init__(self, num_envs=1, auto_reset=True):
+        self.min_position = -1.2
+        self.max_position = 0.6
+        self.max_speed = 0.07
+        self.goal_position = 0.5
+
+        self.low = np.array([self.min_position, -self.max_speed])
+        self.high = np.array([self.max_position, self.max_speed])
+
+        self.action_space = spaces.Discrete(3)
+        self.observation_space = spaces.Box(self.low, self.high)
+
+        super(MountainCarVectorEnv, self).__init__(num_envs, auto_reset=auto_reset)
+        self.state = np.zeros((num_envs, 2))
+        self._reset()
+
+    def _step_batch(self, actions):
+        assert ((actions >= 0) & (actions < 3)).all(), "%r invalid" % (actions,)
+
+        position, velocity = self.state.T
+        velocity = velocity + ((actions-1)*0.001 + np.cos(3*position)*(-0.0025))
+        velocity = np.clip(velocity, -self.max_speed, self.max_speed)
+        position = position + velocity
+        position = np.clip(position, self.min_position, self.max_position)
+        velocity[(position==self.min_position) & (velocity<0)] = 0
+
+        dones = position >= self.goal_position
+        rewards = np.full(self.num_envs, -1.0)
+
+        self.state[:, 0] = position
+        self.state[:, 1] = velocity
+        return rewards, dones
+
+    def _reset_rows(self, rows):
+        for i in rows:
+            self.state[i] = [self.np_randoms[i].uniform(low=-0.6, high=-0.4), 0]
+
+    def _get_obs(self):
+        return self.state.copy()
@@ -1,6 +1,7 @@
 import gym
 from gym import spaces
 from gym.utils import seeding
+from gym.vector.batched_vector_env import BatchedVectorEnv
 import numpy as np
 from os import path
 
@@ -86,5 +87,49 @@ class PendulumEnv(gym.Env):
 
         return self.viewer.render(return_rgb_array = mode=='rgb_array')
 
+class PendulumVectorEnv(BatchedVectorEnv):
+    """PendulumEnv for a batch of pendulums, held in a single
+    (num_envs, 2) state array. Actions have shape (num_envs, 1)."""
+    def __init__(self, num_envs=1, auto_reset=True):
+        self.max_speed=8
+        self.max_torque=2.
+        self.dt=.05
+
+        high = np.array([1., 1., self.max_speed])
+        self.action_space = spaces.Box(low=-self.max_torque, high=self.max_torque, shape=(1,))
+        self.observation_space = spaces.Box(low=-high, high=high)
+
+        super(PendulumVectorEnv, self).__init__(num_envs, auto_reset=auto_reset)
+        self.state = np.zeros((num_envs, 2))
+        self._reset()
+
+    def _step_batch(self, u):
+        th, thdot = self.state.T # th := theta
+
+        g = 10.
+        m = 1.
+        l = 1.
+        dt = self.dt
+
+        u = np.clip(u.reshape(self.num_envs, -1)[:, 0], -self.max_torque, self.max_torque)
+        costs = angle_normalize(th)**2 + .1*thdot**2 + .001*(u**2)
+
+        newthdot = thdot + (-3*g/(2*l) * np.sin(th + np.pi) + 3./(m*l**2)*u) * dt
+        newth = th + newthdot*dt
+        newthdot = np.clip(newthdot, -self.max_speed, self.max_speed) #pylint: disable=E1111
+
+        self.state[:, 0] = newth
+        self.state[:, 1] = newthdot
+        return -costs, np.zeros(self.num_envs, dtype=np.bool_)
+
+    def _reset_rows(self, rows):
+        high = np.array([np.pi, 1])
+        for i in rows:
+            self.state[i] = self.np_randoms[i].uniform(low=-high, high=high)
+
+    def _get_obs(self):
+        theta, thetadot = self.state.T
+        return np.column_stack([np.cos(theta), np.sin(theta), thetadot])
+
 def angle_normalize(x):
     return (((x+np.pi) % (2*np.pi)) - np.pi)
@@ -11,24 +11,53 @@ if "Apple" in sys.version:
         os.environ['DYLD_FALLBACK_LIBRARY_PATH'] += ':/usr/lib'
         # (JDS 2016/04/15): avoid bug on Anaconda 2.3.0 / Yosemite
 
-from gym.utils import reraise
 from gym import error
 
+# pyglet and OpenGL are only needed by the 'pyglet' backend, so that the
+# 'software' backend works on machines without a display.
+_pyglet_error = None
 try:
     import pyglet
 except ImportError as e:
-    reraise(suffix="HINT: you can install pyglet directly via 'pip install pyglet'. But if you really just want to install all Gym dependencies and not have to think about it, 'pip install -e .[all]' or 'pip install gym[all]' will do it.")
-
-try:
-    from pyglet.gl import *
-except ImportError as e:
-    reraise(prefix="Error occured while running `from pyglet.gl import *`",suffix="HINT: make sure you have OpenGL install. On Ubuntu, you can run 'apt-get install python-opengl'. If you're running on a server, you may need a virtual frame buffer; something like this should work: 'xvfb-run -s \"-screen 0 1400x900x24\" python <your_script.py>'")
-
+    pyglet = None
+    _pyglet_error = "{} (HINT: you can install pyglet directly via 'pip install pyglet'. But if you really just want to install all Gym dependencies and not have to think about it, 'pip install -e .[all]' or 'pip install gym[all]' will do it.)".format(e)
+else:
+    try:
+        from pyglet.gl import *
+    except ImportError as e:
+        pyglet = None
+        _pyglet_error = "Error occured while running `from pyglet.gl import *`: {} (HINT: make sure you have OpenGL install. On Ubuntu, you can run 'apt-get install python-opengl'. If you're running on a server, you may need a virtual frame buffer; something like this should work: 'xvfb-run -s \"-screen 0 1400x900x24\" python <your_script.py>', or you can render without OpenGL with the 'software' backend.)".format(e)
+
+import logging
 import math
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 RAD2DEG = 57.29577951308232
 
+# 'pyglet' draws with OpenGL in a window. 'software' rasterizes into a
+# NumPy array with Canvas, and needs neither a display nor OpenGL; it
+# can only return frames (render(return_rgb_array=True)), not show them.
+BACKENDS = ('pyglet', 'software')
+_default_backend = os.environ.get('GYM_RENDER_BACKEND') or ('pyglet' if pyglet is not None else 'software')
+
+def set_default_backend(backend):
+    """Sets the backend of Viewers created without an explicit one, which is
+    how environments create theirs. Defaults to the GYM_RENDER_BACKEND
+    environment variable, or to 'pyglet' if it can be imported."""
+    global _default_backend
+    if backend not in BACKENDS:
+        raise error.Error('Invalid rendering backend {}: must be one of {}'.format(backend, BACKENDS))
+    _default_backend = backend
+
+def get_default_backend():
+    return _default_backend
+
+def _check_pyglet():
+    if pyglet is None:
+        raise error.DependencyNotInstalled(_pyglet_error)
+
 def get_display(spec):
     """Convert a display specification (such as :0) into an actual Display
     object.
@@ -43,22 +72,35 @@ def get_display(spec):
         raise error.Error('Invalid display specification: {}. (Must be a string like :0 or None.)'.format(spec))
 
 class Viewer(object):
-    def __init__(self, width, height, display=None):
-        display = get_display(display)
+    def __init__(self, width, height, display=None, backend=None):
+        if backend is None:
+            backend = _default_backend
+        if backend not in BACKENDS:
+            raise error.Error('Invalid rendering backend {}: must be one of {}'.format(backend, BACKENDS))
 
         self.width = width
         self.height = height
-        self.window = pyglet.window.Window(width=width, height=height, display=display)
-        self.window.on_close = self.window_closed_by_user
+        self.backend = backend
         self.geoms = []
         self.onetime_geoms = []
         self.transform = Transform()
 
+        if backend == 'software':
+            self.window = None
+            self.canvas = Canvas(width, height)
+            return
+
+        _check_pyglet()
+        display = get_display(display)
+        self.window = pyglet.window.Window(width=width, height=height, display=display)
+        self.window.on_close = self.window_closed_by_user
+
         glEnable(GL_BLEND)
         glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
 
     def close(self):
-        self.window.close()
+        if self.window is not None:
+            self.window.close()
 
     def window_closed_by_user(self):
         self.close()
@@ -78,6 +120,9 @@ class Viewer(object):
         self.onetime_geoms.append(geom)
 
     def render(self, return_rgb_array=False):
+        if self.backend == 'software':
+            return self._render_software(return_rgb_array)
+
         glClearColor(1,1,1,1)
         self.window.clear()
         self.window.switch_to()
@@ -105,6 +150,23 @@ class Viewer(object):
         self.onetime_geoms = []
         return arr
 
+    def _render_software(self, return_rgb_array):
+        arr = None
+        # There is no window to show anything in, so only draw when asked
+        # for the pixels
+        if return_rgb_array:
+            canvas = self.canvas
+            canvas.clear((1,1,1))
+            self.transform.enable_raster(canvas)
+            for geom in self.geoms:
+                geom.rasterize(canvas)
+            for geom in self.onetime_geoms:
+                geom.rasterize(canvas)
+            self.transform.disable_raster(canvas)
+            arr = canvas.pixels.copy()
+        self.onetime_geoms = []
+        return arr
+
     # Convenience
     def draw_circle(self, radius=10, res=30, filled=True, **attrs):
         geom = make_circle(radius=radius, res=res, filled=filled)
@@ -131,6 +193,8 @@ class Viewer(object):
         return geom
 
     def get_array(self):
+        if self.backend == 'software':
+            return self.canvas.pixels.copy()
         self.window.flip()
         image_data = pyglet.image.get_buffer_manager().get_color_buffer().get_image_data()
         self.window.flip()
@@ -156,6 +220,14 @@ class Geom(object):
             attr.disable()
     def render1(self):
         raise NotImplementedError
+    def rasterize(self, canvas):
+        for attr in reversed(self.attrs):
+            attr.enable_raster(canvas)
+        self.rasterize1(canvas)
+        for attr in self.attrs:
+            attr.disable_raster(canvas)
+    def rasterize1(self, canvas):
+        raise NotImplementedError
     def add_attr(self, attr):
         self.attrs.append(attr)
     def set_color(self, r, g, b):
@@ -166,6 +238,10 @@ class Attr(object):
         raise NotImplementedError
     def disable(self):
         pass
+    def enable_raster(self, canvas):
+        raise NotImplementedError
+    def disable_raster(self, canvas):
+        pass
 
 class Transform(Attr):
     def __init__(self, translation=(0.0, 0.0), rotation=0.0, scale=(1,1)):
@@ -179,6 +255,11 @@ class Transform(Attr):
         glScalef(self.scale[0], self.scale[1], 1)
     def disable(self):
         glPopMatrix()
+    def enable_raster(self, canvas):
+        canvas.push_matrix()
+        canvas.transform(self.translation, self.rotation, self.scale)
+    def disable_raster(self, canvas):
+        canvas.pop_matrix()
     def set_translation(self, newx, newy):
         self.translation = (float(newx), float(newy))
     def set_rotation(self, new):
@@ -191,6 +272,8 @@ class Color(Attr):
         self.vec4 = vec4
     def enable(self):
         glColor4f(*self.vec4)
+    def enable_raster(self, canvas):
+        canvas.color = self.vec4
 
 class LineStyle(Attr):
     def __init__(self, style):
@@ -200,12 +283,17 @@ class LineStyle(Attr):
         glLineStipple(1, self.style)
     def disable(self):
         glDisable(GL_LINE_STIPPLE)
+    def enable_raster(self, canvas):
+        # Canvas lines are always solid
+        pass
 
 class LineWidth(Attr):
     def __init__(self, stroke):
         self.stroke = stroke
     def enable(self):
         glLineWidth(self.stroke)
+    def enable_raster(self, canvas):
+        canvas.line_width = self.stroke
 
 class Point(Geom):
     def __init__(self):
@@ -214,6 +302,8 @@ class Point(Geom):
         glBegin(GL_POINTS) # draw point
         glVertex3f(0.0, 0.0, 0.0)
         glEnd()
+    def rasterize1(self, canvas):
+        canvas.draw_points([(0.0, 0.0)])
 
 class FilledPolygon(Geom):
     def __init__(self, v):
@@ -226,6 +316,10 @@ class FilledPolygon(Geom):
         for p in self.v:
             glVertex3f(p[0], p[1],0)  # draw each vertex
         glEnd()
+    def rasterize1(self, canvas):
+        # Like GL_TRIANGLES, GL_QUADS and GL_POLYGON, assumes a convex polygon
+        if len(self.v) >= 3:
+            canvas.fill_polygon(self.v)
 
 def make_circle(radius=10, res=30, filled=True):
     points = []
@@ -262,6 +356,9 @@ class Compound(Geom):
     def render1(self):
         for g in self.gs:
             g.render()
+    def rasterize1(self, canvas):
+        for g in self.gs:
+            g.rasterize(canvas)
 
 class PolyLine(Geom):
     def __init__(self, v, close):
@@ -275,6 +372,8 @@ class PolyLine(Geom):
         for p in self.v:
             glVertex3f(p[0], p[1],0)  # draw each vertex
         glEnd()
+    def rasterize1(self, canvas):
+        canvas.draw_polyline(self.v, self.close)
     def set_linewidth(self, x):
         self.linewidth.stroke = x
 
@@ -291,17 +390,204 @@ class Line(Geom):
         glVertex2f(*self.start)
         glVertex2f(*self.end)
         glEnd()
+    def rasterize1(self, canvas):
+        canvas.draw_polyline([self.start, self.end], False)
 
 class Image(Geom):
     def __init__(self, fname, width, height):
         Geom.__init__(self)
+        self.fname = fname
         self.width = width
         self.height = height
-        img = pyglet.image.load(fname)
-        self.img = img
+        self.img = pyglet.image.load(fname) if pyglet is not None else None
         self.flip = False
+        self._rgba = None
     def render1(self):
         self.img.blit(-self.width/2, -self.height/2, width=self.width, height=self.height)
+    def rasterize1(self, canvas):
+        if self._rgba is None:
+            self._rgba = _load_rgba(self.fname, self.img)
+        if self._rgba is not False:
+            canvas.draw_image(self._rgba, self.width, self.height)
+
+def _load_rgba(fname, img=None):
+    """Returns the pixels of an image file as a (height, width, 4) uint8
+    array, top row first, or False if neither pyglet nor PIL can load it."""
+    if img is not None:
+        data = img.get_image_data()
+        arr = np.frombuffer(data.get_data('RGBA', data.width*4), dtype=np.uint8)
+        # pyglet images are stored bottom row first
+        return arr.reshape(data.height, data.width, 4)[::-1]
+    try:
+        from PIL import Image as PILImage
+    except ImportError:
+        logger.warn('Not drawing image %s: loading images without pyglet requires PIL', fname)
+        return False
+    return np.asarray(PILImage.open(fname).convert('RGBA'))
+
+class Canvas(object):
+    """
+    An RGB image that Geoms are rasterized into with NumPy, for the
+    'software' Viewer backend. It keeps the same state the Attrs set on
+    OpenGL: a matrix stack, the current color and the line width.
+
+    Polygons are filled with a vectorized scanline pass: for every pixel
+    row, the crossings of its center with the polygon's edges give the
+    span of pixels whose centers are inside, as with OpenGL. Lines are
+    drawn as line_width-pixel-wide quads. There is no antialiasing.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.pixels = np.zeros((height, width, 3), dtype=np.uint8)
+        self.color = (0, 0, 0, 1.0)
+        self.line_width = 1
+        # Maps world to pixel coordinates. y is flipped, so that rows run
+        # top to bottom like those of the array returned by Viewer.render.
+        self._matrix = np.array([[1.0, 0.0, 0.0], [0.0, -1.0, float(height)], [0.0, 0.0, 1.0]])
+        self._stack = []
+
+    def clear(self, color):
+        color = _to_uint8(color)
+        if color[0] == color[1] == color[2]:
+            self.pixels.fill(color[0])
+        else:
+            # Much faster than broadcasting color over every pixel
+            self.pixels[0] = color
+            self.pixels[1:] = self.pixels[0]
+
+    def push_matrix(self):
+        self._stack.append(self._matrix)
+
+    def pop_matrix(self):
+        self._matrix = self._stack.pop()
+
+    def transform(self, translation, rotation, scale):
+        """Same as glTranslatef, glRotatef then glScalef"""
+        c, s = math.cos(rotation), math.sin(rotation)
+        self._matrix = self._matrix.dot([
+            [scale[0]*c, -scale[1]*s, translation[0]],
+            [scale[0]*s,  scale[1]*c, translation[1]],
+            [0.0, 0.0, 1.0]])
+
+    def _project(self, points):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        return points.dot(self._matrix[:2, :2].T) + self._matrix[:2, 2]
+
+    def unproject(self, x, y):
+        """Maps pixel coordinates (arrays of x and y) back to world
+        coordinates under the current matrix."""
+        inverse = np.linalg.inv(self._matrix)
+        return (inverse[0, 0]*x + inverse[0, 1]*y + inverse[0, 2],
+                inverse[1, 0]*x + inverse[1, 1]*y + inverse[1, 2])
+
+    def fill_polygon(self, v):
+        self._fill_convex(self._project(v)[None])
+
+    def draw_polyline(self, v, close):
+        p = self._project(v)
+        if close:
+            p = np.concatenate([p, p[:1]])
+        a, b = p[:-1], p[1:]
+        d = b - a
+        length = np.sqrt((d*d).sum(axis=1))
+        keep = length > 0
+        if not keep.any():
+            return
+        a, b, d, length = a[keep], b[keep], d[keep], length[keep]
+        # Offsets of the sides of each segment's quad
+        n = np.stack([-d[:, 1], d[:, 0]], axis=1) * (0.5*max(self.line_width, 1)/length)[:, None]
+        self._fill_convex(np.stack([a + n, b + n, b - n, a - n], axis=1))
+
+    def draw_points(self, points):
+        p = np.floor(self._project(points)).astype(int)
+        inside = (p[:, 0] >= 0) & (p[:, 0] < self.width) & (p[:, 1] >= 0) & (p[:, 1] < self.height)
+        mask = np.ones((1, 1), dtype=bool)
+        for x, y in p[inside]:
+            self._paint(y, x, mask, self.color)
+
+    def draw_image(self, rgba, width, height):
+        """Draws rgba (top row first) over [-width/2, width/2] x
+        [-height/2, height/2], modulated by the current color."""
+        corners = self._project([(-width/2, -height/2), (width/2, -height/2), (width/2, height/2), (-width/2, height/2)])
+        r0, r1 = self._clip(corners[:, 1].min(), corners[:, 1].max(), self.height)
+        c0, c1 = self._clip(corners[:, 0].min(), corners[:, 0].max(), self.width)
+        if r0 >= r1 or c0 >= c1:
+            return
+        # Map the center of each pixel back to the image
+        x, y = self.unproject(*np.meshgrid(np.arange(c0, c1) + 0.5, np.arange(r0, r1) + 0.5))
+        img_h, img_w = rgba.shape[:2]
+        u = np.floor((x/width + 0.5)*img_w).astype(int)
+        v = np.floor((0.5 - y/height)*img_h).astype(int)
+        inside = (u >= 0) & (u < img_w) & (v >= 0) & (v < img_h)
+        texels = rgba[v[inside], u[inside]] / 255.0
+        color = np.asarray(self.color, dtype=np.float64)
+        rgb = texels[:, :3] * color[:3]
+        alpha = texels[:, 3:] * color[3]
+        region = self.pixels[r0:r1, c0:c1]
+        region[inside] = np.round(rgb*255*alpha + region[inside]*(1 - alpha)).astype(np.uint8)
+
+    def _clip(self, lo, hi, size):
+        """The pixels whose centers are in [lo, hi), clipped to [0, size)"""
+        return max(int(math.ceil(lo - 0.5)), 0), min(int(math.ceil(hi - 0.5)), size)
+
+    def _fill_convex(self, polys):
+        """Fills the union of convex polygons, given as a (count, vertices, 2)
+        array of pixel coordinates."""
+        r0, r1 = self._clip(polys[..., 1].min(), polys[..., 1].max(), self.height)
+        c0, c1 = self._clip(polys[..., 0].min(), polys[..., 0].max(), self.width)
+        if r0 >= r1 or c0 >= c1:
+            return
+
+        # The rows whose centers each polygon spans, flattened
+        ys = polys[..., 1]
+        first = np.clip(np.ceil(ys.min(axis=1) - 0.5), r0, r1).astype(np.intp)
+        counts = np.clip(np.ceil(ys.max(axis=1) - 0.5), r0, r1).astype(np.intp) - first
+        counts = np.maximum(counts, 0)
+        poly = np.repeat(np.arange(len(polys)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        row = np.repeat(first, counts) + offsets
+
+        # Where the center line of each row crosses each edge of its
+        # polygon. An edge includes its lower end only, so that vertices
+        # count once.
+        y = (row + 0.5)[:, None]
+        x0, y0 = polys[poly, :, 0], polys[poly, :, 1]
+        ends = np.roll(polys, -1, axis=1)[poly]
+        x1, y1 = ends[..., 0], ends[..., 1]
+        crosses = ((y0 <= y) & (y < y1)) | ((y1 <= y) & (y < y0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x = x0 + (y - y0)*(x1 - x0)/(y1 - y0)
+        left = np.where(crosses, x, np.inf).min(axis=1)
+        right = np.where(crosses, x, -np.inf).max(axis=1)
+
+        # Columns [start, end) of each span, relative to c0. Spans are
+        # marked with +1/-1 at their ends, and a running sum along each row
+        # then covers their union.
+        width = c1 - c0
+        start = np.clip(np.ceil(left - 0.5) - c0, 0, width)
+        end = np.clip(np.ceil(right - 0.5) - c0, 0, width)
+        spans = start < end
+        row = row[spans] - r0
+        start = (row*(width + 1) + start[spans]).astype(np.intp)
+        end = (row*(width + 1) + end[spans]).astype(np.intp)
+        size = (r1 - r0)*(width + 1)
+        marks = np.bincount(start, minlength=size) - np.bincount(end, minlength=size)
+        mask = np.cumsum(marks.reshape(r1 - r0, width + 1)[:, :width], axis=1) > 0
+        self._paint(r0, c0, mask, self.color)
+
+    def _paint(self, r0, c0, mask, color):
+        region = self.pixels[r0:r0 + mask.shape[0], c0:c0 + mask.shape[1]]
+        alpha = color[3] if len(color) > 3 else 1.0
+        if alpha >= 1.0:
+            region[mask] = _to_uint8(color)
+        elif alpha > 0.0:
+            rgb = np.asarray(color[:3], dtype=np.float64)*255
+            region[mask] = np.round(rgb*alpha + region[mask]*(1 - alpha)).astype(np.uint8)
+
+def _to_uint8(color):
+    return np.clip(np.round(np.asarray(color[:3], dtype=np.float64)*255), 0, 255).astype(np.uint8)
 
 # ================================================================
 
@@ -311,6 +597,7 @@ class SimpleImageViewer(object):
         self.isopen = False
         self.display = display
     def imshow(self, arr):
+        _check_pyglet()
         if self.window is None:
             height, width, channels = arr.shape
             self.window = pyglet.window.Window(width=width, height=height, display=self.display)
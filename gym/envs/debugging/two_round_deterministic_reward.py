@@ -28,7 +28,7 @@ class TwoRoundDeterministicRewardEnv(gym.Env):
     def _step(self, action):
         rewards = [[0, 3], [1, 2]]
 
-        assert self.action_space.contains(action)
+        assert self._contains(self.action_space, action)
 
         if self.firstAction is None:
             self.firstAction = action
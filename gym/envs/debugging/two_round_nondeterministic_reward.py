@@ -37,7 +37,7 @@ class TwoRoundNondeterministicRewardEnv(gym.Env):
             ]
         ]
 
-        assert self.action_space.contains(action)
+        assert self._contains(self.action_space, action)
 
         if self.firstAction is None:
             self.firstAction = action
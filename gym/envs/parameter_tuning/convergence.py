@@ -65,7 +65,7 @@ class ConvergenceControl(gym.Env):
         """
         Perform some action in the environment
         """
-        assert self.action_space.contains(action)
+        assert self._contains(self.action_space, action)
 
         lr, decay, momentum, batch_size, l1, l2 = action;
 
@@ -25,6 +25,7 @@ class EnvSpec(object):
     Args:
         id (str): The official environment ID
         entry_point (Optional[str]): The Python entrypoint of the environment class (e.g. module.name:Class)
+        vector_entry_point (Optional[str]): The Python entrypoint of a gym.VectorEnv class that natively steps a batch of this environment
         trials (int): The number of trials to average reward over
         reward_threshold (Optional[int]): The reward threshold before the task is considered solved
         local_only: True iff the environment is to be used only on the local machine (e.g. debugging envs)
@@ -37,7 +38,7 @@ class EnvSpec(object):
         trials (int): The number of trials run in official evaluation
     """
 
-    def __init__(self, id, entry_point=None, trials=100, reward_threshold=None, local_only=False, kwargs=None, nondeterministic=False, tags=None, timestep_limit=None):
+    def __init__(self, id, entry_point=None, trials=100, reward_threshold=None, local_only=False, kwargs=None, nondeterministic=False, tags=None, timestep_limit=None, vector_entry_point=None):
         self.id = id
         # Evaluation parameters
         self.trials = trials
@@ -58,14 +59,26 @@ class EnvSpec(object):
             raise error.Error('Attempted to register malformed environment ID: {}. (Currently all IDs must be of the form {}.)'.format(id, env_id_re.pattern))
         self._env_name = match.group(1)
         self._entry_point = entry_point
+        self._vector_entry_point = vector_entry_point
         self._local_only = local_only
         self._kwargs = {} if kwargs is None else kwargs
 
-    def make(self):
-        """Instantiates an instance of the environment with appropriate kwargs"""
+    def make(self, num_envs=None, asynchronous=False):
+        """Instantiates an instance of the environment with appropriate kwargs
+
+        Args:
+            num_envs (Optional[int]): If given, return a gym.VectorEnv
+              stepping `num_envs` copies of the environment instead of a
+              single gym.Env.
+            asynchronous (bool): Step the copies in worker processes
+              (only used together with num_envs)
+        """
         if self._entry_point is None:
             raise error.Error('Attempting to make deprecated env {}. (HINT: is there a newer registered version of this env?)'.format(self.id))
 
+        if num_envs is not None:
+            return self._make_vector(num_envs, asynchronous)
+
         cls = load(self._entry_point)
         env = cls(**self._kwargs)
 
@@ -73,6 +86,21 @@ class EnvSpec(object):
         env.spec = self
         return env
 
+    def _make_vector(self, num_envs, asynchronous):
+        if num_envs < 1:
+            raise error.Error('num_envs must be a positive integer, not {}'.format(num_envs))
+
+        from gym.vector import SyncVectorEnv, SubprocVectorEnv
+        if asynchronous:
+            env = SubprocVectorEnv([self.make] * num_envs)
+        elif self._vector_entry_point is not None:
+            cls = load(self._vector_entry_point)
+            env = cls(num_envs=num_envs, **self._kwargs)
+        else:
+            env = SyncVectorEnv([self.make] * num_envs)
+        env.spec = self
+        return env
+
     def __repr__(self):
         return "EnvSpec({})".format(self.id)
 
@@ -99,10 +127,10 @@ class EnvRegistry(object):
     def __init__(self):
         self.env_specs = {}
 
-    def make(self, id):
+    def make(self, id, num_envs=None, asynchronous=False):
         logger.info('Making new env: %s', id)
         spec = self.spec(id)
-        return spec.make()
+        return spec.make(num_envs=num_envs, asynchronous=asynchronous)
 
     def all(self):
         return self.env_specs.values()
@@ -136,8 +164,8 @@ registry = EnvRegistry()
 def register(id, **kwargs):
     return registry.register(id, **kwargs)
 
-def make(id):
-    return registry.make(id)
+def make(id, num_envs=None, asynchronous=False):
+    return registry.make(id, num_envs=num_envs, asynchronous=asynchronous)
 
 def spec(id):
     return registry.spec(id)
@@ -14,12 +14,12 @@ import gym
 
 class SemisuperEnv(gym.Env):
     def step(self, action):
-        assert self.action_space.contains(action)
+        assert self._contains(self.action_space, action)
 
         observation, true_reward, done, info = self._step(action)
         info['true_reward'] = true_reward  # Used by monitor for evaluating performance
 
-        assert self.observation_space.contains(observation)
+        assert self._contains(self.observation_space, observation)
 
         perceived_reward = self._distort_reward(true_reward)
         return observation, perceived_reward, done, info
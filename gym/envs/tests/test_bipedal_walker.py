@@ -0,0 +1,56 @@
+import unittest
+
+try:
+    import Box2D
+except ImportError:
+    Box2D = None
+
+def regenerate_terrain(env, hardcore):
+    for t in env.terrain:
+        env.world.DestroyBody(t)
+    env.seed(0)
+    env._generate_terrain(hardcore)
+    return len(env.terrain)
+
+def test_hardcore_terrain_has_obstacles():
+    if Box2D is None:
+        raise unittest.SkipTest('Box2D is not installed')
+    from gym.envs.box2d import bipedal_walker
+    # The terrain is one edge body per segment, plus one body per obstacle
+    num_edges = bipedal_walker.TERRAIN_LENGTH - 1
+    for env in [bipedal_walker.BipedalWalker(), bipedal_walker.BipedalWalkerHardcore()]:
+        env.reset()
+        assert regenerate_terrain(env, False) == num_edges
+        assert regenerate_terrain(env, True) > num_edges
+
+def test_batched_lidar_matches_nearest_box2d_hit():
+    if Box2D is None:
+        raise unittest.SkipTest('Box2D is not installed')
+    import numpy as np
+    from gym.envs.box2d import bipedal_walker
+
+    class NearestHit(Box2D.b2.rayCastCallback):
+        # Unlike the env's callback, clips the ray at every hit instead of
+        # stopping at the first one, so it ends at the nearest
+        fraction = 1.0
+        def ReportFixture(self, fixture, point, normal, fraction):
+            if (fixture.filterData.categoryBits & 1) == 0:
+                return -1
+            self.fraction = fraction
+            return fraction
+
+    env = bipedal_walker.BipedalWalkerHardcoreBatchedLidar()
+    env.seed(0)
+    env.reset()
+    for _ in range(200):
+        _, _, done, _ = env.step(env.action_space.sample())
+        if done:
+            env.reset()
+        pos = env.hull.position
+        expected = []
+        for delta in bipedal_walker.LIDAR_DELTAS:
+            callback = NearestHit()
+            env.world.RayCast(callback, pos, (pos[0] + delta[0], pos[1] + delta[1]))
+            expected.append(callback.fraction)
+        env._cast_lidar(pos)
+        assert np.allclose(env._lidar_fractions, expected, atol=1e-5), (env._lidar_fractions, expected)
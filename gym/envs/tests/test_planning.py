@@ -0,0 +1,33 @@
+import numpy as np
+
+import gym
+from gym.envs.toy_text import planning
+
+def test_frozen_lake_optimum():
+    env = gym.make('FrozenLake-v0')
+    result = planning.value_iteration(env, gamma=1.0, tol=1e-10)
+    assert result.converged
+    # Without the 100 step limit the optimum is a little above the
+    # .8196 quoted next to the registered reward threshold
+    assert abs(result.V[0] - 0.8235) < 1e-3, result.V[0]
+    assert result.policy.shape == (env.nS,)
+
+def test_policy_iteration_matches_value_iteration():
+    env = gym.make('FrozenLake8x8-v0')
+    value_result = planning.value_iteration(env, gamma=0.95, tol=1e-12)
+    policy_result = planning.policy_iteration(env, gamma=0.95, tol=1e-12)
+    assert policy_result.converged
+    assert np.allclose(value_result.V, policy_result.V, atol=1e-8)
+
+def test_policy_evaluation():
+    env = gym.make('Taxi-v1')
+    optimal = planning.value_iteration(env, gamma=0.9)
+    deterministic = planning.policy_evaluation(env, optimal.policy, gamma=0.9)
+    assert np.allclose(deterministic.V, optimal.V, atol=1e-6)
+
+    # The same policy, written as action probabilities
+    stochastic = planning.policy_evaluation(env, np.eye(env.nA)[optimal.policy], gamma=0.9)
+    assert np.allclose(stochastic.V, deterministic.V, atol=1e-6)
+
+    uniform = planning.policy_evaluation(env, np.full((env.nS, env.nA), 1. / env.nA), gamma=0.9)
+    assert np.all(uniform.V <= optimal.V + 1e-6)
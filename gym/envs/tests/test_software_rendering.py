@@ -0,0 +1,57 @@
+import numpy as np
+
+import gym
+from gym import error
+from gym.envs.classic_control import rendering
+
+def test_filled_polygon():
+    viewer = rendering.Viewer(10, 10, backend='software')
+    viewer.draw_polygon([(2, 2), (6, 2), (6, 5), (2, 5)], color=(1, 0, 0))
+    arr = viewer.render(return_rgb_array=True)
+    assert arr.shape == (10, 10, 3)
+    assert arr.dtype == np.uint8
+
+    # Rows run top to bottom, so y in [2, 5) is rows 5..7
+    red = (arr == [255, 0, 0]).all(axis=2)
+    expected = np.zeros((10, 10), dtype=bool)
+    expected[5:8, 2:6] = True
+    assert (red == expected).all()
+    assert (arr[~expected] == 255).all()
+
+def test_transforms_and_onetime_geoms():
+    viewer = rendering.Viewer(20, 20, backend='software')
+    viewer.set_bounds(-1, 1, -1, 1)
+    box = rendering.FilledPolygon([(-0.1, -0.1), (0.1, -0.1), (0.1, 0.1), (-0.1, 0.1)])
+    box.add_attr(rendering.Transform(translation=(0.5, 0.5)))
+    viewer.add_geom(box)
+    viewer.draw_line((-1, -0.5), (1, -0.5))
+
+    arr = viewer.render(return_rgb_array=True)
+    black = (arr == 0).all(axis=2)
+    assert black[4:6, 14:16].all()
+    assert black[14, :].all()
+    # The line was drawn only once
+    arr = viewer.render(return_rgb_array=True)
+    assert not (arr[14] == 0).all()
+
+def test_invalid_backend():
+    try:
+        rendering.Viewer(10, 10, backend='opengl')
+    except error.Error:
+        pass
+    else:
+        assert False, 'Expected an error for an invalid backend'
+
+def test_env_rgb_array():
+    backend = rendering.get_default_backend()
+    rendering.set_default_backend('software')
+    try:
+        env = gym.make('CartPole-v0')
+        env.reset()
+        arr = env.render(mode='rgb_array')
+        assert arr.shape == (400, 600, 3)
+        # The cart is drawn in black
+        assert (arr == 0).all(axis=2).any()
+        env.render(close=True)
+    finally:
+        rendering.set_default_backend(backend)
@@ -0,0 +1,195 @@
+import numpy as np
+
+import gym
+from gym.envs import classic_control
+
+def rollout_scalar(env_id, seeds, actions):
+    """Step one scalar env per seed with the given (steps, num_envs)
+    actions, resetting whenever an episode ends."""
+    envs = [gym.make(env_id) for _ in seeds]
+    for env, seed in zip(envs, seeds):
+        env.seed(seed)
+    observations = [np.stack([env.reset() for env in envs])]
+    rewards, dones = [], []
+    for step_actions in actions:
+        results = []
+        for env, action in zip(envs, step_actions):
+            ob, reward, done, _ = env.step(action)
+            if done:
+                ob = env.reset()
+            results.append((ob, reward, done))
+        observations.append(np.stack([ob for ob, _, _ in results]))
+        rewards.append([reward for _, reward, _ in results])
+        dones.append([done for _, _, done in results])
+    return np.array(observations), np.array(rewards), np.array(dones)
+
+def rollout_vector(env_id, seeds, actions):
+    env = gym.make(env_id, num_envs=len(seeds))
+    env.seed(list(seeds))
+    observations = [env.reset()]
+    rewards, dones = [], []
+    for step_actions in actions:
+        ob, reward, done, _ = env.step(step_actions)
+        observations.append(ob)
+        rewards.append(reward)
+        dones.append(done)
+    return np.array(observations), np.array(rewards), np.array(dones)
+
+def assert_rollouts_match(env_id, actions, seeds=(0, 1, 2, 3)):
+    scalar = rollout_scalar(env_id, seeds, actions)
+    vector = rollout_vector(env_id, seeds, actions)
+    assert np.allclose(scalar[0], vector[0], rtol=1e-9, atol=1e-12)
+    assert np.allclose(scalar[1], vector[1], rtol=1e-9, atol=1e-12)
+    assert np.array_equal(scalar[2], vector[2])
+
+def test_cartpole_matches_scalar():
+    actions = np.random.RandomState(0).randint(2, size=(300, 4))
+    assert_rollouts_match('CartPole-v0', actions)
+
+def test_cartpole_make():
+    env = gym.make('CartPole-v1', num_envs=5)
+    assert isinstance(env, classic_control.CartPoleVectorEnv)
+    assert env.reset().shape == (5, 4)
+
+def test_cartpole_steps_beyond_done():
+    env = classic_control.CartPoleVectorEnv(num_envs=2, auto_reset=False)
+    env.seed(0)
+    env.reset()
+    rewards = []
+    for _ in range(200):
+        _, reward, dones, _ = env.step([1, 0])
+        rewards.append(reward)
+        if dones.all():
+            break
+    rewards = np.array(rewards)
+    # Each row is rewarded until (and including) the step on which its pole fell
+    assert env.steps_beyond_done.min() >= 0
+    assert np.array_equal(rewards.sum(axis=0), len(rewards) - env.steps_beyond_done)
+
+def test_acrobot_matches_scalar():
+    actions = np.random.RandomState(0).randint(3, size=(300, 4))
+    assert_rollouts_match('Acrobot-v1', actions)
+
+def test_acrobot_single_env_matches_scalar():
+    actions = np.random.RandomState(1).randint(3, size=(300, 1))
+    assert_rollouts_match('Acrobot-v1', actions, seeds=(7,))
+
+def test_acrobot_nips_dynamics():
+    scalar_env = classic_control.AcrobotEnv()
+    scalar_env.book_or_nips = 'nips'
+    scalar_env.seed(3)
+    scalar_ob = scalar_env.reset()
+
+    vector_env = classic_control.AcrobotVectorEnv(num_envs=2)
+    vector_env.book_or_nips = 'nips'
+    vector_env.seed(3)
+    vector_ob = vector_env.reset()
+    assert np.array_equal(scalar_ob, vector_ob[0])
+    for action in [0, 2, 2, 1, 0] * 20:
+        scalar_ob, _, _, _ = scalar_env.step(action)
+        vector_ob, _, _, _ = vector_env.step([action, action])
+    assert np.allclose(scalar_ob, vector_ob[0], rtol=1e-9, atol=1e-12)
+
+def test_mountain_car_matches_scalar():
+    actions = np.random.RandomState(0).randint(3, size=(300, 4))
+    assert_rollouts_match('MountainCar-v0', actions)
+
+def test_continuous_mountain_car_matches_scalar():
+    actions = np.random.RandomState(0).uniform(-1.5, 1.5, size=(300, 4, 1))
+    assert_rollouts_match('MountainCarContinuous-v0', actions)
+
+def test_pendulum_matches_scalar():
+    actions = np.random.RandomState(0).uniform(-3, 3, size=(300, 4, 1))
+    assert_rollouts_match('Pendulum-v0', actions)
+
+def test_mountain_car_auto_reset():
+    env = gym.make('MountainCar-v0', num_envs=3)
+    env.seed(0)
+    env.reset()
+    # Push the car right when it moves right and left otherwise, which
+    # reaches the goal well within 200 steps.
+    velocities = np.zeros(3)
+    for _ in range(200):
+        obs, _, dones, infos = env.step(np.where(velocities >= 0, 2, 0))
+        velocities = obs[:, 1]
+        if dones.any():
+            break
+    else:
+        assert False, 'MountainCar never reached the goal'
+
+    for i in np.flatnonzero(dones):
+        assert infos[i]['terminal_observation'][0] >= env.goal_position
+        assert obs[i][0] < -0.4 and obs[i][1] == 0
+
+def test_classic_control_vector_envs_start_reset():
+    for cls in [classic_control.CartPoleVectorEnv, classic_control.AcrobotVectorEnv,
+                classic_control.MountainCarVectorEnv, classic_control.Continuous_MountainCarVectorEnv,
+                classic_control.PendulumVectorEnv]:
+        env = cls(num_envs=3)
+        assert (env.state != 0).any(axis=1).all(), cls
+
+def test_discrete_env_step_unchanged():
+    from gym.envs.toy_text import discrete
+    env = gym.make('FrozenLake8x8-v0')
+    env.seed(0)
+    env.reset()
+    legacy_random, _ = discrete.seeding.np_random(0)
+    legacy_state = discrete.categorical_sample(env.isd, legacy_random)
+    for _ in range(1000):
+        action = env.action_space.sample()
+        transitions = env.P[legacy_state][action]
+        i = discrete.categorical_sample([t[0] for t in transitions], legacy_random)
+        expected = transitions[i]
+        ob, reward, done, info = env.step(action)
+        assert (info['prob'], ob, reward, done) == expected
+        legacy_state = ob
+        if done:
+            env.reset()
+            legacy_state = discrete.categorical_sample(env.isd, legacy_random)
+
+def test_discrete_env_follows_changes_to_P():
+    env = gym.make('FrozenLake-v0').unwrapped
+    env.reset()
+    # Make moving right from the start state deterministic
+    env.P[0][2] = [(1.0, 1, 0.5, False)]
+    assert env.step(2) == (1, 0.5, False, {'prob': 1.0})
+    assert env.tables.prob[0, 2].sum() == 1.0
+    assert env.tables.next_state[0, 2, 0] != 1
+    env.recompile()
+    assert env.tables.next_state[0, 2, 0] == 1
+    assert env.tables.prob[0, 2].sum() == 1.0
+
+    vector_env = gym.make('FrozenLake-v0', num_envs=3)
+    vector_env.P[0][2] = [(1.0, 1, 0.5, False)]
+    vector_env.recompile()
+    vector_env.reset()
+    obs, rewards, _, _ = vector_env.step([2, 2, 2])
+    assert np.all(obs == 1) and np.all(rewards == 0.5)
+
+def test_discrete_vector_env_transition_frequencies():
+    env = gym.make('FrozenLake-v0', num_envs=6000)
+    env.seed(0)
+    obs = env.reset()
+    assert np.all(obs == 0)
+    obs, rewards, dones, _ = env.step(np.full(6000, 2))
+    # From the start state, moving right slips down or up (back onto the
+    # start state) a third of the time each.
+    counts = np.bincount(obs, minlength=16) / 6000.
+    assert np.allclose(counts[[0, 1, 4]], 1/3., atol=0.03), counts
+    assert not dones.any() and not rewards.any()
+
+def test_taxi_vector_env():
+    env = gym.make('Taxi-v1', num_envs=4)
+    env.seed(0)
+    scalar_env = gym.make('Taxi-v1')
+    obs = env.reset()
+    assert obs.shape == (4,)
+    for step in range(50):
+        actions = np.arange(4) + step % 3
+        next_obs, rewards, dones, _ = env.step(actions)
+        # Taxi transitions are deterministic
+        for ob, action, next_ob, reward, done in zip(obs, actions, next_obs, rewards, dones):
+            (_, expected_ob, expected_reward, expected_done), = scalar_env.P[ob][action]
+            assert reward == expected_reward and done == expected_done
+            assert done or next_ob == expected_ob
+        obs = next_obs
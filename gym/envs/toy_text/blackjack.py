@@ -89,7 +89,7 @@ class BlackjackEnv(gym.Env):
         return [seed]
 
     def _step(self, action):
-        assert self.action_space.contains(action)
+        assert self._contains(self.action_space, action)
         if action:  # hit: add a card to players hand and return
             self.player.append(draw_card(self.np_random))
             if is_bust(self.player):
@@ -1,7 +1,10 @@
+import collections
+
 import numpy as np
 
 from gym import Env, spaces
 from gym.utils import seeding
+from gym.vector.batched_vector_env import BatchedVectorEnv
 
 def categorical_sample(prob_n, np_random):
     """
@@ -12,6 +15,41 @@ def categorical_sample(prob_n, np_random):
     csprob_n = np.cumsum(prob_n)
     return (csprob_n > np_random.rand()).argmax()
 
+TransitionTables = collections.namedtuple('TransitionTables', ['prob', 'cdf', 'next_state', 'reward', 'done'])
+
+def compile_transitions(nS, nA, P):
+    """
+    Pack P into dense arrays of shape (nS, nA, K), where K is the
+    largest number of outcomes of any (state, action) pair.
+
+    Shorter outcome lists are padded with zero-probability outcomes,
+    whose cumulative probability repeats the last real one so that they
+    are never sampled. Sampling index `(cdf[s, a] > u).argmax()` then
+    picks exactly the outcome `categorical_sample` would.
+    """
+    K = max(len(P[s][a]) for s in range(nS) for a in range(nA))
+    prob = np.zeros((nS, nA, K))
+    next_state = np.zeros((nS, nA, K), dtype=np.int64)
+    reward = np.zeros((nS, nA, K))
+    done = np.zeros((nS, nA, K), dtype=np.bool_)
+    for s in range(nS):
+        for a in range(nA):
+            for k, (p, ns, r, d) in enumerate(P[s][a]):
+                prob[s, a, k] = p
+                next_state[s, a, k] = ns
+                reward[s, a, k] = r
+                done[s, a, k] = d
+    return TransitionTables(prob, np.cumsum(prob, axis=2), next_state, reward, done)
+
+def _sample_transition(transitions, u):
+    # Same as transitions[categorical_sample(...)], without the numpy calls
+    c = 0.0
+    for t in transitions:
+        c += t[0]
+        if c > u:
+            return t
+    return transitions[0]
+
 
 class DiscreteEnv(Env):
 
@@ -21,12 +59,14 @@ class DiscreteEnv(Env):
     - nA: number of actions
     - P: transitions (*)
     - isd: initial state distribution (**)
+    - tables: P compiled into dense arrays (see compile_transitions)
 
     (*) dictionary dict of dicts of lists, where
       P[s][a] == [(probability, nextstate, reward, done), ...]
     (**) list or array of length nS
 
-
+    step() always follows P, but tables is compiled once, at construction:
+    call recompile() after changing P.
     """
     def __init__(self, nS, nA, P, isd):
         self.P = P
@@ -34,6 +74,7 @@ class DiscreteEnv(Env):
         self.lastaction=None # for rendering
         self.nS = nS
         self.nA = nA
+        self.recompile()
 
         self.action_space = spaces.Discrete(self.nA)
         self.observation_space = spaces.Discrete(self.nS)
@@ -41,6 +82,10 @@ class DiscreteEnv(Env):
         self._seed()
         self._reset()
 
+    def recompile(self):
+        """Recompiles tables from P"""
+        self.tables = compile_transitions(self.nS, self.nA, self.P)
+
     def _seed(self, seed=None):
         self.np_random, seed = seeding.np_random(seed)
         return [seed]
@@ -50,9 +95,66 @@ class DiscreteEnv(Env):
         return self.s
 
     def _step(self, a):
-        transitions = self.P[self.s][a]
-        i = categorical_sample([t[0] for t in transitions], self.np_random)
-        p, s, r, d= transitions[i]
+        p, s, r, d= _sample_transition(self.P[self.s][a], self.np_random.rand())
         self.s = s
         self.lastaction=a
         return (s, r, d, {"prob" : p})
+
+
+class DiscreteVectorEnv(BatchedVectorEnv):
+
+    """
+    DiscreteEnv for a batch of agents. Every step samples the next
+    state of all rows at once by inverse-CDF lookup in the compiled
+    transition tables.
+
+    Initial states are drawn from each row's own stream, as in every
+    BatchedVectorEnv, but the transitions of all rows are drawn from a
+    single batch stream (`np_random`) so that a step costs one RNG call.
+    Rows therefore start like the scalar env seeded with the same seed,
+    but their trajectories differ.
+
+    As in DiscreteEnv, call recompile() after changing P.
+    """
+    def __init__(self, nS, nA, P, isd, num_envs=1, auto_reset=True):
+        self.P = P
+        self.nS = nS
+        self.nA = nA
+        self.recompile()
+        self._isd_cdf = np.cumsum(isd)
+
+        self.action_space = spaces.Discrete(self.nA)
+        self.observation_space = spaces.Discrete(self.nS)
+
+        super(DiscreteVectorEnv, self).__init__(num_envs, auto_reset=auto_reset)
+        self.s = np.zeros(num_envs, dtype=np.int64)
+        self._reset()
+
+    def recompile(self):
+        """Recompiles tables from P"""
+        self.tables = compile_transitions(self.nS, self.nA, self.P)
+
+    def _seed(self, seeds):
+        used_seeds = super(DiscreteVectorEnv, self)._seed(seeds)
+        # Hash the first seed so that the batch stream differs from the
+        # stream of the first row.
+        batch_seed = None if seeds[0] is None else seeding.hash_seed(used_seeds[0][0])
+        self.np_random, _ = seeding.np_random(batch_seed)
+        return used_seeds
+
+    def _reset_rows(self, rows):
+        for i in rows:
+            self.s[i] = (self._isd_cdf > self.np_randoms[i].rand()).argmax()
+
+    def _step_batch(self, actions):
+        assert ((actions >= 0) & (actions < self.nA)).all(), "%r invalid"%(actions,)
+        u = self.np_random.rand(self.num_envs)
+        i = (self.tables.cdf[self.s, actions] > u[:, None]).argmax(axis=1)
+        outcome = (self.s, actions, i)
+        rewards = self.tables.reward[outcome]
+        dones = self.tables.done[outcome]
+        self.s = self.tables.next_state[outcome]
+        return rewards, dones
+
+    def _get_obs(self):
+        return self.s.copy()
@@ -130,3 +130,12 @@ class FrozenLakeEnv(discrete.DiscreteEnv):
             outfile.write("\n")
 
         return outfile
+
+class FrozenLakeVectorEnv(discrete.DiscreteVectorEnv):
+    """FrozenLakeEnv for a batch of agents on the same lake."""
+    def __init__(self, num_envs=1, desc=None, map_name="4x4", is_slippery=True, auto_reset=True):
+        env = FrozenLakeEnv(desc=desc, map_name=map_name, is_slippery=is_slippery)
+        env.close()
+        self.desc = env.desc
+        self.nrow, self.ncol = env.nrow, env.ncol
+        super(FrozenLakeVectorEnv, self).__init__(env.nS, env.nA, env.P, env.isd, num_envs=num_envs, auto_reset=auto_reset)
@@ -41,7 +41,7 @@ class HotterColder(gym.Env):
         return [seed]
 
     def _step(self, action):
-        assert self.action_space.contains(action)
+        assert self._contains(self.action_space, action)
 
         if action < self.number:
             self.observation = 1
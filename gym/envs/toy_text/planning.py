@@ -0,0 +1,167 @@
+"""
+Model-based planning for DiscreteEnv subclasses (FrozenLake, Taxi, ...),
+whose full MDP is known.
+
+The transition model is taken from the env's compiled transition tables
+(see discrete.compile_transitions): for every (state, action) pair only
+its K possible outcomes are stored, so one backup costs O(nS * nA * K)
+instead of the O(nS * nA * nS) of a dense transition matrix.
+
+Outcomes flagged done end the episode, so no value is bootstrapped
+beyond them.
+
+Example usage:
+    env = gym.make('FrozenLake8x8-v0')
+    result = planning.value_iteration(env, gamma=0.99)
+    action = result.policy[observation]
+"""
+import collections
+import time
+
+import numpy as np
+
+from gym import error
+from gym.envs.toy_text import discrete
+
+PlanningResult = collections.namedtuple('PlanningResult', ['V', 'Q', 'policy', 'iterations', 'converged', 'elapsed'])
+PlanningResult.__doc__ = """
+    V: state values, shape (nS,)
+    Q: state-action values, shape (nS, nA)
+    policy: greedy (or, for policy_evaluation, the given) policy
+    iterations: number of sweeps (policy improvement steps for policy_iteration)
+    converged: whether the tolerance was reached within max_iterations
+    elapsed: wall-clock seconds spent
+"""
+
+class _Model(object):
+    def __init__(self, tables):
+        self.nS, self.nA, _ = tables.prob.shape
+        self.expected_reward = (tables.prob * tables.reward).sum(axis=2)
+        self.continue_prob = tables.prob * ~tables.done
+        self.next_state = tables.next_state
+
+    def q_values(self, V, gamma):
+        return self.expected_reward + gamma * (self.continue_prob * V[self.next_state]).sum(axis=2)
+
+def _model(env):
+    if isinstance(env, _Model):
+        return env
+    if isinstance(env, discrete.TransitionTables):
+        return _Model(env)
+    env = getattr(env, 'unwrapped', env)
+    if isinstance(env, (discrete.DiscreteEnv, discrete.DiscreteVectorEnv)):
+        return _Model(env.tables)
+    raise error.Error('Planning needs a DiscreteEnv or TransitionTables, not {}'.format(env))
+
+def _greedy(Q):
+    return Q.argmax(axis=1)
+
+def value_iteration(env, gamma=0.99, tol=1e-8, max_iterations=100000):
+    """Compute optimal values by repeated Bellman optimality backups,
+    stopping once no state value changes by more than `tol`.
+
+    Args:
+        env: a DiscreteEnv (possibly wrapped) or its TransitionTables
+        gamma (float): discount factor
+        tol (float): convergence tolerance on the max-norm of the update
+        max_iterations (int): maximum number of sweeps
+
+    Returns:
+        PlanningResult, with the greedy policy for the final values
+    """
+    start = time.time()
+    model = _model(env)
+    V = np.zeros(model.nS)
+    converged = False
+    iterations = 0
+    while iterations < max_iterations:
+        iterations += 1
+        Q = model.q_values(V, gamma)
+        new_V = Q.max(axis=1)
+        delta = np.abs(new_V - V).max()
+        V = new_V
+        if delta < tol:
+            converged = True
+            break
+    Q = model.q_values(V, gamma)
+    return PlanningResult(V, Q, _greedy(Q), iterations, converged, time.time() - start)
+
+def policy_evaluation(env, policy, gamma=0.99, tol=1e-8, max_iterations=100000, V=None):
+    """Compute the values of a fixed policy by repeated expected
+    backups, stopping once no state value changes by more than `tol`.
+
+    Args:
+        env: a DiscreteEnv (possibly wrapped) or its TransitionTables
+        policy (np.ndarray): either one action per state, shape (nS,),
+          or action probabilities per state, shape (nS, nA)
+        gamma (float): discount factor
+        tol (float): convergence tolerance on the max-norm of the update
+        max_iterations (int): maximum number of sweeps
+        V (Optional[np.ndarray]): initial values (default: zeros)
+
+    Returns:
+        PlanningResult, whose policy is the one passed in
+    """
+    start = time.time()
+    model = _model(env)
+    policy = np.asarray(policy)
+    states = np.arange(model.nS)
+    if policy.shape == (model.nS,):
+        deterministic = True
+        expected_reward = model.expected_reward[states, policy]
+        continue_prob = model.continue_prob[states, policy]
+        next_state = model.next_state[states, policy]
+    elif policy.shape == (model.nS, model.nA):
+        deterministic = False
+    else:
+        raise error.Error('Expected a policy of shape ({0},) or ({0}, {1}), not {2}'.format(model.nS, model.nA, policy.shape))
+
+    V = np.zeros(model.nS) if V is None else np.array(V, dtype=np.float64)
+    converged = False
+    iterations = 0
+    while iterations < max_iterations:
+        iterations += 1
+        if deterministic:
+            new_V = expected_reward + gamma * (continue_prob * V[next_state]).sum(axis=1)
+        else:
+            new_V = (policy * model.q_values(V, gamma)).sum(axis=1)
+        delta = np.abs(new_V - V).max()
+        V = new_V
+        if delta < tol:
+            converged = True
+            break
+    return PlanningResult(V, model.q_values(V, gamma), policy, iterations, converged, time.time() - start)
+
+def policy_iteration(env, gamma=0.99, tol=1e-8, max_iterations=1000, evaluation_iterations=100000):
+    """Alternate policy evaluation and greedy policy improvement until
+    the policy is stable. An action is only replaced by one whose value
+    is higher by more than `tol`, so ties cannot make the policy cycle.
+
+    Args:
+        env: a DiscreteEnv (possibly wrapped) or its TransitionTables
+        gamma (float): discount factor
+        tol (float): tolerance for policy evaluation and improvement
+        max_iterations (int): maximum number of improvement steps
+        evaluation_iterations (int): maximum sweeps per policy evaluation
+
+    Returns:
+        PlanningResult, with iterations counting improvement steps
+    """
+    start = time.time()
+    model = _model(env)
+    states = np.arange(model.nS)
+    policy = np.zeros(model.nS, dtype=np.int64)
+    V = None
+    converged = False
+    iterations = 0
+    while iterations < max_iterations:
+        iterations += 1
+        evaluation = policy_evaluation(model, policy, gamma=gamma, tol=tol, max_iterations=evaluation_iterations, V=V)
+        V, Q = evaluation.V, evaluation.Q
+        greedy = _greedy(Q)
+        improved = Q[states, greedy] > Q[states, policy] + tol
+        if not improved.any():
+            converged = True
+            break
+        policy = np.where(improved, greedy, policy)
+    return PlanningResult(V, Q, policy, iterations, converged, time.time() - start)
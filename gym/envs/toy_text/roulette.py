@@ -27,7 +27,7 @@ class RouletteEnv(gym.Env):
         return [seed]
 
     def _step(self, action):
-        assert self.action_space.contains(action)
+        assert self._contains(self.action_space, action)
         if action == self.n - 1:
             # observation, reward, done, info
             return 0, 0, True, {}
@@ -134,3 +134,11 @@ class TaxiEnv(discrete.DiscreteEnv):
         # No need to return anything for human
         if mode != 'human':
             return outfile
+
+class TaxiVectorEnv(discrete.DiscreteVectorEnv):
+    """TaxiEnv for a batch of taxis."""
+    def __init__(self, num_envs=1, auto_reset=True):
+        env = TaxiEnv()
+        env.close()
+        self.desc = env.desc
+        super(TaxiVectorEnv, self).__init__(env.nS, env.nA, env.P, env.isd, num_envs=num_envs, auto_reset=auto_reset)
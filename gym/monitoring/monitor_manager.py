@@ -1,6 +1,7 @@
 import json
 import logging
 import os
+import threading
 import weakref
 
 import numpy as np
@@ -43,6 +44,69 @@ def disable_videos(episode_id):
 
 monitor_closer = closer.Closer()
 
+def _write_manifest(path, manifest):
+    logger.debug('Writing training manifest file to %s', path)
+    with atomic_write.atomic_write(path) as f:
+        json.dump(manifest, f, default=json_encode_np)
+
+class _AsyncFlusher(object):
+    """Writes monitor snapshots (new stats log records plus the latest
+    manifest) on a background thread, so that the step loop never waits
+    on the filesystem.
+
+    At most one snapshot is pending at a time: submitting while the
+    writer is busy merges the new records into the pending snapshot and
+    replaces its manifest, of which only the latest version matters.
+    submit() therefore never blocks, and the backlog is bounded by the
+    episodes completed during a single write.
+    """
+
+    def __init__(self, stats_recorder, manifest_path):
+        # Deliberately no reference to the MonitorManager, so the thread
+        # doesn't keep it from being garbage collected
+        self.stats_recorder = stats_recorder
+        self.manifest_path = manifest_path
+
+        self._cond = threading.Condition()
+        self._records = []
+        self._manifest = None
+        self._closing = False
+
+        self._thread = threading.Thread(target=self._run, name='MonitorFlusher')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def submit(self, records, manifest):
+        with self._cond:
+            self._records.extend(records)
+            self._manifest = manifest
+            self._cond.notify()
+
+    def close(self):
+        """Writes any pending snapshot and stops the thread."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._manifest is None and not self._closing:
+                    self._cond.wait()
+                if self._manifest is None:
+                    return
+                records, manifest = self._records, self._manifest
+                self._records, self._manifest = [], None
+
+            try:
+                self.stats_recorder.write_records(records)
+                _write_manifest(self.manifest_path, manifest)
+            except Exception:
+                # close() rewrites everything from memory, so a failed
+                # background write only loses crash recovery
+                logger.exception('Could not flush monitor data to %s', self.manifest_path)
+
 # This method gets used for a sanity check in scoreboard/api.py. It's
 # not intended for use outside of the gym codebase.
 def _open_monitors():
@@ -89,6 +153,7 @@ class MonitorManager(object):
         self.enabled = False
         self.episode_id = 0
         self._monitor_id = None
+        self._flusher = None
         self.env_semantics_autoreset = env.metadata.get('semantics.autoreset')
 
     @property
@@ -99,7 +164,7 @@ class MonitorManager(object):
         return env
 
     def start(self, directory, video_callable=None, force=False, resume=False,
-              write_upon_reset=False, uid=None, mode=None):
+              write_upon_reset=False, uid=None, mode=None, async_flush=False):
         """Start monitoring.
 
         Args:
@@ -107,9 +172,10 @@ class MonitorManager(object):
             video_callable (Optional[function, False]): function that takes in the index of the episode and outputs a boolean, indicating whether we should record a video on this episode. The default (for video_callable is None) is to take perfect cubes, capped at 1000. False disables video recording.
             force (bool): Clear out existing training data from this directory (by deleting every file prefixed with "openaigym.").
             resume (bool): Retain the training data already in this directory, which will be merged with our new data
-            write_upon_reset (bool): Write the manifest file on each reset. (This is currently a JSON file, so writing it is somewhat expensive.)
+            write_upon_reset (bool): Write the manifest file on each reset. Episode stats are appended to a log, so this costs O(1) per reset; the stats JSON itself is written on close.
             uid (Optional[str]): A unique id used as part of the suffix for the file. By default, uses os.getpid().
             mode (['evaluation', 'training']): Whether this is an evaluation or training episode.
+            async_flush (bool): Do the writes requested by write_upon_reset on a background thread. close() waits for them to finish.
         """
         if self.env.spec is None:
             logger.warn("Trying to monitor an environment which has no 'spec' set. This usually means you did not create it via 'gym.make', and is recommended only for advanced users.")
@@ -160,33 +226,46 @@ class MonitorManager(object):
         if mode is not None:
             self._set_mode(mode)
 
+        if async_flush:
+            self._flusher = _AsyncFlusher(self.stats_recorder, self._manifest_path())
+
     def _flush(self, force=False):
         """Flush all relevant monitor information to disk."""
         if not self.write_upon_reset and not force:
             return
 
+        if self._flusher is not None and not force:
+            self._flusher.submit(self.stats_recorder.pending_records(), self._manifest())
+            return
+
         self.stats_recorder.flush()
+        _write_manifest(self._manifest_path(), self._manifest())
 
+    def _manifest_path(self):
         # Give it a very distiguished name, since we need to pick it
         # up from the filesystem later.
-        path = os.path.join(self.directory, '{}.manifest.{}.manifest.json'.format(self.file_prefix, self.file_infix))
-        logger.debug('Writing training manifest file to %s', path)
-        with atomic_write.atomic_write(path) as f:
-            # We need to write relative paths here since people may
-            # move the training_dir around. It would be cleaner to
-            # already have the basenames rather than basename'ing
-            # manually, but this works for now.
-            json.dump({
-                'stats': os.path.basename(self.stats_recorder.path),
-                'videos': [(os.path.basename(v), os.path.basename(m))
-                           for v, m in self.videos],
-                'env_info': self._env_info(),
-            }, f, default=json_encode_np)
+        return os.path.join(self.directory, '{}.manifest.{}.manifest.json'.format(self.file_prefix, self.file_infix))
+
+    def _manifest(self):
+        # We need to write relative paths here since people may
+        # move the training_dir around. It would be cleaner to
+        # already have the basenames rather than basename'ing
+        # manually, but this works for now.
+        return {
+            'stats': os.path.basename(self.stats_recorder.path),
+            'videos': [(os.path.basename(v), os.path.basename(m))
+                       for v, m in self.videos],
+            'env_info': self._env_info(),
+        }
 
     def close(self):
         """Flush all monitor data to disk and close any open rending windows."""
         if not self.enabled:
             return
+        if self._flusher is not None:
+            # Drain before the stats log gets compacted
+            self._flusher.close()
+            self._flusher = None
         self.stats_recorder.close()
         if self.video_recorder is not None:
             self._close_video_recorder()
@@ -248,7 +327,8 @@ class MonitorManager(object):
         # Record stats
         self.stats_recorder.after_step(observation, reward, done, info)
         # Record video
-        self.video_recorder.capture_frame()
+        if self.video_recorder is not None:
+            self.video_recorder.capture_frame()
 
         return done
 
@@ -273,6 +353,12 @@ class MonitorManager(object):
         # Close any existing video recorder
         if self.video_recorder:
             self._close_video_recorder()
+            self.video_recorder = None
+
+        # Episodes that aren't recorded cost nothing beyond this call:
+        # no recorder, no render calls.
+        if not self._video_enabled():
+            return
 
         # Start recording the next video.
         #
@@ -281,7 +367,6 @@ class MonitorManager(object):
             env=self.env,
             base_path=os.path.join(self.directory, '{}.video.{}.video{:06}'.format(self.file_prefix, self.file_infix, self.episode_id)),
             metadata={'episode_id': self.episode_id},
-            enabled=self._video_enabled(),
         )
         self.video_recorder.capture_frame()
 
@@ -315,7 +400,7 @@ def load_env_info_from_manifests(manifests, training_dir):
     env_info = collapse_env_infos(env_infos, training_dir)
     return env_info
 
-def load_results(training_dir):
+def load_results(training_dir, as_arrays=False):
     if not os.path.exists(training_dir):
         logger.error('Training directory %s not found', training_dir)
         return
@@ -342,7 +427,7 @@ def load_results(training_dir):
             env_infos.append(contents['env_info'])
 
     env_info = collapse_env_infos(env_infos, training_dir)
-    data_sources, initial_reset_timestamps, timestamps, episode_lengths, episode_rewards, episode_types, initial_reset_timestamp = merge_stats_files(stats_files)
+    data_sources, initial_reset_timestamps, timestamps, episode_lengths, episode_rewards, episode_types, initial_reset_timestamp = merge_stats_files(stats_files, as_arrays=as_arrays)
 
     return {
         'manifests': manifests,
@@ -357,38 +442,68 @@ def load_results(training_dir):
         'videos': videos,
     }
 
-def merge_stats_files(stats_files):
+def merge_stats_files(stats_files, as_arrays=False):
+    """Merges stats files by timestamp, reading each one from its columnar
+    sibling when present (see stats_recorder.write_columnar_stats) and
+    from JSON otherwise.
+
+    Columns are concatenated as typed arrays and merged with a stable
+    mergesort, which takes advantage of each file already being sorted.
+    With as_arrays=True, the merged columns are returned as numpy arrays
+    rather than lists.
+    """
     timestamps = []
     episode_lengths = []
     episode_rewards = []
     episode_types = []
     initial_reset_timestamps = []
     data_sources = []
+    all_typed = True
 
     for i, path in enumerate(stats_files):
-        with open(path) as f:
-            content = json.load(f)
-            if len(content['timestamps'])==0: continue # so empty file doesn't mess up results, due to null initial_reset_timestamp
-            data_sources += [i] * len(content['timestamps'])
-            timestamps += content['timestamps']
-            episode_lengths += content['episode_lengths']
-            episode_rewards += content['episode_rewards']
-            # Recent addition
-            episode_types += content.get('episode_types', [])
-            # Keep track of where each episode came from.
-            initial_reset_timestamps.append(content['initial_reset_timestamp'])
-
-    idxs = np.argsort(timestamps)
-    timestamps = np.array(timestamps)[idxs].tolist()
-    episode_lengths = np.array(episode_lengths)[idxs].tolist()
-    episode_rewards = np.array(episode_rewards)[idxs].tolist()
-    data_sources = np.array(data_sources)[idxs].tolist()
-
-    if episode_types:
-        episode_types = np.array(episode_types)[idxs].tolist()
+        if os.path.exists(stats_recorder.columnar_path(path)):
+            content = stats_recorder.load_columnar_stats(stats_recorder.columnar_path(path))
+        else:
+            content = stats_recorder.load_stats(path)
+        count = len(content['timestamps'])
+        if count==0: continue # so empty file doesn't mess up results, due to null initial_reset_timestamp
+        data_sources.append(np.full(count, i, dtype=np.int64))
+        timestamps.append(np.asarray(content['timestamps'], dtype=np.float64))
+        episode_lengths.append(np.asarray(content['episode_lengths'], dtype=np.int64))
+        episode_rewards.append(np.asarray(content['episode_rewards'], dtype=np.float64))
+        # Recent addition. There is one type per episode started, so the
+        # last one may belong to an episode that never completed.
+        types = content.get('episode_types', [])
+        if len(types) >= count:
+            episode_types.append(np.asarray(types[:count]).astype(str))
+        else:
+            all_typed = False
+        # Keep track of where each episode came from.
+        initial_reset_timestamps.append(content['initial_reset_timestamp'])
+
+    def merge(columns, dtype):
+        return np.concatenate(columns) if columns else np.zeros(0, dtype=dtype)
+
+    timestamps = merge(timestamps, np.float64)
+    idxs = np.argsort(timestamps, kind='mergesort')
+    timestamps = timestamps[idxs]
+    episode_lengths = merge(episode_lengths, np.int64)[idxs]
+    episode_rewards = merge(episode_rewards, np.float64)[idxs]
+    data_sources = merge(data_sources, np.int64)[idxs]
+
+    if episode_types and all_typed:
+        episode_types = merge(episode_types, str)[idxs]
     else:
         episode_types = None
 
+    if not as_arrays:
+        timestamps = timestamps.tolist()
+        episode_lengths = episode_lengths.tolist()
+        episode_rewards = episode_rewards.tolist()
+        data_sources = data_sources.tolist()
+        if episode_types is not None:
+            episode_types = episode_types.tolist()
+
     if len(initial_reset_timestamps) > 0:
         initial_reset_timestamp = min(initial_reset_timestamps)
     else:
@@ -1,11 +1,128 @@
 import json
+import logging
 import os
+import struct
 import time
 
+import numpy as np
+
 from gym import error
 from gym.utils import atomic_write
 from gym.utils.json_utils import json_encode_np
 
+logger = logging.getLogger(__name__)
+
+def load_stats(path):
+    """Loads a '.stats.json' file. If it was never written (because the
+    process died before close()), rebuilds its contents from the
+    append-only '.stats.log' written by StatsRecorder.flush.
+    """
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+
+    log_path = _log_path(path)
+    if not os.path.exists(log_path):
+        raise error.Error('Could not find stats file {} or stats log {}'.format(path, log_path))
+    return _replay_log(log_path)
+
+def _log_path(path):
+    assert path.endswith('.json')
+    return path[:-len('.json')] + '.log'
+
+def _replay_log(log_path):
+    content = {
+        'initial_reset_timestamp': None,
+        'timestamps': [],
+        'episode_lengths': [],
+        'episode_rewards': [],
+        'episode_types': [],
+    }
+    with open(log_path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A crash can leave a partially written final line
+                logger.warn('Ignoring truncated record in stats log %s', log_path)
+                break
+            if 'initial_reset_timestamp' in record:
+                content['initial_reset_timestamp'] = record['initial_reset_timestamp']
+            elif 'episode_type' in record:
+                content['episode_types'].append(record['episode_type'])
+            else:
+                content['timestamps'].append(record['timestamp'])
+                content['episode_lengths'].append(record['episode_length'])
+                content['episode_rewards'].append(record['episode_reward'])
+    return content
+
+# Columnar stats file layout: the magic, the header length as a
+# little-endian uint64, a JSON header, then one contiguous block per
+# column. Column offsets in the header are relative to the first block,
+# which (like every block) starts on a 16-byte boundary.
+COLUMNAR_MAGIC = b'GYMSTAT1'
+COLUMNAR_COLUMNS = [
+    ('timestamps', '<f8'),
+    ('episode_lengths', '<i8'),
+    ('episode_rewards', '<f8'),
+    ('episode_types', 'S1'),
+]
+
+def columnar_path(path):
+    """The columnar sibling of a '.stats.json' path."""
+    assert path.endswith('.json')
+    return path[:-len('.json')] + '.columns'
+
+def _align(n, alignment=16):
+    return (n + alignment - 1) // alignment * alignment
+
+def write_columnar_stats(path, content):
+    """Writes the completed episodes of a stats dict (as stored in
+    '.stats.json') in the columnar layout."""
+    count = len(content['timestamps'])
+    columns = []
+    offset = 0
+    for name, dtype in COLUMNAR_COLUMNS:
+        # episode_types also has an entry for an in-progress episode
+        array = np.asarray(content[name][:count], dtype=dtype)
+        columns.append((name, dtype, offset, array))
+        offset = _align(offset + array.nbytes)
+
+    header = json.dumps({
+        'initial_reset_timestamp': content['initial_reset_timestamp'],
+        'count': count,
+        'columns': [[name, dtype, offset] for name, dtype, offset, _ in columns],
+    }).encode('utf-8')
+    start = _align(len(COLUMNAR_MAGIC) + 8 + len(header))
+
+    with atomic_write.atomic_write(path, binary=True) as f:
+        f.write(COLUMNAR_MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        for _, _, offset, array in columns:
+            f.write(b'\0' * (start + offset - f.tell()))
+            f.write(array.tobytes())
+
+def load_columnar_stats(path):
+    """Loads a columnar stats file. The columns are read-only memory maps,
+    so nothing is read from disk until they are used."""
+    with open(path, 'rb') as f:
+        if f.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+            raise error.Error('{} is not a columnar stats file'.format(path))
+        header_length, = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(header_length).decode('utf-8'))
+    start = _align(len(COLUMNAR_MAGIC) + 8 + header_length)
+
+    content = {'initial_reset_timestamp': header['initial_reset_timestamp']}
+    count = header['count']
+    for name, dtype, offset in header['columns']:
+        if count == 0:
+            # Zero-length maps are not allowed
+            content[name] = np.zeros(0, dtype=dtype)
+        else:
+            content[name] = np.memmap(path, dtype=dtype, mode='r', offset=start + offset, shape=(count,))
+    return content
+
 class StatsRecorder(object):
     def __init__(self, directory, file_prefix, autoreset=False, env_id=None):
         self.autoreset = autoreset
@@ -29,6 +146,16 @@ class StatsRecorder(object):
         filename = '{}.stats.json'.format(self.file_prefix)
         self.path = os.path.join(self.directory, filename)
 
+        # flush() appends only what changed since the last flush to the
+        # log, so periodic flushing costs O(new episodes) rather than
+        # O(all episodes). close() compacts it into the JSON file.
+        self.log_path = _log_path(self.path)
+        self.columnar_path = columnar_path(self.path)
+        self._log = None
+        self._logged_initial_reset_timestamp = False
+        self._logged_types = 0
+        self._logged_episodes = 0
+
     @property
     def type(self):
         return self._type
@@ -86,18 +213,60 @@ class StatsRecorder(object):
             self.timestamps.append(time.time())
 
     def close(self):
-        self.flush()
+        if self.closed:
+            return
+
+        content = {
+            'initial_reset_timestamp': self.initial_reset_timestamp,
+            'timestamps': self.timestamps,
+            'episode_lengths': self.episode_lengths,
+            'episode_rewards': self.episode_rewards,
+            'episode_types': self.episode_types,
+        }
+        with atomic_write.atomic_write(self.path) as f:
+            json.dump(content, f, default=json_encode_np)
+        # Preferred by load_results, which can merge it without parsing
+        write_columnar_stats(self.columnar_path, content)
+
+        # The JSON file now holds everything in the log
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        if os.path.exists(self.log_path):
+            os.unlink(self.log_path)
         self.closed = True
 
     def flush(self):
         if self.closed:
             return
+        self.write_records(self.pending_records())
 
-        with atomic_write.atomic_write(self.path) as f:
-            json.dump({
-                'initial_reset_timestamp': self.initial_reset_timestamp,
-                'timestamps': self.timestamps,
-                'episode_lengths': self.episode_lengths,
-                'episode_rewards': self.episode_rewards,
-                'episode_types': self.episode_types,
-            }, f, default=json_encode_np)
+    def pending_records(self):
+        """Returns the log records added since the last call, and marks them
+        as written. Cheap enough to call from the step loop; the records
+        can then be handed to write_records on another thread."""
+        records = []
+        if self.initial_reset_timestamp is not None and not self._logged_initial_reset_timestamp:
+            records.append({'initial_reset_timestamp': self.initial_reset_timestamp})
+            self._logged_initial_reset_timestamp = True
+        for type in self.episode_types[self._logged_types:]:
+            records.append({'episode_type': type})
+        self._logged_types = len(self.episode_types)
+        for i in range(self._logged_episodes, len(self.timestamps)):
+            records.append({
+                'timestamp': self.timestamps[i],
+                'episode_length': self.episode_lengths[i],
+                'episode_reward': self.episode_rewards[i],
+            })
+        self._logged_episodes = len(self.timestamps)
+        return records
+
+    def write_records(self, records):
+        if self.closed:
+            return
+
+        if self._log is None:
+            self._log = open(self.log_path, 'a')
+        for record in records:
+            self._log.write(json.dumps(record, default=json_encode_np) + '\n')
+        self._log.flush()
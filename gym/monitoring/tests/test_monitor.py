@@ -210,3 +210,140 @@ def test_steps_limit_restart():
         assert env._monitor.episode_id == 1
 
         env.close()
+
+def test_stats_log_recovery():
+    with helpers.tempdir() as temp:
+        recorder = monitoring.StatsRecorder(temp, 'openaigym.episode_batch.test')
+        for episode in range(3):
+            recorder.before_reset()
+            recorder.after_reset(None)
+            for _ in range(episode + 1):
+                recorder.before_step(None)
+                recorder.after_step(None, 1.0, False, {})
+            recorder.done = True
+            recorder.save_complete()
+            recorder.flush()
+        recorder.flush()
+        recorder._log.close()
+
+        # Simulate a crash in the middle of writing a record
+        with open(recorder.log_path, 'a') as f:
+            f.write('{"timestamp": 1')
+        recovered = monitoring.stats_recorder.load_stats(recorder.path)
+        assert recovered['episode_lengths'] == [1, 2, 3]
+        assert recovered['episode_rewards'] == [1.0, 2.0, 3.0]
+        assert recovered['episode_types'] == ['t', 't', 't']
+        assert recovered['initial_reset_timestamp'] == recorder.initial_reset_timestamp
+
+def test_stats_log_compacted_on_close():
+    with helpers.tempdir() as temp:
+        env = gym.make('CartPole-v0')
+        env = Monitor(env, temp, video_callable=False, write_upon_reset=True)
+        for _ in range(2):
+            env.reset()
+            done = False
+            while not done:
+                _, _, done, _ = env.step(env.action_space.sample())
+        env.reset()
+
+        # Readable mid-run from the log alone
+        assert not glob.glob(os.path.join(temp, '*.stats.json'))
+        assert len(monitoring.load_results(temp)['episode_lengths']) == 2
+
+        env.close()
+        assert not glob.glob(os.path.join(temp, '*.stats.log'))
+        assert len(monitoring.load_results(temp)['episode_lengths']) == 2
+
+def test_columnar_stats_match_json():
+    with helpers.tempdir() as temp:
+        for uid in ['a', 'b']:
+            env = Monitor(gym.make('CartPole-v0'), temp, video_callable=False, uid=uid, resume=True)
+            for _ in range(3):
+                env.reset()
+                done = False
+                while not done:
+                    _, _, done, _ = env.step(env.action_space.sample())
+            env.reset()
+            env.close()
+
+        columnar = monitoring.load_results(temp)
+        assert len(columnar['episode_lengths']) == 6
+        arrays = monitoring.load_results(temp, as_arrays=True)
+        assert arrays['episode_rewards'].dtype.kind == 'f'
+        assert arrays['episode_lengths'].tolist() == columnar['episode_lengths']
+
+        for path in glob.glob(os.path.join(temp, '*.stats.columns')):
+            os.unlink(path)
+        from_json = monitoring.load_results(temp)
+        for key in ['timestamps', 'episode_lengths', 'episode_rewards', 'episode_types', 'data_sources', 'initial_reset_timestamp']:
+            assert columnar[key] == from_json[key], key
+        assert columnar['episode_types'] == ['t'] * 6
+
+def test_async_flush():
+    with helpers.tempdir() as temp:
+        env = Monitor(gym.make('CartPole-v0'), temp, video_callable=False, write_upon_reset=True, async_flush=True)
+        for _ in range(5):
+            env.reset()
+            done = False
+            while not done:
+                _, _, done, _ = env.step(env.action_space.sample())
+        env.close()
+
+        results = monitoring.load_results(temp)
+        assert len(results['episode_lengths']) == 5
+        assert not glob.glob(os.path.join(temp, '*.stats.log'))
+
+def test_async_flusher_coalesces_without_blocking():
+    import threading
+    from gym.monitoring.monitor_manager import _AsyncFlusher
+
+    class SlowRecorder(object):
+        def __init__(self):
+            self.release = threading.Event()
+            self.writes = []
+
+        def write_records(self, records):
+            self.release.wait()
+            self.writes.append(records)
+
+    with helpers.tempdir() as temp:
+        recorder = SlowRecorder()
+        flusher = _AsyncFlusher(recorder, os.path.join(temp, 'manifest.json'))
+        for i in range(100):
+            flusher.submit([i], {'i': i})
+        recorder.release.set()
+        flusher.close()
+
+        # Every record is written exactly once, in far fewer writes
+        assert sum(recorder.writes, []) == list(range(100))
+        assert len(recorder.writes) <= 2
+        with open(os.path.join(temp, 'manifest.json')) as f:
+            assert f.read() == '{"i": 99}'
+
+def test_unrecorded_episodes_do_not_render():
+    class RenderCountingEnv(gym.Env):
+        metadata = {'render.modes': ['rgb_array']}
+        action_space = spaces.Discrete(1)
+        observation_space = spaces.Discrete(1)
+        renders = 0
+
+        def _reset(self):
+            return 0
+
+        def _step(self, action):
+            return 0, 0, True, {}
+
+        def _render(self, mode='human', close=False):
+            if not close:
+                self.renders += 1
+
+    with helpers.tempdir() as temp:
+        env = RenderCountingEnv()
+        env.spec = gym.envs.registration.EnvSpec('RenderCounting-v0')
+        monitored = Monitor(env, temp, video_callable=False)
+        for _ in range(5):
+            monitored.reset()
+            monitored.step(0)
+        assert env.renders == 0
+        assert monitored._monitor.video_recorder is None
+        monitored.close()
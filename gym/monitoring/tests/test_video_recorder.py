@@ -65,3 +65,62 @@ def test_text_envs():
         video.close()
     finally:
         os.remove(video.path)
+
+class SlowSink(object):
+    def __init__(self):
+        import threading
+        self.release = threading.Event()
+        self.frames = []
+
+    def write(self, data):
+        self.release.wait()
+        self.frames.append(bytes(data))
+
+class BrokenSink(object):
+    def write(self, data):
+        raise IOError('Broken pipe')
+
+def test_frame_ring_preserves_frames():
+    from gym.monitoring.video_recorder import _FrameRing
+    sink = SlowSink()
+    sink.release.set()
+    ring = _FrameRing(sink, (2, 3, 3), capacity=4)
+    frames = [np.full((2, 3, 3), i, dtype=np.uint8) for i in range(20)]
+    for frame in frames:
+        ring.put(frame)
+    ring.close()
+    assert sink.frames == [frame.tobytes() for frame in frames]
+    assert ring.frames_written == 20
+    assert ring.frames_dropped == 0
+
+def test_frame_ring_drops_when_full():
+    from gym.monitoring.video_recorder import _FrameRing
+    sink = SlowSink()
+    ring = _FrameRing(sink, (2, 2, 3), capacity=4, drop_when_full=True)
+    for i in range(10):
+        ring.put(np.zeros((2, 2, 3), dtype=np.uint8))
+    sink.release.set()
+    ring.close()
+    assert ring.frames_dropped == 6
+    assert ring.frames_written == 4
+
+def test_frame_ring_survives_broken_sink():
+    from gym.monitoring.video_recorder import _FrameRing
+    ring = _FrameRing(BrokenSink(), (2, 2, 3), capacity=2)
+    for i in range(10):
+        ring.put(np.zeros((2, 2, 3), dtype=np.uint8))
+    ring.close()
+    assert ring.exc_info is not None
+    assert ring.frames_written == 0
+    assert ring.frames_dropped == 10
+
+def test_frame_ring_reuses_buffers():
+    from gym.monitoring.video_recorder import _FrameRing
+    sink = SlowSink()
+    sink.release.set()
+    ring = _FrameRing(sink, (4, 4, 3), capacity=3)
+    buffers = list(ring._buffers)
+    ring.close()
+    ring = _FrameRing(sink, (4, 4, 3), capacity=3)
+    assert all(a is b for a, b in zip(ring._buffers, buffers))
+    ring.close()
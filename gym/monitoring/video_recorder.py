@@ -2,13 +2,16 @@ import logging
 import json
 import os
 import subprocess
+import sys
 import tempfile
+import threading
 import os.path
 import distutils.spawn, distutils.version
 import numpy as np
 from six import StringIO
 import six
 import six.moves.urllib as urlparse
+from six.moves import queue
 
 from gym import error
 
@@ -32,12 +35,16 @@ class VideoRecorder(object):
         base_path (Optional[str]): Alternatively, path to the video file without extension, which will be added.
         metadata (Optional[dict]): Contents to save to the metadata file.
         enabled (bool): Whether to actually record video, or just no-op (for convenience)
+        buffer_frames (int): How many frames may wait for the video encoder before capture_frame blocks (or drops frames).
+        drop_frames (bool): Drop frames rather than block when the encoder falls behind.
     """
 
-    def __init__(self, env, path=None, metadata=None, enabled=True, base_path=None):
+    def __init__(self, env, path=None, metadata=None, enabled=True, base_path=None, buffer_frames=16, drop_frames=False):
         modes = env.metadata.get('render.modes', [])
         self._async = env.metadata.get('semantics.async')
         self.enabled = enabled
+        self.buffer_frames = buffer_frames
+        self.drop_frames = drop_frames
 
         # Don't bother setting anything else if not enabled
         if not self.enabled:
@@ -128,6 +135,10 @@ class VideoRecorder(object):
         if self.encoder:
             logger.debug('Closing video encoder: path=%s', self.path)
             self.encoder.close()
+            self.metadata['frames_encoded'] = self.encoder.frames_encoded
+            self.metadata['frames_dropped'] = self.encoder.frames_dropped
+            if self.encoder.failed:
+                self.broken = True
             self.encoder = None
         else:
             # No frames captured. Set metadata, and remove the empty output file.
@@ -164,7 +175,7 @@ class VideoRecorder(object):
 
     def _encode_image_frame(self, frame):
         if not self.encoder:
-            self.encoder = ImageEncoder(self.path, frame.shape, self.frames_per_sec)
+            self.encoder = ImageEncoder(self.path, frame.shape, self.frames_per_sec, self.buffer_frames, self.drop_frames)
             self.metadata['encoder_version'] = self.encoder.version_info
 
         try:
@@ -204,6 +215,13 @@ class TextEncoder(object):
 
         self.frames.append(frame_bytes)
 
+    @property
+    def frames_encoded(self):
+        return len(self.frames)
+
+    frames_dropped = 0
+    failed = False
+
     def close(self):
         #frame_duration = float(1) / self.frames_per_sec
         frame_duration = .5
@@ -238,9 +256,119 @@ class TextEncoder(object):
     def version_info(self):
         return {'backend':'TextEncoder','version':1}
 
+# Frame buffers of closed rings, by frame shape, so that consecutive
+# recorded episodes reuse them instead of reallocating
+_buffer_pool = {}
+_buffer_pool_lock = threading.Lock()
+
+def _take_buffers(frame_shape, capacity):
+    with _buffer_pool_lock:
+        buffers = _buffer_pool.pop(frame_shape, [])
+    buffers = buffers[:capacity]
+    while len(buffers) < capacity:
+        buffers.append(np.empty(frame_shape, dtype=np.uint8))
+    return buffers
+
+def _return_buffers(frame_shape, buffers):
+    with _buffer_pool_lock:
+        # Keep a single set per shape to bound the pool's size
+        _buffer_pool[frame_shape] = buffers
+
+class _FrameRing(object):
+    """A ring of preallocated frame buffers, drained into a binary file
+    (the encoder's stdin) by a writer thread.
+
+    put() copies the frame into a free buffer, so the caller never waits
+    on the encoder unless all `capacity` buffers are queued. In that case
+    put() blocks, or with drop_when_full=True drops the frame, which
+    decimates the video while the encoder catches up.
+    """
+
+    def __init__(self, sink, frame_shape, capacity, drop_when_full=False):
+        self.sink = sink
+        self.drop_when_full = drop_when_full
+        self.frames_written = 0
+        self.exc_info = None
+        # Counted separately since each is only updated by one thread
+        self._dropped_when_full = 0
+        self._dropped_after_failure = 0
+
+        self.frame_shape = tuple(frame_shape)
+        self._buffers = _take_buffers(self.frame_shape, capacity)
+        self._free = queue.Queue()
+        for i in range(capacity):
+            self._free.put(i)
+        self._filled = queue.Queue()
+
+        self._thread = threading.Thread(target=self._run, name='VideoFrameWriter')
+        self._thread.daemon = True
+        self._thread.start()
+
+    @property
+    def frames_dropped(self):
+        return self._dropped_when_full + self._dropped_after_failure
+
+    def put(self, frame):
+        try:
+            i = self._free.get(block=not self.drop_when_full)
+        except queue.Empty:
+            self._dropped_when_full += 1
+            return
+        np.copyto(self._buffers[i], frame)
+        self._filled.put(i)
+
+    def close(self):
+        """Writes every queued frame and stops the thread."""
+        self._filled.put(None)
+        self._thread.join()
+        _return_buffers(self.frame_shape, self._buffers)
+        self._buffers = None
+
+    def _run(self):
+        while True:
+            i = self._filled.get()
+            if i is None:
+                return
+            if self.exc_info is None:
+                try:
+                    # Writes straight from the buffer, without a bytes copy
+                    self.sink.write(self._buffers[i].data)
+                    self.frames_written += 1
+                except Exception:
+                    # Typically the encoder died. Keep recycling buffers so
+                    # that put() never deadlocks.
+                    self.exc_info = sys.exc_info()
+                    logger.error('Failed to write video frame: %s', self.exc_info[1])
+            if self.exc_info is not None:
+                self._dropped_after_failure += 1
+            self._free.put(i)
+
+# Looking up the encoder and its version means running subprocesses, so
+# it's done once per process rather than once per video
+_backend_info = {}
+
+def _find_backend():
+    if 'backend' not in _backend_info:
+        if distutils.spawn.find_executable('avconv') is not None:
+            _backend_info['backend'] = 'avconv'
+        elif distutils.spawn.find_executable('ffmpeg') is not None:
+            _backend_info['backend'] = 'ffmpeg'
+        else:
+            # Not cached, in case it gets installed later
+            return None
+    return _backend_info['backend']
+
+def _backend_version(backend):
+    key = ('version', backend)
+    if key not in _backend_info:
+        _backend_info[key] = str(subprocess.check_output([backend, '-version'],
+                                                         stderr=subprocess.STDOUT))
+    return _backend_info[key]
+
 class ImageEncoder(object):
-    def __init__(self, output_path, frame_shape, frames_per_sec):
+    def __init__(self, output_path, frame_shape, frames_per_sec, buffer_frames=16, drop_frames=False):
         self.proc = None
+        self.ring = None
         self.output_path = output_path
         # Frame shape should be lines-first, so w and h are swapped
         h, w, pixfmt = frame_shape
@@ -250,12 +378,11 @@ class ImageEncoder(object):
         self.includes_alpha = (pixfmt == 4)
         self.frame_shape = frame_shape
         self.frames_per_sec = frames_per_sec
+        self.buffer_frames = buffer_frames
+        self.drop_frames = drop_frames
 
-        if distutils.spawn.find_executable('avconv') is not None:
-            self.backend = 'avconv'
-        elif distutils.spawn.find_executable('ffmpeg') is not None:
-            self.backend = 'ffmpeg'
-        else:
+        self.backend = _find_backend()
+        if self.backend is None:
             raise error.DependencyNotInstalled("""Found neither the ffmpeg nor avconv executables. On OS X, you can install ffmpeg via `brew install ffmpeg`. On most Ubuntu variants, `sudo apt-get install ffmpeg` should do it. On Ubuntu 14.04, however, you'll need to install avconv with `sudo apt-get install libav-tools`.""")
 
         self.start()
@@ -264,8 +391,7 @@ class ImageEncoder(object):
     def version_info(self):
         return {
             'backend':self.backend,
-            'version':str(subprocess.check_output([self.backend, '-version'],
-                                                  stderr=subprocess.STDOUT)),
+            'version':_backend_version(self.backend),
             'cmdline':self.cmdline
         }
 
@@ -293,6 +419,7 @@ class ImageEncoder(object):
             self.proc = subprocess.Popen(self.cmdline, stdin=subprocess.PIPE, preexec_fn=os.setsid)
         else:
             self.proc = subprocess.Popen(self.cmdline, stdin=subprocess.PIPE)
+        self.ring = _FrameRing(self.proc.stdin, self.frame_shape, self.buffer_frames, self.drop_frames)
 
     def capture_frame(self, frame):
         if not isinstance(frame, (np.ndarray, np.generic)):
@@ -302,13 +429,27 @@ class ImageEncoder(object):
         if frame.dtype != np.uint8:
             raise error.InvalidFrame("Your frame has data type {}, but we require uint8 (i.e. RGB values from 0-255).".format(frame.dtype))
 
-        if distutils.version.LooseVersion(np.__version__) >= distutils.version.LooseVersion('1.9.0'):
-            self.proc.stdin.write(frame.tobytes())
-        else:
-            self.proc.stdin.write(frame.tostring())
+        self.ring.put(frame)
+
+    @property
+    def frames_encoded(self):
+        return self.ring.frames_written
+
+    @property
+    def frames_dropped(self):
+        return self.ring.frames_dropped
+
+    @property
+    def failed(self):
+        return self.ring.exc_info is not None
 
     def close(self):
-        self.proc.stdin.close()
+        self.ring.close()
+        try:
+            self.proc.stdin.close()
+        except (IOError, OSError):
+            # Already reported by the frame writer
+            pass
         ret = self.proc.wait()
         if ret != 0:
             logger.error("VideoRecorder encoder exited with status {}".format(ret))
@@ -7,13 +7,19 @@ We correspondly do not currently import this module.
 """
 
 import os
-from collections import defaultdict
+from collections import defaultdict, deque, namedtuple
 
 import json
+import logging
+import multiprocessing
 import numpy as np
 import requests
+from six.moves import cPickle as pickle
 
 import gym
+from gym.utils import atomic_write
+
+logger = logging.getLogger(__name__)
 
 def score_from_remote(url):
     result = requests.get(url)
@@ -121,7 +127,124 @@ def score_from_merged(episode_lengths, episode_rewards, episode_types, timestamp
         'seconds_in_total': seconds_in_total,
     }
 
-def benchmark_score_from_local(benchmark_id, training_dir):
+class OnlineScorer(object):
+    """Incrementally computes the same statistics as score_from_merged,
+    in O(1) amortized time per episode (for a fixed number of trials),
+    so that a live run can be polled cheaply.
+
+    Either feed it episodes with add_episode, or call
+    update(stats_recorder) to ingest whatever a StatsRecorder has
+    completed since the previous call. Without an initial_reset_timestamp
+    (given here or taken from the StatsRecorder), seconds_to_solve and
+    seconds_in_total are None.
+
+    Running means use the same sequential cumulative sums as
+    running_mean, so the results are identical to score_from_merged.
+    """
+
+    def __init__(self, trials, reward_threshold, initial_reset_timestamp=None):
+        self.trials = trials
+        self.reward_threshold = reward_threshold
+        self.initial_reset_timestamp = initial_reset_timestamp
+
+        self.number_episodes = 0
+        self.number_timesteps = 0
+        self.last_timestamp = None
+
+        # Cumulative reward before each episode in the current window,
+        # plus after the last; as in running_mean
+        self._cumsum = 0.
+        self._window_cumsums = deque([0.], maxlen=trials + 1)
+        # (reward, timesteps before the episode, timestamp) for the window
+        self._window = deque(maxlen=trials)
+
+        self._best_mean = None
+        self._best_rewards = None
+        self.episode_t_value = None
+        self.timestep_t_value = None
+        self._solve_timestamp = None
+
+        self._ingested = 0
+
+    def update(self, stats_recorder):
+        """Ingests the episodes stats_recorder completed since the last call."""
+        if self.initial_reset_timestamp is None:
+            self.initial_reset_timestamp = stats_recorder.initial_reset_timestamp
+        for i in range(self._ingested, len(stats_recorder.timestamps)):
+            episode_type = stats_recorder.episode_types[i] if i < len(stats_recorder.episode_types) else 't'
+            self.add_episode(stats_recorder.episode_lengths[i], stats_recorder.episode_rewards[i],
+                             stats_recorder.timestamps[i], episode_type)
+        self._ingested = len(stats_recorder.timestamps)
+
+    def add_episode(self, length, reward, timestamp, episode_type='t'):
+        # Only training episodes are scored
+        if episode_type != 't':
+            return
+        reward = float(reward)
+
+        self._window.append((reward, self.number_timesteps, timestamp))
+        self._cumsum += reward
+        self._window_cumsums.append(self._cumsum)
+        self.number_episodes += 1
+        self.number_timesteps += length
+        self.last_timestamp = timestamp
+
+        if self.number_episodes < self.trials:
+            return
+
+        # Mean of the window starting at episode start
+        start = self.number_episodes - self.trials
+        mean = (self._window_cumsums[-1] - self._window_cumsums[0]) / self.trials
+        if self.episode_t_value is None and self.reward_threshold is not None and mean >= self.reward_threshold:
+            _, timesteps_before, start_timestamp = self._window[0]
+            self.episode_t_value = start
+            self.timestep_t_value = timesteps_before
+            self._solve_timestamp = start_timestamp
+        # Strictly greater, so that ties keep the first window like np.argmax
+        if self._best_mean is None or mean > self._best_mean:
+            self._best_mean = mean
+            self._best_rewards = [r for r, _, _ in self._window]
+
+    def score(self):
+        """Returns the same dict as score_from_merged."""
+        mean = error = seconds_to_solve = seconds_in_total = None
+        if self.last_timestamp is not None and self.initial_reset_timestamp is not None:
+            # This is: time from the first reset to the end of the last episode
+            seconds_in_total = self.last_timestamp - self.initial_reset_timestamp
+        if self._best_rewards is not None:
+            best_rewards = np.array(self._best_rewards)
+            mean = np.mean(best_rewards)
+            if self.trials == 1: # avoid NaN
+                error = 0.
+            else:
+                error = np.std(best_rewards) / (np.sqrt(self.trials) - 1)
+        if self._solve_timestamp is not None and self.initial_reset_timestamp is not None:
+            seconds_to_solve = self._solve_timestamp - self.initial_reset_timestamp
+
+        return {
+            'episode_t_value': self.episode_t_value,
+            'timestep_t_value': self.timestep_t_value,
+            'mean': mean,
+            'error': error,
+            'number_episodes': self.number_episodes,
+            'number_timesteps': self.number_timesteps,
+            'seconds_to_solve': seconds_to_solve,
+            'seconds_in_total': seconds_in_total,
+        }
+
+    @property
+    def solved(self):
+        return self.episode_t_value is not None
+
+def benchmark_score_from_local(benchmark_id, training_dir, processes=None, cache_path=None):
+    """Scores every monitor directory under training_dir against a benchmark.
+
+    Args:
+        benchmark_id (str): The benchmark to score against.
+        training_dir (str): Searched recursively for monitor directories.
+        processes (Optional[int]): If greater than 1, load and score directories in a pool of this many processes.
+        cache_path (Optional[str]): A file in which to keep each directory's result, keyed by the size and mtime of its monitor files. Later calls only rescore directories that changed.
+    """
     spec = gym.benchmark_spec(benchmark_id)
 
     directories = []
@@ -130,18 +253,71 @@ def benchmark_score_from_local(benchmark_id, training_dir):
         if manifests:
             directories.append(name)
 
-    benchmark_results = defaultdict(list)
-    for training_dir in directories:
-        results = gym.monitoring.load_results(training_dir)
+    cache = _load_score_cache(cache_path)
+    keys = dict((directory, (benchmark_id, _directory_fingerprint(directory))) for directory in directories)
+    stale = [directory for directory in directories
+             if cache.get(directory, (None,))[0] != keys[directory]]
+
+    if processes is not None and processes > 1 and len(stale) > 1:
+        pool = multiprocessing.Pool(min(processes, len(stale)))
+        try:
+            # map preserves order, so aggregation sees the same sequence
+            scored = pool.map(_score_training_dir, [(spec, directory) for directory in stale])
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        scored = [_score_training_dir((spec, directory)) for directory in stale]
+
+    for directory, (env_id, benchmark_result) in zip(stale, scored):
+        cache[directory] = (keys[directory], env_id, benchmark_result)
+    if cache_path is not None and stale:
+        # Drop directories that no longer exist
+        _save_score_cache(cache_path, dict((directory, cache[directory]) for directory in directories))
 
-        env_id = results['env_info']['env_id']
-        benchmark_result = spec.score_evaluation(env_id, results['data_sources'], results['initial_reset_timestamps'], results['episode_lengths'], results['episode_rewards'], results['episode_types'], results['timestamps'])
-        # from pprint import pprint
-        # pprint(benchmark_result)
+    benchmark_results = defaultdict(list)
+    for directory in directories:
+        _, env_id, benchmark_result = cache[directory]
         benchmark_results[env_id].append(benchmark_result)
 
     return gym.benchmarks.scoring.benchmark_aggregate_score(spec, benchmark_results)
 
+def _score_training_dir(args):
+    # Module level (and taking one tuple) so that it can be sent to a pool
+    spec, training_dir = args
+    results = gym.monitoring.load_results(training_dir)
+
+    env_id = results['env_info']['env_id']
+    benchmark_result = spec.score_evaluation(env_id, results['data_sources'], results['initial_reset_timestamps'], results['episode_lengths'], results['episode_rewards'], results['episode_types'], results['timestamps'])
+    return env_id, benchmark_result
+
+def _directory_fingerprint(training_dir):
+    """The (name, size, mtime) of every monitor file besides videos, which
+    changes whenever the directory's results might have."""
+    fingerprint = []
+    for path in sorted(gym.monitoring.monitor_manager.detect_monitor_files(training_dir)):
+        name = os.path.basename(path)
+        if '.video.' in name:
+            continue
+        stat = os.stat(path)
+        fingerprint.append((name, stat.st_size, stat.st_mtime))
+    return tuple(fingerprint)
+
+def _load_score_cache(cache_path):
+    if cache_path is None or not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    except Exception as e:
+        # The cache is only an optimization
+        logger.warn('Ignoring unreadable score cache %s: %s', cache_path, e)
+        return {}
+
+def _save_score_cache(cache_path, cache):
+    with atomic_write.atomic_write(cache_path, binary=True) as f:
+        pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+
 def benchmark_score_from_merged(benchmark, env_id, episode_lengths, episode_rewards, episode_types):
     """Method to calculate an environment's benchmark score from merged
     monitor files.
@@ -153,49 +329,110 @@ def running_mean(x, N):
     cumsum = np.cumsum(np.insert(x, 0, 0))
     return (cumsum[N:] - cumsum[:-N]) / N
 
+# Mirrors the result of scipy.stats.binned_statistic
+BinnedStatistic = namedtuple('BinnedStatistic', ['statistic', 'bin_edges', 'binnumber'])
+
+def _bin_edges(x, buckets):
+    if not np.isscalar(buckets):
+        return np.asarray(buckets, dtype='float64')
+    low, high = float(x.min()), float(x.max())
+    if low == high:
+        low -= 0.5
+        high += 0.5
+    return np.linspace(low, high, buckets + 1)
+
+def binned_means(x, ys, buckets):
+    """Bins x and returns the mean of each of the ys within every bin, as
+    BinnedStatistics matching scipy.stats.binned_statistic(x, y, 'mean',
+    buckets). The bin assignment is shared between the ys."""
+    x = np.asarray(x, dtype='float64')
+    edges = _bin_edges(x, buckets)
+    binnumber = np.digitize(x, edges)
+    # Values on the rightmost edge belong to the last bin rather than
+    # being outliers. (scipy compares after rounding, which only matters
+    # for points beyond the edge, and with computed edges there are none.)
+    binnumber[x == edges[-1]] -= 1
+
+    # Bins 0 and len(edges) hold outliers
+    minlength = len(edges) + 1
+    counts = np.bincount(binnumber, minlength=minlength)
+    occupied = counts.nonzero()
+    results = []
+    for y in ys:
+        sums = np.bincount(binnumber, weights=np.asarray(y, dtype='float64'), minlength=minlength)
+        statistic = np.empty(minlength)
+        statistic.fill(np.nan)
+        statistic[occupied] = sums[occupied] / counts[occupied]
+        results.append(BinnedStatistic(statistic[1:-1], edges, binnumber))
+    return results
+
+class GraphStats(object):
+    """Accumulates episodes and computes compute_graph_stats over all of
+    them. Appending is amortized O(1) per episode, so a live run can be
+    updated as episodes complete and graphed on demand."""
+
+    def __init__(self, initial_reset_timestamp, buckets):
+        self.initial_reset_timestamp = initial_reset_timestamp
+        self.buckets = buckets
+        self.num_episodes = 0
+        self._lengths = np.zeros(16, dtype='int64')
+        self._rewards = np.zeros(16, dtype='float64')
+        self._timestamps = np.zeros(16, dtype='float64')
+
+    def add_episodes(self, episode_lengths, episode_rewards, timestamps):
+        n = len(episode_lengths)
+        end = self.num_episodes + n
+        if end > len(self._lengths):
+            capacity = max(end, 2 * len(self._lengths))
+            for name in ['_lengths', '_rewards', '_timestamps']:
+                old = getattr(self, name)
+                new = np.zeros(capacity, dtype=old.dtype)
+                new[:self.num_episodes] = old[:self.num_episodes]
+                setattr(self, name, new)
+        self._lengths[self.num_episodes:end] = episode_lengths
+        self._rewards[self.num_episodes:end] = episode_rewards
+        self._timestamps[self.num_episodes:end] = timestamps
+        self.num_episodes = end
+
+    def compute(self):
+        num_episodes = self.num_episodes
+
+        # No episodes to bin
+        if num_episodes == 0:
+            return None
+
+        episode_lengths = self._lengths[:num_episodes]
+        episode_rewards = self._rewards[:num_episodes]
+
+        # The index of the start of each episode
+        x_timestep = np.cumsum(episode_lengths) - episode_lengths
+
+        # Delta since the beginning of time
+        x_seconds = self._timestamps[:num_episodes] - self.initial_reset_timestamp
+
+        # The index of each episode
+        x_episode = np.arange(num_episodes)
+
+        # Calculate the appropriate x/y statistics
+        x_timestep_y_reward, x_timestep_y_length = binned_means(x_timestep, [episode_rewards, episode_lengths], self.buckets)
+        x_episode_y_reward, x_episode_y_length = binned_means(x_episode, [episode_rewards, episode_lengths], self.buckets)
+        x_seconds_y_reward, x_seconds_y_length = binned_means(x_seconds, [episode_rewards, episode_lengths], self.buckets)
+
+        return {
+            'initial_reset_timestamp': self.initial_reset_timestamp,
+            'x_timestep_y_reward': graphable_binned_statistic(x_timestep_y_reward),
+            'x_timestep_y_length': graphable_binned_statistic(x_timestep_y_length),
+            'x_episode_y_reward': graphable_binned_statistic(x_episode_y_reward),
+            'x_episode_y_length': graphable_binned_statistic(x_episode_y_length),
+            'x_seconds_y_length': graphable_binned_statistic(x_seconds_y_length),
+            'x_seconds_y_reward': graphable_binned_statistic(x_seconds_y_reward),
+        }
+
 def compute_graph_stats(episode_lengths, episode_rewards, timestamps, initial_reset_timestamp, buckets):
     """Method to compute the aggregates for the graphs."""
-    # Not a dependency of OpenAI Gym generally.
-    import scipy.stats
-
-    num_episodes = len(episode_lengths)
-
-    # Catch for if no files written which causes error with scipy.stats.binned_statistic
-    if num_episodes == 0:
-        return None
-
-    episode_rewards = np.array(episode_rewards)
-    episode_lengths = np.array(episode_lengths)
-
-    # The index of the start of each episode
-    x_timestep = np.cumsum(np.insert(episode_lengths, 0, 0))[:-1]
-    assert len(x_timestep) == num_episodes
-
-    # Delta since the beginning of time
-    x_seconds = [timestamp - initial_reset_timestamp for timestamp in timestamps]
-
-    # The index of each episode
-    x_episode = range(num_episodes)
-
-    # Calculate the appropriate x/y statistics
-    x_timestep_y_reward = scipy.stats.binned_statistic(x_timestep, episode_rewards, 'mean', buckets)
-    x_timestep_y_length = scipy.stats.binned_statistic(x_timestep, episode_lengths, 'mean', buckets)
-
-    x_episode_y_reward = scipy.stats.binned_statistic(x_episode, episode_rewards, 'mean', buckets)
-    x_episode_y_length = scipy.stats.binned_statistic(x_episode, episode_lengths, 'mean', buckets)
-
-    x_seconds_y_reward = scipy.stats.binned_statistic(x_seconds, episode_rewards, 'mean', buckets)
-    x_seconds_y_length = scipy.stats.binned_statistic(x_seconds, episode_lengths, 'mean', buckets)
-
-    return {
-        'initial_reset_timestamp': initial_reset_timestamp,
-        'x_timestep_y_reward': graphable_binned_statistic(x_timestep_y_reward),
-        'x_timestep_y_length': graphable_binned_statistic(x_timestep_y_length),
-        'x_episode_y_reward': graphable_binned_statistic(x_episode_y_reward),
-        'x_episode_y_length': graphable_binned_statistic(x_episode_y_length),
-        'x_seconds_y_length': graphable_binned_statistic(x_seconds_y_length),
-        'x_seconds_y_reward': graphable_binned_statistic(x_seconds_y_reward),
-    }
+    graph_stats = GraphStats(initial_reset_timestamp, buckets)
+    graph_stats.add_episodes(episode_lengths, episode_rewards, timestamps)
+    return graph_stats.compute()
 
 def graphable_binned_statistic(binned):
     x = running_mean(binned.bin_edges, 2)
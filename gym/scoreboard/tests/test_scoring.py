@@ -397,3 +397,124 @@ def test_reward_per_time_benchmark_solved():
     # Currently reward per time has no solved functionality, so num_envs_solved
     # is 0
     _assert_benchmark_score(scores, score=1.0, num_envs_solved=0)
+
+def _write_monitor_runs(temp, env_ids):
+    import os
+    from gym.wrappers import Monitor
+    for i, env_id in enumerate(env_ids):
+        env = Monitor(gym.make(env_id), os.path.join(temp, 'run{}'.format(i)), video_callable=False)
+        env.seed(i)
+        env.action_space.seed(i)
+        for _ in range(3):
+            env.reset()
+            done = False
+            while not done:
+                _, _, done, _ = env.step(env.action_space.sample())
+        env.close()
+
+def test_benchmark_score_from_local_parallel_and_cached():
+    import os, shutil, tempfile
+    from gym.scoreboard.scoring import benchmark_score_from_local
+    temp = tempfile.mkdtemp()
+    try:
+        _write_monitor_runs(temp, ['CartPole-v0', 'Pendulum-v0', 'CartPole-v0'])
+        serial = benchmark_score_from_local('ClassicControl2-v0', temp)
+
+        parallel = benchmark_score_from_local('ClassicControl2-v0', temp, processes=2)
+        assert parallel == serial
+
+        cache_path = os.path.join(temp, 'scores.pkl')
+        assert benchmark_score_from_local('ClassicControl2-v0', temp, cache_path=cache_path) == serial
+        # Unchanged directories are not reloaded
+        from gym import monitoring
+        load_results = monitoring.load_results
+        monitoring.load_results = None
+        try:
+            assert benchmark_score_from_local('ClassicControl2-v0', temp, cache_path=cache_path) == serial
+        finally:
+            monitoring.load_results = load_results
+    finally:
+        shutil.rmtree(temp)
+
+def test_compute_episode_durations():
+    # Interleaved sources; source 2 has no initial reset timestamp
+    durations = scoring._compute_episode_durations(
+        initial_reset_timestamps=[0, 10],
+        data_sources=[0, 1, 0, 2, 1, 0],
+        timestamps=[1, 12, 4, 13, 15, 16])
+    assert np.array_equal(durations, [1, 2, 3, 0, 3, 12])
+
+def test_online_scorer_matches_score_from_merged():
+    from gym.scoreboard.scoring import OnlineScorer, score_from_merged
+    rng = np.random.RandomState(0)
+    lengths = rng.randint(1, 50, 60).tolist()
+    rewards = rng.uniform(0, 10, 60).tolist()
+    types = rng.choice(['t', 'e'], 60).tolist()
+    timestamps = np.sort(rng.uniform(5, 100, 60)).tolist()
+
+    scorer = OnlineScorer(trials=5, reward_threshold=6.0, initial_reset_timestamp=1.0)
+    for i in range(60):
+        scorer.add_episode(lengths[i], rewards[i], timestamps[i], types[i])
+        expected = score_from_merged(lengths[:i+1], rewards[:i+1], types[:i+1], timestamps[:i+1], 1.0, 5, 6.0)
+        assert scorer.score() == expected, (i, scorer.score(), expected)
+    assert scorer.solved
+
+def test_online_scorer_without_initial_reset_timestamp():
+    from gym.scoreboard.scoring import OnlineScorer
+    scorer = OnlineScorer(trials=1, reward_threshold=1.0)
+    scorer.add_episode(10, 2.0, 5.0)
+    score = scorer.score()
+    assert score['episode_t_value'] == 0
+    assert score['seconds_in_total'] is None
+    assert score['seconds_to_solve'] is None
+
+def test_online_scorer_update_from_stats_recorder():
+    from gym.monitoring import StatsRecorder
+    from gym.scoreboard.scoring import OnlineScorer
+    recorder = StatsRecorder('/nonexistent', 'test')
+    scorer = OnlineScorer(trials=2, reward_threshold=3.0)
+    for reward in [1.0, 2.0, 4.0, 4.0]:
+        recorder.before_reset()
+        recorder.after_reset(None)
+        recorder.before_step(None)
+        recorder.after_step(None, reward, True, {})
+        scorer.update(recorder)
+    score = scorer.score()
+    assert score['number_episodes'] == 4
+    assert score['episode_t_value'] == 1
+    assert score['mean'] == 4.0
+
+def test_binned_means_match_scipy():
+    try:
+        import scipy.stats
+    except ImportError:
+        # Only used as a reference
+        return
+    from gym.scoreboard.scoring import binned_means
+    rng = np.random.RandomState(0)
+    for x in [rng.uniform(0, 100, 200), np.arange(50), np.full(10, 3.0)]:
+        ys = [rng.uniform(size=len(x)), rng.randint(1, 100, len(x))]
+        for buckets in [1, 7, 30]:
+            for y, binned in zip(ys, binned_means(x, ys, buckets)):
+                expected = scipy.stats.binned_statistic(x, y, 'mean', buckets)
+                assert np.array_equal(binned.bin_edges, expected.bin_edges)
+                assert np.array_equal(binned.statistic, expected.statistic, equal_nan=True)
+                assert np.array_equal(binned.binnumber, expected.binnumber)
+
+def test_graph_stats_streaming():
+    from gym.scoreboard.scoring import GraphStats, compute_graph_stats
+    rng = np.random.RandomState(0)
+    lengths = rng.randint(1, 100, 100)
+    rewards = rng.uniform(size=100)
+    timestamps = np.sort(rng.uniform(0, 500, 100))
+
+    graph_stats = GraphStats(0.0, 20)
+    assert graph_stats.compute() is None
+    for start in range(0, 100, 7):
+        graph_stats.add_episodes(lengths[start:start+7], rewards[start:start+7], timestamps[start:start+7])
+    streamed = graph_stats.compute()
+    expected = compute_graph_stats(lengths, rewards, timestamps, 0.0, 20)
+    for key in expected:
+        if key != 'initial_reset_timestamp':
+            assert np.array_equal(streamed[key]['x'], expected[key]['x'])
+            assert np.array_equal(streamed[key]['y'], expected[key]['y'])
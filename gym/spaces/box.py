@@ -1,7 +1,6 @@
 import numpy as np
 
 import gym
-from gym.spaces import prng
 
 class Box(gym.Space):
     """
@@ -10,12 +9,20 @@ class Box(gym.Space):
 
     Example usage:
     self.action_space = spaces.Box(low=-10, high=10, shape=(1,))
+
+    When a Box is built from scalar bounds and a shape, as above, its low
+    and high arrays are read-only: changing them in place raises
+    ValueError. To change the bounds, assign new arrays to low and high.
+    A Box built from arrays keeps the arrays it was given, writable.
     """
     def __init__(self, low, high, shape=None):
         """
         Two kinds of valid input:
             Box(-1.0, 1.0, (3,4)) # low and high are scalars, and shape is provided
             Box(np.array([-1.0,-2.0]), np.array([2.0,4.0])) # low and high are arrays of the same shape
+
+        In the first form, low and high are read-only arrays, which lets
+        contains() compare against the scalar bounds.
         """
         if shape is None:
             assert low.shape == high.shape
@@ -25,16 +32,37 @@ class Box(gym.Space):
             assert np.isscalar(low) and np.isscalar(high)
             self.low = low + np.zeros(shape)
             self.high = high + np.zeros(shape)
-    def sample(self):
-        return prng.np_random.uniform(low=self.low, high=self.high, size=self.low.shape)
+            self.low.flags.writeable = False
+            self.high.flags.writeable = False
+            self._scalar_bounds = (self.low, self.high, float(low), float(high))
+    def sample(self, n=None):
+        if n is None:
+            return self.np_random.uniform(low=self.low, high=self.high, size=self.low.shape)
+        return self.np_random.uniform(low=self.low, high=self.high, size=(n,) + self.low.shape)
     def contains(self, x):
-        return x.shape == self.shape and (x >= self.low).all() and (x <= self.high).all()
+        if x.shape != self.shape:
+            return False
+        bounds = self._scalar_bounds
+        # Unless low or high were reassigned since __init__
+        if bounds is not None and bounds[0] is self.low and bounds[1] is self.high:
+            # Two reductions instead of two temporary boolean arrays
+            return x.size == 0 or bool(x.min() >= bounds[2] and x.max() <= bounds[3])
+        return (x >= self.low).all() and (x <= self.high).all()
+    def contains_n(self, sample_n):
+        sample_n = np.asarray(sample_n)
+        if sample_n.shape[1:] != self.shape:
+            return np.zeros(sample_n.shape[:1] or (1,), dtype=bool)
+        inside = (sample_n >= self.low) & (sample_n <= self.high)
+        return inside.reshape(len(sample_n), -1).all(axis=1)
 
     def to_jsonable(self, sample_n):
         return np.array(sample_n).tolist()
     def from_jsonable(self, sample_n):
         return [np.asarray(sample) for sample in sample_n]
 
+    # (low, high, scalar low, scalar high) for boxes built from scalars
+    _scalar_bounds = None
+
     @property
     def shape(self):
         return self.low.shape
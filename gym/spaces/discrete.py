@@ -1,7 +1,6 @@
 import numpy as np
 
 import gym, time
-from gym.spaces import prng
 
 class Discrete(gym.Space):
     """
@@ -12,16 +11,23 @@ class Discrete(gym.Space):
     """
     def __init__(self, n):
         self.n = n
-    def sample(self):
-        return prng.np_random.randint(self.n)
+    def sample(self, n=None):
+        return self.np_random.randint(self.n, size=n)
     def contains(self, x):
         if isinstance(x, int):
             as_int = x
+        elif isinstance(x, np.integer):
+            as_int = int(x)
         elif isinstance(x, (np.generic, np.ndarray)) and (x.dtype.kind in np.typecodes['AllInteger'] and x.shape == ()):
             as_int = int(x)
         else:
             return False
         return as_int >= 0 and as_int < self.n
+    def contains_n(self, sample_n):
+        sample_n = np.asarray(sample_n)
+        if sample_n.ndim != 1 or sample_n.dtype.kind not in np.typecodes['AllInteger']:
+            return np.zeros(sample_n.shape[:1] or (1,), dtype=bool)
+        return (sample_n >= 0) & (sample_n < self.n)
     def __repr__(self):
         return "Discrete(%d)" % self.n
     def __eq__(self, other):
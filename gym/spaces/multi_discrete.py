@@ -1,7 +1,7 @@
 import numpy as np
 
 import gym
-from gym.spaces import prng, Discrete, Box
+from gym.spaces import Discrete, Box
 from gym.error import Error
 
 class MultiDiscrete(gym.Space):
@@ -31,13 +31,24 @@ class MultiDiscrete(gym.Space):
         self.high = np.array([x[1] for x in array_of_param_array])
         self.num_discrete_space = self.low.shape[0]
 
-    def sample(self):
+    def sample(self, n=None):
         """ Returns a array with one sample from each discrete action space """
         # For each row: round(random .* (max - min) + min, 0)
-        random_array = prng.np_random.rand(self.num_discrete_space)
-        return [int(x) for x in np.rint(np.multiply((self.high - self.low), random_array) + self.low)]
+        if n is None:
+            random_array = self.np_random.rand(self.num_discrete_space)
+            return [int(x) for x in np.rint(np.multiply((self.high - self.low), random_array) + self.low)]
+        random_array = self.np_random.rand(n, self.num_discrete_space)
+        return np.rint(np.multiply((self.high - self.low), random_array) + self.low).astype(int)
     def contains(self, x):
-        return len(x) == self.num_discrete_space and (np.array(x) >= self.low).all() and (np.array(x) <= self.high).all()
+        if len(x) != self.num_discrete_space:
+            return False
+        x = np.asarray(x)
+        return (x >= self.low).all() and (x <= self.high).all()
+    def contains_n(self, sample_n):
+        sample_n = np.asarray(sample_n)
+        if sample_n.ndim != 2 or sample_n.shape[1] != self.num_discrete_space:
+            return np.zeros(sample_n.shape[:1] or (1,), dtype=bool)
+        return ((sample_n >= self.low) & (sample_n <= self.high)).all(axis=1)
 
     @property
     def shape(self):
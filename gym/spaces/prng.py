@@ -15,6 +15,7 @@ def seed(seed=None):
     np_random.seed(seed)
 
 # This numpy.random.RandomState gets used in all spaces for their
-# 'sample' method. It's not really expected that people will be using
+# 'sample' method, unless a space has been given its own via
+# Space.seed(). It's not really expected that people will be using
 # these in their algorithms.
 seed(0)
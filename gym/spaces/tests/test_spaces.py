@@ -29,3 +29,124 @@ def test_roundtripping(space):
     s2p = space.to_jsonable([sample_2_prime])
     assert s1 == s1p, "Expected {} to equal {}".format(s1, s1p)
     assert s2 == s2p, "Expected {} to equal {}".format(s2, s2p)
+
+@tools.params(Discrete(3),
+              Box(np.array([0,0]),np.array([1,5])),
+              Box(-1.0, 1.0, (3,4)),
+              MultiDiscrete([ [0, 1], [0, 1], [0, 100] ]),
+              )
+def test_sample_n(space):
+    sample_n = space.sample(50)
+    assert len(sample_n) == 50
+    assert np.asarray(sample_n).shape[1:] == np.asarray(space.sample()).shape
+    assert space.contains_n(sample_n).all()
+
+def test_tuple_sample_n():
+    space = Tuple([Discrete(5), Box(np.array([0,0]),np.array([1,5]))])
+    discrete_n, box_n = space.sample(20)
+    assert discrete_n.shape == (20,)
+    assert box_n.shape == (20, 2)
+    assert space.contains_n((discrete_n, box_n)).all()
+
+    box_n[3] = [2, 2]
+    assert np.array_equal(np.flatnonzero(~space.contains_n((discrete_n, box_n))), [3])
+
+def test_tuple_of_custom_spaces():
+    from gym import Space
+    class Coin(Space):
+        def sample(self):
+            return 0
+        def contains(self, x):
+            return x in [0, 1]
+    space = Tuple([Coin(), Discrete(2)])
+    assert space.contains(space.sample())
+
+def test_tuple_contains_n_wrong_number_of_parts():
+    space = Tuple([Discrete(5), Discrete(5), Discrete(5)])
+    discrete_n, _, _ = space.sample(4)
+    assert not space.contains_n((discrete_n, discrete_n)).any()
+    assert len(space.contains_n((discrete_n, discrete_n))) == 4
+
+def test_box_sample_n_matches_repeated_samples():
+    from gym import spaces
+    space = Box(np.array([0,-1]),np.array([1,5]))
+    spaces.seed(0)
+    samples = [space.sample() for _ in range(10)]
+    spaces.seed(0)
+    assert np.array_equal(space.sample(10), samples)
+
+def test_contains_n_out_of_bounds():
+    assert np.array_equal(Discrete(3).contains_n(np.array([0, 3, -1, 2])), [True, False, False, True])
+    assert np.array_equal(MultiDiscrete([ [0, 1], [0, 4] ]).contains_n([[0, 4], [1, 5]]), [True, False])
+    assert not Box(-1.0, 1.0, (3,)).contains_n(np.zeros((4, 2))).any()
+
+def test_contains_n_scalar_input():
+    # Not a batch: one invalid sample
+    for space in [Discrete(3), Box(-1.0, 1.0, (3,)), MultiDiscrete([ [0, 1], [0, 4] ])]:
+        assert np.array_equal(space.contains_n(1), [False])
+
+def test_seeded_space_is_independent():
+    from gym import spaces
+    space = Box(-1.0, 1.0, (3,))
+    assert space.seed(3) == [3]
+    first = space.sample(5)
+
+    # Neither sampling other spaces nor reseeding the common generator
+    # changes the samples of a seeded space
+    spaces.seed(0)
+    Box(-1.0, 1.0, (3,)).sample(10)
+    space.seed(3)
+    assert np.array_equal(space.sample(5), first)
+
+def test_unseeded_space_uses_common_generator():
+    from gym import spaces
+    spaces.seed(0)
+    samples = [Discrete(100).sample() for _ in range(5)]
+    spaces.seed(0)
+    space = Discrete(100)
+    assert [space.sample() for _ in range(5)] == samples
+    assert space.np_random is spaces.prng.np_random
+
+def test_tuple_seed():
+    space = Tuple([Discrete(5), Box(-1.0, 1.0, (2,))])
+    seeds = space.seed(1)
+    assert len(seeds) == 3
+    first = space.sample(4)
+    space.seed(1)
+    second = space.sample(4)
+    assert all(np.array_equal(a, b) for a, b in zip(first, second))
+
+def test_contains_fast_paths():
+    box = Box(-1.0, 1.0, (2, 3))
+    assert box.contains(np.zeros((2, 3)))
+    assert not box.contains(np.full((2, 3), 1.5))
+    assert not box.contains(np.full((2, 3), np.nan))
+    assert not box.contains(np.zeros(6))
+    # Reassigned bounds are picked up
+    box.high = np.array([[1.0, 1.0, 1.0], [1.0, 1.0, 2.0]])
+    x = np.zeros((2, 3))
+    x[1, 2] = 1.5
+    assert box.contains(x)
+    x[0, 0] = 1.5
+    assert not box.contains(x)
+
+    assert Discrete(3).contains(np.int64(2))
+    assert not Discrete(3).contains(np.int64(3))
+    assert MultiDiscrete([[0, 1], [0, 2]]).contains([1, 2])
+    assert not MultiDiscrete([[0, 1], [0, 2]]).contains([1, 2, 0])
+
+def test_box_contains_after_changing_bounds():
+    space = Box(-1.0, 1.0, (3,))
+    assert space.contains(np.full(3, 0.5))
+    try:
+        space.high[:] = 0.25
+    except ValueError:
+        pass
+    else:
+        assert False, 'the bounds of a Box built from scalars are read-only'
+    space.high = np.full(3, 0.25)
+    assert not space.contains(np.full(3, 0.5))
+
+    space = Box(np.zeros(3), np.ones(3))
+    space.high *= 0.25
+    assert not space.contains(np.full(3, 0.5))
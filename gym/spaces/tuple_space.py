@@ -1,3 +1,5 @@
+import numpy as np
+
 from gym import Space
 
 class Tuple(Space):
@@ -10,8 +12,18 @@ class Tuple(Space):
     def __init__(self, spaces):
         self.spaces = spaces
 
-    def sample(self):
-        return tuple([space.sample() for space in self.spaces])
+    def seed(self, seed=None):
+        """Seed this space and, from it, each of the subspaces"""
+        seeds = super(Tuple, self).seed(seed)
+        for space in self.spaces:
+            seeds += space.seed(int(self.np_random.randint(2**31)))
+        return seeds
+
+    def sample(self, n=None):
+        if n is None:
+            # Subspaces defined outside gym may not take n
+            return tuple([space.sample() for space in self.spaces])
+        return tuple([space.sample(n) for space in self.spaces])
 
     def contains(self, x):
         if isinstance(x, list):
@@ -19,6 +31,13 @@ class Tuple(Space):
         return isinstance(x, tuple) and len(x) == len(self.spaces) and all(
             space.contains(part) for (space,part) in zip(self.spaces,x))
 
+    def contains_n(self, sample_n):
+        """sample_n is a tuple with one batch per subspace, as returned by sample(n)"""
+        if len(sample_n) != len(self.spaces):
+            return np.zeros(len(sample_n[0]) if len(sample_n) else 0, dtype=bool)
+        parts = [space.contains_n(part) for (space,part) in zip(self.spaces,sample_n)]
+        return np.logical_and.reduce(parts)
+
     def __repr__(self):
         return "Tuple(" + ", ". join([str(s) for s in self.spaces]) + ")"
 
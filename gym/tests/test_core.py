@@ -1,4 +1,4 @@
-from gym import core
+from gym import core, error
 
 class ArgumentEnv(core.Env):
     calls = 0
@@ -13,3 +13,53 @@ def test_env_instantiation():
     env = ArgumentEnv('arg')
     assert env.arg == 'arg'
     assert env.calls == 1
+
+class CountingSpace(object):
+    calls = 0
+
+    def contains(self, x):
+        self.calls += 1
+        return False
+
+class ValidatingEnv(core.Env):
+    def __init__(self):
+        self.action_space = CountingSpace()
+
+def test_validation_modes():
+    env = ValidatingEnv()
+    try:
+        for mode, checks in [('strict', 200), ('sampled', 2), ('off', 0)]:
+            core.set_validation_mode(mode)
+            env.action_space.calls = 0
+            results = [env._contains(env.action_space, 0) for _ in range(200)]
+            assert env.action_space.calls == checks
+            assert results.count(False) == checks
+    finally:
+        core.set_validation_mode('strict')
+
+def test_sampled_validation_counts_each_space():
+    env = ValidatingEnv()
+    env.observation_space = CountingSpace()
+    env.validation_mode = 'sampled'
+    # Like SemisuperEnv.step, checks the action then the observation
+    for _ in range(200):
+        env._contains(env.action_space, 0)
+        env._contains(env.observation_space, 0)
+    assert env.action_space.calls == 2
+    assert env.observation_space.calls == 2
+
+def test_validation_mode_per_env():
+    env = ValidatingEnv()
+    env.validation_mode = 'off'
+    assert env._contains(env.action_space, 0)
+    assert env.action_space.calls == 0
+    assert not ValidatingEnv()._contains(env.action_space, 0)
+
+def test_invalid_validation_mode():
+    try:
+        core.set_validation_mode('sometimes')
+    except error.Error:
+        pass
+    else:
+        assert False, 'set_validation_mode accepted an invalid mode'
+    assert core.get_validation_mode() == 'strict'
@@ -0,0 +1,113 @@
+import collections
+import hashlib
+import logging
+import multiprocessing
+import threading
+
+from gym.utils import seeding
+
+logger = logging.getLogger(__name__)
+
+def rng_state_key(np_random):
+    """A hashable digest of the full state of a RandomState."""
+    name, keys, pos, has_gauss, cached_gaussian = np_random.get_state()
+    return (hashlib.sha1(keys.tobytes()).hexdigest(), int(pos), int(has_gauss), float(cached_gaussian))
+
+def _generate_for_seed(job):
+    generate, seed, args = job
+    np_random, _ = seeding.np_random(seed)
+    key = (args, rng_state_key(np_random))
+    geometry = generate(np_random, *args)
+    return key, geometry, np_random.get_state()
+
+class GeometryCache(object):
+    """
+    Memoizes the geometry an environment draws from its np_random at reset
+    (terrain, tracks), keyed by the full state of np_random beforehand and
+    by any extra arguments of the generator (e.g. hardcore).
+
+    On a hit, np_random is moved to the state it would have been in after
+    generating, so the rest of the episode sees exactly the random numbers
+    it would have seen without the cache: the same seed still yields the
+    same worlds. The least recently used entries are evicted beyond
+    `maxsize`.
+
+    `generate(np_random, *args)` must draw only from np_random, and its
+    result is shared between every env that hits the same entry, so it
+    must be treated as read-only (and be picklable, for pregenerate).
+    `args` must be hashable.
+    """
+
+    def __init__(self, generate, maxsize=64):
+        self.generate = generate
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pending = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, np_random, *args):
+        key = (args, rng_state_key(np_random))
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._entries[key] = entry
+                self.hits += 1
+        if entry is not None:
+            geometry, state = entry
+            np_random.set_state(state)
+            return geometry
+
+        geometry = self.generate(np_random, *args)
+        with self._lock:
+            self.misses += 1
+            self._put(key, geometry, np_random.get_state())
+        return geometry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def pregenerate(self, seeds, processes=None, args=()):
+        """Starts generating the geometry for a freshly seeded env (as after
+        env.seed(seed)) for each of `seeds`, with the extra generator
+        arguments `args`, in a pool of background processes. Entries are
+        added as they complete; call wait() to block until all of them are
+        in, and to raise any error from generating them."""
+        self.wait()
+        self._pool = multiprocessing.Pool(processes)
+        self._pending = self._pool.map_async(
+            _generate_for_seed, [(self.generate, seed, tuple(args)) for seed in seeds],
+            callback=self._add_pregenerated)
+        # Lets the workers exit once they're done
+        self._pool.close()
+
+    def wait(self):
+        if self._pool is None:
+            return
+        pool, pending = self._pool, self._pending
+        self._pool = self._pending = None
+        pool.join()
+        # Reraises the first exception raised by generate in a worker, in
+        # which case nothing was added
+        pending.get()
+
+    def _add_pregenerated(self, results):
+        # Called on the pool's result thread
+        with self._lock:
+            for key, geometry, state in results:
+                self._put(key, geometry, state)
+        logger.info('Pregenerated %d geometries', len(results))
+
+    def _put(self, key, geometry, state):
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = (geometry, state)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
@@ -0,0 +1,80 @@
+from gym.utils import seeding
+from gym.utils.geometry_cache import GeometryCache
+
+def generate(np_random):
+    return np_random.uniform(size=3).tolist()
+
+def test_hit_restores_rng_state():
+    cache = GeometryCache(generate)
+    expected = []
+    np_random, _ = seeding.np_random(0)
+    for _ in range(3):
+        expected.append((generate(np_random), np_random.randint(1000)))
+
+    for _ in range(2):
+        np_random, _ = seeding.np_random(0)
+        got = []
+        for _ in range(3):
+            got.append((cache.get(np_random), np_random.randint(1000)))
+        assert got == expected
+    assert cache.misses == 3
+    assert cache.hits == 3
+
+def test_lru_eviction():
+    cache = GeometryCache(generate, maxsize=2)
+    rngs = [seeding.np_random(seed)[0] for seed in range(3)]
+    states = [rng.get_state() for rng in rngs]
+    for rng in rngs:
+        cache.get(rng)
+    assert len(cache) == 2
+
+    # Seed 0 was evicted, seeds 1 and 2 are still there
+    for seed in [1, 2, 0]:
+        rngs[seed].set_state(states[seed])
+        cache.get(rngs[seed])
+    assert cache.hits == 2
+    assert cache.misses == 4
+
+def test_pregenerate():
+    cache = GeometryCache(generate)
+    cache.pregenerate([3, 4], processes=2)
+    cache.wait()
+    assert len(cache) == 2
+
+    np_random, _ = seeding.np_random(4)
+    geometry = cache.get(np_random)
+    next_value = np_random.uniform()
+    assert cache.hits == 1
+
+    np_random, _ = seeding.np_random(4)
+    assert geometry == generate(np_random)
+    assert next_value == np_random.uniform()
+
+def generate_scaled(np_random, scale):
+    return (np_random.uniform(size=3)*scale).tolist()
+
+def test_args_are_part_of_key():
+    cache = GeometryCache(generate_scaled)
+    np_random, _ = seeding.np_random(0)
+    state = np_random.get_state()
+    small = cache.get(np_random, 1)
+    np_random.set_state(state)
+    large = cache.get(np_random, 100)
+    assert cache.misses == 2
+    assert large == [100*x for x in small]
+
+def generate_failing(np_random):
+    raise ValueError('bad geometry')
+
+def test_pregenerate_error_reaches_wait():
+    cache = GeometryCache(generate_failing)
+    cache.pregenerate([0], processes=1)
+    try:
+        cache.wait()
+    except ValueError:
+        pass
+    else:
+        assert False, 'wait() should have raised'
+    assert len(cache) == 0
+    # The failure is only reported once
+    cache.wait()
@@ -0,0 +1,4 @@
+from gym.vector.sync_vector_env import SyncVectorEnv
+from gym.vector.subproc_vector_env import SubprocVectorEnv
+
+__all__ = ["SyncVectorEnv", "SubprocVectorEnv"]
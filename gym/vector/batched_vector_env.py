@@ -0,0 +1,62 @@
+import numpy as np
+
+from gym.core import VectorEnv
+from gym.utils import seeding
+
+class BatchedVectorEnv(VectorEnv):
+    """Base class for environments that keep the state of all
+    `num_envs` sub-environments in NumPy arrays and advance them with a
+    single vectorized update per step.
+
+    Each sub-environment owns a numpy.random.RandomState seeded exactly
+    like the scalar environment's `np_random`, so row `i` of a batch
+    seeded with `seed` follows the same random stream as a scalar
+    environment seeded with `seed + i`.
+
+    When implementing a batched environment, override the following
+    methods in your subclass:
+
+        _step_batch(actions): advance every row and return (rewards, dones)
+        _reset_rows(rows): draw fresh initial states for the given row indices
+        _get_obs(): return the observations of every row as a new array
+
+    If `auto_reset` is False, finished rows are left as they are (as a
+    scalar env would be) until the next reset().
+    """
+    def __init__(self, num_envs, auto_reset=True):
+        self.num_envs = num_envs
+        self.auto_reset = auto_reset
+        self.np_randoms = None
+        self._seed([None] * num_envs)
+
+    def _seed(self, seeds):
+        self.np_randoms = []
+        used_seeds = []
+        for seed in seeds:
+            np_random, seed = seeding.np_random(seed)
+            self.np_randoms.append(np_random)
+            used_seeds.append([seed])
+        return used_seeds
+
+    def _reset(self):
+        self._reset_rows(np.arange(self.num_envs))
+        return self._get_obs()
+
+    def _step(self, actions):
+        rewards, dones = self._step_batch(np.asarray(actions))
+        observations = self._get_obs()
+        infos = [{} for _ in range(self.num_envs)]
+
+        if self.auto_reset and dones.any():
+            rows = np.flatnonzero(dones)
+            for i in rows:
+                infos[i]['terminal_observation'] = observations[i]
+            self._reset_rows(rows)
+            observations = self._get_obs()
+
+        return observations, rewards, dones, infos
+
+    # Override in ALL subclasses
+    def _step_batch(self, actions): raise NotImplementedError
+    def _reset_rows(self, rows): raise NotImplementedError
+    def _get_obs(self): raise NotImplementedError
@@ -0,0 +1,172 @@
+import logging
+import multiprocessing
+import sys
+import traceback
+
+import numpy as np
+
+from gym import error
+from gym.core import VectorEnv
+
+logger = logging.getLogger(__name__)
+
+class SubprocVectorEnv(VectorEnv):
+    """Steps each sub-environment in its own worker process.
+
+    Observations are never pickled: every worker writes into its row of
+    a preallocated shared-memory array, and only rewards, done flags and
+    infos travel back through the worker's pipe. Actions are sent to
+    all workers before any result is gathered, so the sub-environments
+    step concurrently.
+
+    The observation buffer is sized from a probe environment created in
+    the parent process. Pass `observation_dtype` to skip the probe
+    reset (for example np.uint8 for Atari screens).
+
+    Example usage:
+    env = SubprocVectorEnv([gym.spec('LunarLander-v2').make] * 8)
+    """
+    def __init__(self, env_fns, observation_dtype=None, copy=True):
+        if len(env_fns) == 0:
+            raise error.Error('SubprocVectorEnv needs at least one sub-environment')
+        self.num_envs = len(env_fns)
+        self.copy = copy
+        self._processes = []
+        self._pipes = []
+
+        env = env_fns[0]()
+        try:
+            self.metadata = env.metadata
+            self.action_space = env.action_space
+            self.observation_space = env.observation_space
+            self.reward_range = env.reward_range
+            observation_shape = getattr(self.observation_space, 'shape', ())
+            if isinstance(observation_shape, int):
+                observation_shape = (observation_shape,)
+            if observation_dtype is None:
+                observation = np.asarray(env.reset())
+                observation_shape, observation_dtype = observation.shape, observation.dtype
+        finally:
+            env.close()
+
+        observation_dtype = np.dtype(observation_dtype)
+        size = int(np.prod(observation_shape)) * self.num_envs * observation_dtype.itemsize
+        self._shared_observations = multiprocessing.RawArray('b', size)
+        self._observations = _as_ndarray(self._shared_observations, observation_shape, observation_dtype, self.num_envs)
+
+        for index, env_fn in enumerate(env_fns):
+            parent_pipe, child_pipe = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_worker,
+                name='SubprocVectorEnv-{}'.format(index),
+                args=(index, env_fn, child_pipe, parent_pipe, self._shared_observations,
+                      observation_shape, observation_dtype, self.num_envs))
+            process.daemon = True
+            process.start()
+            child_pipe.close()
+            self._processes.append(process)
+            self._pipes.append(parent_pipe)
+
+    def _seed(self, seeds):
+        self._send([('seed', seed) for seed in seeds])
+        return self._gather()
+
+    def _reset(self):
+        self._send([('reset', None)] * self.num_envs)
+        self._gather()
+        return self._get_observations()
+
+    def _step(self, actions):
+        self._send([('step', action) for action in actions])
+        rewards, dones, infos = zip(*self._gather())
+        return self._get_observations(), np.array(rewards, dtype=np.float64), np.array(dones, dtype=np.bool_), list(infos)
+
+    def _close(self):
+        for pipe, process in zip(self._pipes, self._processes):
+            if process.is_alive():
+                try:
+                    pipe.send(('close', None))
+                except IOError:
+                    pass
+        for pipe, process in zip(self._pipes, self._processes):
+            process.join(timeout=1)
+            if process.is_alive():
+                logger.warn('Terminating unresponsive worker %s', process.name)
+                process.terminate()
+            pipe.close()
+
+    def _get_observations(self):
+        if self.copy:
+            return self._observations.copy()
+        return self._observations
+
+    def _send(self, commands):
+        try:
+            for pipe, command in zip(self._pipes, commands):
+                pipe.send(command)
+        except (IOError, EOFError):
+            raise error.Error('A SubprocVectorEnv worker has exited. Close this env and create a new one.')
+
+    def _gather(self):
+        # Drain every pipe before raising so that the workers stay in
+        # lockstep with the parent.
+        try:
+            results = [pipe.recv() for pipe in self._pipes]
+        except (IOError, EOFError):
+            raise error.Error('A SubprocVectorEnv worker has exited. Close this env and create a new one.')
+        for index, (success, result) in enumerate(results):
+            if not success:
+                raise error.Error('Exception in SubprocVectorEnv worker {}:\n{}'.format(index, result))
+        return [result for _, result in results]
+
+def _as_ndarray(shared, shape, dtype, num_envs):
+    return np.frombuffer(shared, dtype=dtype).reshape((num_envs,) + tuple(shape))
+
+def _format_exception():
+    return ''.join(traceback.format_exception(*sys.exc_info()))
+
+def _worker(index, env_fn, pipe, parent_pipe, shared_observations, observation_shape, observation_dtype, num_envs):
+    parent_pipe.close()
+    observations = _as_ndarray(shared_observations, observation_shape, observation_dtype, num_envs)
+    env = None
+    env_error = None
+    try:
+        env = env_fn()
+    except Exception:
+        # Reported in reply to every command, until close
+        env_error = _format_exception()
+    try:
+        while True:
+            command, data = pipe.recv()
+            if command == 'close':
+                pipe.send((True, None))
+                break
+            elif env_error is not None:
+                pipe.send((False, env_error))
+                continue
+            # An exception is sent back as the reply to its command, and
+            # the worker keeps serving the following ones
+            try:
+                if command == 'step':
+                    observation, reward, done, info = env.step(data)
+                    if done:
+                        info = dict(info, terminal_observation=observation)
+                        observation = env.reset()
+                    observations[index] = observation
+                    pipe.send((True, (reward, done, info)))
+                elif command == 'reset':
+                    observations[index] = env.reset()
+                    pipe.send((True, None))
+                elif command == 'seed':
+                    pipe.send((True, env.seed(data)))
+                else:
+                    raise error.Error('Received unknown command {!r}'.format(command))
+            except Exception:
+                pipe.send((False, _format_exception()))
+    except (KeyboardInterrupt, EOFError):
+        # EOFError: the parent went away without closing
+        pass
+    finally:
+        if env is not None:
+            env.close()
+        pipe.close()
@@ -0,0 +1,50 @@
+import numpy as np
+
+from gym import error
+from gym.core import VectorEnv
+
+class SyncVectorEnv(VectorEnv):
+    """Steps a list of ordinary environments one after another in the
+    current process. This works for every registered environment, but
+    is no faster than stepping the environments by hand; it exists so
+    that any env id can be used wherever a VectorEnv is expected.
+
+    Example usage:
+    env = SyncVectorEnv([lambda: gym.make('CartPole-v0') for _ in range(8)])
+    """
+    def __init__(self, env_fns):
+        if len(env_fns) == 0:
+            raise error.Error('SyncVectorEnv needs at least one sub-environment')
+        self.envs = [env_fn() for env_fn in env_fns]
+        self.num_envs = len(self.envs)
+
+        env = self.envs[0]
+        self.metadata = env.metadata
+        self.action_space = env.action_space
+        self.observation_space = env.observation_space
+        self.reward_range = env.reward_range
+
+    def _seed(self, seeds):
+        return [env.seed(seed) for env, seed in zip(self.envs, seeds)]
+
+    def _reset(self):
+        return np.stack([env.reset() for env in self.envs])
+
+    def _step(self, actions):
+        observations = []
+        rewards = np.zeros(self.num_envs, dtype=np.float64)
+        dones = np.zeros(self.num_envs, dtype=np.bool_)
+        infos = []
+        for i, (env, action) in enumerate(zip(self.envs, actions)):
+            observation, rewards[i], dones[i], info = env.step(action)
+            if dones[i]:
+                info = dict(info, terminal_observation=observation)
+                observation = env.reset()
+            observations.append(observation)
+            infos.append(info)
+        return np.stack(observations), rewards, dones, infos
+
+    def _close(self):
+        # envs will be missing if __init__ raised
+        for env in getattr(self, 'envs', []):
+            env.close()
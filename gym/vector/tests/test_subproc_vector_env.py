@@ -0,0 +1,87 @@
+import numpy as np
+
+import gym
+from gym import error
+from gym.vector import SubprocVectorEnv, SyncVectorEnv
+
+def test_matches_sync_vector_env():
+    spec = gym.spec('CartPole-v0')
+    subproc_env = SubprocVectorEnv([spec.make] * 3)
+    sync_env = SyncVectorEnv([spec.make] * 3)
+    try:
+        subproc_env.seed(0)
+        sync_env.seed(0)
+        assert np.array_equal(subproc_env.reset(), sync_env.reset())
+        for step in range(50):
+            actions = [step % 2, 1, 0]
+            subproc_result = subproc_env.step(actions)
+            sync_result = sync_env.step(actions)
+            for subproc_value, sync_value in zip(subproc_result[:3], sync_result[:3]):
+                assert np.array_equal(subproc_value, sync_value)
+    finally:
+        subproc_env.close()
+        sync_env.close()
+
+def test_discrete_observations():
+    env = gym.make('FrozenLake-v0', num_envs=2, asynchronous=True)
+    try:
+        obs = env.reset()
+        assert obs.shape == (2,)
+        assert obs.dtype.kind == 'i'
+        obs, _, _, _ = env.step([1, 2])
+        assert all(env.observation_space.contains(int(ob)) for ob in obs)
+    finally:
+        env.close()
+
+def test_worker_exception():
+    env = gym.make('CartPole-v0', num_envs=2, asynchronous=True)
+    try:
+        env.reset()
+        try:
+            env.step([0, 7])
+        except error.Error as e:
+            assert 'worker 1' in str(e), 'Unexpected message: {}'.format(e)
+        else:
+            assert False
+        # The worker reports the next error too, and recovers on reset
+        try:
+            env.step([0, 7])
+        except error.Error as e:
+            assert 'worker 1' in str(e), 'Unexpected message: {}'.format(e)
+        else:
+            assert False
+        env.reset()
+        env.step([0, 1])
+    finally:
+        env.close()
+
+def make_broken_env():
+    raise RuntimeError('cannot make env')
+
+def test_env_fn_exception():
+    env = SubprocVectorEnv([gym.spec('CartPole-v0').make, make_broken_env], observation_dtype=np.float64)
+    try:
+        for _ in range(2):
+            try:
+                env.reset()
+            except error.Error as e:
+                assert 'cannot make env' in str(e), 'Unexpected message: {}'.format(e)
+            else:
+                assert False
+    finally:
+        env.close()
+
+def test_dead_worker():
+    env = SubprocVectorEnv([gym.spec('CartPole-v0').make] * 2)
+    try:
+        env.reset()
+        env._processes[1].terminate()
+        env._processes[1].join()
+        try:
+            env.step([0, 1])
+        except error.Error as e:
+            assert 'has exited' in str(e), 'Unexpected message: {}'.format(e)
+        else:
+            assert False
+    finally:
+        env.close()
@@ -0,0 +1,63 @@
+import numpy as np
+
+import gym
+from gym import error
+from gym.vector import SyncVectorEnv
+
+def test_make_vector():
+    env = gym.make('CartPole-v0', num_envs=3)
+    assert isinstance(env, gym.VectorEnv)
+    assert env.spec.id == 'CartPole-v0'
+    assert env.num_envs == 3
+    env.close()
+
+def test_step_shapes():
+    env = gym.make('CartPole-v0', num_envs=4)
+    env.seed(0)
+    obs = env.reset()
+    assert obs.shape == (4, 4)
+    obs, rewards, dones, infos = env.step([env.action_space.sample() for _ in range(4)])
+    assert obs.shape == (4, 4)
+    assert rewards.shape == (4,) and rewards.dtype == np.float64
+    assert dones.shape == (4,) and dones.dtype == np.bool_
+    assert len(infos) == 4
+    env.close()
+
+def test_matches_scalar_envs():
+    vector_env = SyncVectorEnv([gym.spec('CartPole-v0').make] * 2)
+    vector_env.seed(5)
+    scalar_envs = [gym.make('CartPole-v0') for _ in range(2)]
+    for i, env in enumerate(scalar_envs):
+        env.seed(5 + i)
+
+    obs = vector_env.reset()
+    assert np.array_equal(obs, np.stack([env.reset() for env in scalar_envs]))
+    for _ in range(5):
+        obs, rewards, _, _ = vector_env.step([1, 0])
+        expected = [env.step(action) for env, action in zip(scalar_envs, [1, 0])]
+        assert np.array_equal(obs, np.stack([ob for ob, _, _, _ in expected]))
+        assert np.array_equal(rewards, [reward for _, reward, _, _ in expected])
+
+def test_auto_reset():
+    env = SyncVectorEnv([lambda: gym.make('CartPole-v0')])
+    env.seed(0)
+    env.reset()
+    for _ in range(500):
+        obs, _, dones, infos = env.step([1])
+        if dones[0]:
+            break
+    else:
+        assert False, 'CartPole never terminated'
+
+    terminal = infos[0]['terminal_observation']
+    assert abs(terminal[2]) > abs(obs[0][2]), 'Expected {} to be a freshly reset observation'.format(obs[0])
+
+def test_wrong_number_of_actions():
+    env = gym.make('FrozenLake-v0', num_envs=2)
+    env.reset()
+    try:
+        env.step([0])
+    except error.Error:
+        pass
+    else:
+        assert False
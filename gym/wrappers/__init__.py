@@ -2,3 +2,4 @@ from gym import error
 from gym.wrappers.frame_skipping import SkipWrapper
 from gym.wrappers.monitoring import Monitor
 from gym.wrappers.time_limit import TimeLimit
+from gym.wrappers.trajectory_recording import TrajectoryRecorder, TrajectoryReader
@@ -10,11 +10,11 @@ logger = logging.getLogger(__name__)
 
 class _Monitor(Wrapper):
     def __init__(self, env, directory, video_callable=None, force=False, resume=False,
-                 write_upon_reset=False, uid=None, mode=None):
+                 write_upon_reset=False, uid=None, mode=None, async_flush=False):
         super(_Monitor, self).__init__(env)
         self._monitor = monitoring.MonitorManager(env)
         self._monitor.start(directory, video_callable, force, resume,
-                            write_upon_reset, uid, mode)
+                            write_upon_reset, uid, mode, async_flush)
 
     def _step(self, action):
         self._monitor._before_step(action)
@@ -42,9 +42,9 @@ class _Monitor(Wrapper):
         self._monitor._set_mode(mode)
 
 def Monitor(env=None, directory=None, video_callable=None, force=False, resume=False,
-            write_upon_reset=False, uid=None, mode=None):
+            write_upon_reset=False, uid=None, mode=None, async_flush=False):
     if not isinstance(env, gym.Env):
         raise error.Error("Monitor decorator syntax is deprecated as of 12/28/2016. Replace your call to `env = gym.wrappers.Monitor(directory)(env)` with `env = gym.wrappers.Monitor(env, directory)`")
 
     return _Monitor(TimeLimit(env), directory, video_callable, force, resume,
-                    write_upon_reset, uid, mode)
+                    write_upon_reset, uid, mode, async_flush)
@@ -1,3 +1,5 @@
+import numpy as np
+
 import gym
 from gym import error
 from gym import wrappers
@@ -54,3 +56,71 @@ def test_no_double_wrapping():
         env.close()
     finally:
         shutil.rmtree(temp)
+
+def test_trajectory_recorder():
+    for compress in [True, False]:
+        temp = tempfile.mkdtemp()
+        try:
+            env = gym.make('CartPole-v0')
+            env.seed(0)
+            env = wrappers.TrajectoryRecorder(env, temp, chunk_size=16, compress=compress)
+            expected = []
+            for _ in range(3):
+                obs = env.reset()
+                done = False
+                while not done:
+                    action = env.action_space.sample()
+                    next_obs, reward, done, _ = env.step(action)
+                    expected.append((obs, action, reward, done))
+                    obs = next_obs
+            env.close()
+
+            reader = wrappers.TrajectoryReader(temp)
+            assert len(reader) == len(expected)
+            assert reader.num_chunks == (len(expected) + 15) // 16
+            episodes = list(reader.episodes())
+            assert len(episodes) == 3
+            assert all(episode['dones'][-1] and not episode['dones'][:-1].any() for episode in episodes)
+
+            observations = np.concatenate([episode['observations'] for episode in episodes])
+            actions = np.concatenate([episode['actions'] for episode in episodes])
+            assert np.array_equal(observations, np.array([e[0] for e in expected]))
+            assert actions.tolist() == [e[1] for e in expected]
+            if not compress:
+                assert isinstance(reader.chunk(0)['observations'], np.memmap)
+            else:
+                chunk = reader.chunk(0)
+                assert not chunk._columns
+                assert np.array_equal(chunk['observations'], observations[:16])
+                assert list(chunk._columns) == ['observations']
+                chunk.close()
+        finally:
+            shutil.rmtree(temp)
+
+def test_trajectory_recorder_reuses_buffers():
+    temp = tempfile.mkdtemp()
+    try:
+        env = wrappers.TrajectoryRecorder(gym.make('FrozenLake-v0'), temp, chunk_size=4, max_pending_chunks=1)
+        env.seed(0)
+        expected = []
+        obs = env.reset()
+        episode = 0
+        for _ in range(200):
+            action = env.action_space.sample()
+            next_obs, reward, done, _ = env.step(action)
+            expected.append((obs, action, reward, done, episode))
+            obs = next_obs
+            if done:
+                obs = env.reset()
+                episode += 1
+        env.close()
+
+        # Reused buffers must not mix up transitions between the 50 chunks
+        reader = wrappers.TrajectoryReader(temp)
+        assert reader.num_chunks == 50
+        recorded = []
+        for chunk in reader.chunks():
+            recorded.extend(zip(*[chunk[name].tolist() for name in wrappers.trajectory_recording.COLUMNS]))
+        assert recorded == expected
+    finally:
+        shutil.rmtree(temp)
@@ -0,0 +1,299 @@
+import json
+import logging
+import os
+import sys
+import threading
+
+import numpy as np
+import six
+from six.moves import queue
+
+from gym import Wrapper, error, spaces
+from gym.utils import atomic_write
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+logger = logging.getLogger(__name__)
+
+__all__ = ['TrajectoryRecorder', 'TrajectoryReader']
+
+INDEX_FILENAME = 'trajectory.index.json'
+COLUMNS = ['observations', 'actions', 'rewards', 'dones', 'episode_ids']
+
+def _space_layout(space, example=None):
+    """Returns the (shape, dtype) of one element of space, as stored in a
+    chunk. Box carries no dtype here, so Box elements take the dtype of
+    an example element when one is given (e.g. uint8 Atari frames)."""
+    if isinstance(space, spaces.Box):
+        if isinstance(example, np.ndarray):
+            return space.shape, example.dtype
+        return space.shape, np.dtype(np.float64)
+    elif isinstance(space, spaces.Discrete):
+        return (), np.dtype(np.int64)
+    elif isinstance(space, spaces.MultiDiscrete):
+        return (space.num_discrete_space,), np.dtype(np.int64)
+    elif isinstance(space, spaces.Tuple) and all(isinstance(s, spaces.Discrete) for s in space.spaces):
+        return (len(space.spaces),), np.dtype(np.int64)
+    else:
+        raise error.Error('TrajectoryRecorder does not support {}'.format(space))
+
+class _Chunk(object):
+    """Preallocated arrays for chunk_size transitions."""
+
+    def __init__(self, chunk_size, observation_layout, action_layout):
+        self.observations = np.zeros((chunk_size,) + tuple(observation_layout[0]), dtype=observation_layout[1])
+        self.actions = np.zeros((chunk_size,) + tuple(action_layout[0]), dtype=action_layout[1])
+        self.rewards = np.zeros(chunk_size, dtype=np.float64)
+        self.dones = np.zeros(chunk_size, dtype=bool)
+        self.episode_ids = np.zeros(chunk_size, dtype=np.int64)
+        self.count = 0
+        self.index = None
+
+class TrajectoryRecorder(Wrapper):
+    """
+    Records every transition (observation, action, reward, done) to
+    chunk files in `directory`, for offline RL and regression checks.
+    `observation` is the one the agent saw when choosing `action`.
+
+    Transitions are copied into preallocated arrays, typed from the
+    observation and action spaces. Full chunks are handed to a
+    background thread, which writes them (compressed with
+    np.savez_compressed if `compress` is True) and then returns their
+    buffers for reuse. At most `max_pending_chunks` chunks wait to be
+    written; beyond that, step() blocks until the writer catches up, so
+    memory stays bounded at (max_pending_chunks + 2) * chunk_size
+    transitions however fast the env is.
+
+    Read recordings back with TrajectoryReader.
+    """
+
+    def __init__(self, env, directory, chunk_size=1000, compress=True, max_pending_chunks=2):
+        super(TrajectoryRecorder, self).__init__(env)
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        elif os.path.exists(os.path.join(directory, INDEX_FILENAME)):
+            raise error.Error('Trying to record trajectories to {}, which already holds a recording. Use a unique directory for each recording.'.format(directory))
+
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.compress = compress
+        self.max_pending_chunks = max_pending_chunks
+
+        self._writer = _ChunkWriter(directory, compress, max_pending_chunks)
+        self._chunk = None
+        self._chunks_started = 0
+        self._observation = None
+        self._episode_id = -1
+
+    def _reset(self):
+        self._observation = self.env.reset()
+        self._episode_id += 1
+        return self._observation
+
+    def _step(self, action):
+        if self._observation is None:
+            raise error.ResetNeeded('Trying to record a step before reset. Call env.reset() before the first step.')
+        observation, reward, done, info = self.env.step(action)
+
+        chunk = self._current_chunk()
+        i = chunk.count
+        chunk.observations[i] = self._observation
+        chunk.actions[i] = action
+        chunk.rewards[i] = reward
+        chunk.dones[i] = done
+        chunk.episode_ids[i] = self._episode_id
+        chunk.count += 1
+        if chunk.count == self.chunk_size:
+            self._submit_chunk()
+
+        self._observation = observation
+        return observation, reward, done, info
+
+    def _current_chunk(self):
+        if self._chunk is None:
+            chunk = self._writer.take_free_chunk()
+            if chunk is None:
+                chunk = _Chunk(
+                    self.chunk_size,
+                    _space_layout(self.observation_space, self._observation),
+                    _space_layout(self.action_space))
+            chunk.count = 0
+            chunk.index = self._chunks_started
+            self._chunks_started += 1
+            self._chunk = chunk
+        return self._chunk
+
+    def _submit_chunk(self):
+        self._writer.submit(self._chunk)
+        self._chunk = None
+
+    def _close(self):
+        super(TrajectoryRecorder, self)._close()
+        # _writer will not be set if __init__ raised
+        if getattr(self, '_writer', None) is None:
+            return
+
+        if self._chunk is not None and self._chunk.count > 0:
+            self._submit_chunk()
+        self._writer.close()
+
+class _ChunkWriter(object):
+    """Writes chunks on a background thread and hands their buffers back
+    for reuse. Kept separate from TrajectoryRecorder so that the thread
+    doesn't keep the recorder from being garbage collected."""
+
+    def __init__(self, directory, compress, max_pending_chunks):
+        self.directory = directory
+        self.compress = compress
+
+        self._index = []
+        self._pending = queue.Queue(maxsize=max_pending_chunks)
+        self._free = queue.Queue()
+        self._exc_info = None
+
+        self._thread = threading.Thread(target=self._run, name='TrajectoryWriter')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def submit(self, chunk):
+        self._check()
+        # Blocks only if max_pending_chunks chunks are already queued
+        self._pending.put(chunk)
+
+    def take_free_chunk(self):
+        """Returns a chunk whose contents have been written, or None."""
+        self._check()
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self._pending.put(None)
+        self._thread.join()
+        self._check()
+
+    def _check(self):
+        if self._exc_info is not None:
+            exc_info, self._exc_info = self._exc_info, None
+            six.reraise(*exc_info)
+
+    def _run(self):
+        while True:
+            chunk = self._pending.get()
+            if chunk is None:
+                return
+            try:
+                self._write(chunk)
+            except Exception:
+                logger.exception('Could not write trajectory chunk to %s', self.directory)
+                self._exc_info = sys.exc_info()
+            self._free.put(chunk)
+
+    def _write(self, chunk):
+        n = chunk.count
+        columns = dict((name, getattr(chunk, name)[:n]) for name in COLUMNS)
+        if self.compress:
+            filename = 'trajectory.chunk{:06}.npz'.format(chunk.index)
+            with atomic_write.atomic_write(os.path.join(self.directory, filename), binary=True) as f:
+                np.savez_compressed(f, **columns)
+        else:
+            # One .npy per column, so that the reader can memory-map them
+            filename = 'trajectory.chunk{:06}'.format(chunk.index)
+            path = os.path.join(self.directory, filename)
+            if not os.path.exists(path):
+                os.mkdir(path)
+            for name, column in columns.items():
+                with atomic_write.atomic_write(os.path.join(path, name + '.npy'), binary=True) as f:
+                    np.save(f, column)
+
+        # Chunks are written in order, so the index only ever grows
+        self._index.append([filename, n])
+        with atomic_write.atomic_write(os.path.join(self.directory, INDEX_FILENAME)) as f:
+            json.dump({'chunks': self._index}, f)
+
+class TrajectoryReader(object):
+    """
+    Reads a recording made by TrajectoryRecorder. Chunks are only opened
+    when accessed; uncompressed chunks are memory-mapped.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        path = os.path.join(directory, INDEX_FILENAME)
+        if not os.path.exists(path):
+            raise error.Error('No trajectory recording found in {}'.format(directory))
+        with open(path) as f:
+            self._index = json.load(f)['chunks']
+
+    @property
+    def num_chunks(self):
+        return len(self._index)
+
+    def __len__(self):
+        return sum(count for _, count in self._index)
+
+    def chunk(self, i):
+        """Returns a mapping from each column name to its array in chunk i.
+        Compressed columns are only decompressed when first indexed."""
+        filename, _ = self._index[i]
+        path = os.path.join(self.directory, filename)
+        if filename.endswith('.npz'):
+            return _CompressedChunk(path)
+        return dict((name, np.load(os.path.join(path, name + '.npy'), mmap_mode='r')) for name in COLUMNS)
+
+    def chunks(self):
+        for i in range(self.num_chunks):
+            yield self.chunk(i)
+
+    def episodes(self):
+        """Yields one dict of column arrays per recorded episode, including
+        an unfinished last episode."""
+        parts = []
+        for chunk in self.chunks():
+            episode_ids = chunk['episode_ids']
+            # Boundaries between episodes within this chunk
+            splits = np.flatnonzero(episode_ids[1:] != episode_ids[:-1]) + 1
+            start = 0
+            for end in list(splits) + [len(episode_ids)]:
+                part = dict((name, column[start:end]) for name, column in chunk.items())
+                if parts and parts[-1]['episode_ids'][0] != part['episode_ids'][0]:
+                    yield self._join(parts)
+                    parts = []
+                parts.append(part)
+                start = end
+        if parts:
+            yield self._join(parts)
+
+    def _join(self, parts):
+        if len(parts) == 1:
+            return parts[0]
+        return dict((name, np.concatenate([part[name] for part in parts])) for name in COLUMNS)
+
+class _CompressedChunk(Mapping):
+    """The columns of a compressed chunk. Keeps the NpzFile open (until
+    close() or garbage collection) and decompresses each column the first
+    time it is indexed."""
+
+    def __init__(self, path):
+        self._npz = np.load(path)
+        self._columns = {}
+
+    def __getitem__(self, name):
+        if name not in self._columns:
+            if name not in COLUMNS:
+                raise KeyError(name)
+            self._columns[name] = self._npz[name]
+        return self._columns[name]
+
+    def __iter__(self):
+        return iter(COLUMNS)
+
+    def __len__(self):
+        return len(COLUMNS)
+
+    def close(self):
+        self._npz.close()
@@ -0,0 +1,52 @@
+"""
+Times benchmark scoring (score_evaluation) on synthetic monitor data
+merged from many sources, to check that it scales linearly with the
+number of episodes.
+
+    python misc/benchmark_scoring.py --episodes 10000 100000 1000000 10000000
+"""
+from __future__ import print_function
+
+import argparse
+import time
+
+import numpy as np
+
+from gym.benchmarks import registration, scoring
+
+def synthetic_results(num_episodes, num_sources, seed=0):
+    rng = np.random.RandomState(seed)
+    initial_reset_timestamps = rng.uniform(0, 10, num_sources)
+    # Merged monitor data is sorted by timestamp, with sources interleaved
+    timestamps = np.sort(rng.uniform(10, 10 + num_episodes, num_episodes))
+    data_sources = rng.randint(num_sources, size=num_episodes)
+    episode_lengths = rng.randint(1, 200, size=num_episodes)
+    episode_rewards = rng.uniform(0, 200, size=num_episodes)
+    episode_types = np.where(rng.uniform(size=num_episodes) < 0.9, 't', 'e')
+    return data_sources, initial_reset_timestamps, episode_lengths, episode_rewards, episode_types, timestamps
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--episodes', type=int, nargs='+', default=[10000, 100000, 1000000, 10000000])
+    parser.add_argument('--sources', type=int, default=256)
+    args = parser.parse_args()
+
+    tasks = [{'env_id': 'CartPole-v0', 'trials': 1, 'max_timesteps': t} for t in [10**6, 10**8, 10**10]]
+    tasks.append({'env_id': 'CartPole-v0', 'trials': 1, 'max_seconds': 10**5})
+    scorers = [
+        ('ClipTo01ThenAverage', scoring.ClipTo01ThenAverage()),
+        ('TotalReward', scoring.TotalReward()),
+    ]
+
+    print('{:>10} {:>20} {:>10} {:>14}'.format('episodes', 'scorer', 'seconds', 'episodes/sec'))
+    for num_episodes in args.episodes:
+        results = synthetic_results(num_episodes, args.sources)
+        for name, scorer in scorers:
+            benchmark = registration.Benchmark(id='Micro-v0', scorer=scorer, tasks=tasks)
+            start = time.time()
+            benchmark.score_evaluation('CartPole-v0', *results)
+            elapsed = time.time() - start
+            print('{:>10} {:>20} {:>10.3f} {:>14.0f}'.format(num_episodes, name, elapsed, num_episodes / elapsed))
+
+if __name__ == '__main__':
+    main()
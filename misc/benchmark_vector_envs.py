@@ -0,0 +1,59 @@
+"""
+Times stepping N scalar copies of an env one after another against
+stepping the same N copies as a single batched VectorEnv.
+
+    python misc/benchmark_vector_envs.py Acrobot-v1 --num-envs 1 10 100 1000
+"""
+from __future__ import print_function
+
+import argparse
+import time
+
+import numpy as np
+
+import gym
+
+def time_scalar(env_id, num_envs, steps):
+    envs = [gym.make(env_id) for _ in range(num_envs)]
+    for i, env in enumerate(envs):
+        env.seed(i)
+        env.reset()
+    actions = [[env.action_space.sample() for env in envs] for _ in range(steps)]
+
+    start = time.time()
+    for step_actions in actions:
+        for env, action in zip(envs, step_actions):
+            _, _, done, _ = env.step(action)
+            if done:
+                env.reset()
+    return time.time() - start
+
+def time_vector(env_id, num_envs, steps):
+    env = gym.make(env_id, num_envs=num_envs)
+    env.seed(0)
+    env.reset()
+    actions = [np.array([env.action_space.sample() for _ in range(num_envs)]) for _ in range(steps)]
+
+    start = time.time()
+    for step_actions in actions:
+        env.step(step_actions)
+    return time.time() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("envid")
+    parser.add_argument("--num-envs", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--steps", type=int, default=200)
+    args = parser.parse_args()
+
+    gym.undo_logger_setup()
+
+    print("%8s %16s %16s %8s"%("num_envs", "scalar us/env", "vector us/env", "speedup"))
+    for num_envs in args.num_envs:
+        scalar = time_scalar(args.envid, num_envs, args.steps)
+        vector = time_vector(args.envid, num_envs, args.steps)
+        per_env_step = 1e6 / (num_envs * args.steps)
+        print("%8d %16.2f %16.2f %7.1fx"%(num_envs, scalar * per_env_step, vector * per_env_step, scalar / vector))
+
+if __name__ == "__main__":
+    main()